@@ -29,6 +29,13 @@
    Jan 05, 2018: Absence of Galex tiles are declared explicitly. 
                  Galactic plane warning included.
    Jan 16, 2018: Error outputs directed to file.
+   Oct 17, 2026: Field selection uses the vectorised cone search.
+   Oct 18, 2026: The GALEX products are fetched through the uvcheck
+                 tile cache instead of urllib.
+   Oct 18, 2026: The mcat columns are read through the uvcheck column
+                 cache (memory-mapped .npy), the brightest sources are
+                 selected with array operations.
+   Oct 18, 2026: Count rates from the uvcheck count-rate module.
 
    The author would like to acknowledge inputs from Dr. Koshy George
    which greatly helped the developement of this script.
@@ -39,7 +46,6 @@
 import os
 import sys
 import string
-import urllib
 import matplotlib
 # Force matplotlib to not use any Xwindows backend.
 matplotlib.use('Agg')
@@ -51,10 +57,13 @@ from astropy.wcs import WCS
 from astropy.io import ascii
 from requests import Session
 from bs4 import BeautifulSoup
+from uvcheck.tilecache import TileCache
 from astropy import units as u
 from matplotlib.colors import LogNorm
 from astropy.table import Table, hstack
 from astropy.coordinates import SkyCoord
+from uvcheck.mcat import read_mcat, bright_sources
+from uvcheck.counts import countnuv, countfuv, countfuv_abs
 
 
 # To get the user input. 
@@ -95,81 +104,8 @@ field_radius_im = {'uvit'  : 800,
                    'czti'  : 1120,
                    'laxpc' : 1120}
 
-# Functions to convert magnitude to UVIT count rates.
-def countfuv(mg):
-    caf2 = 1.0
-    baf2 = 0.85
-    sapphire = 0.63
-    silica = 0.22
-    mg1 = 18.22
-
-    if 10.511 <= mg <= 15.0:
-        mg_c = 5.371 + (20.0 * mg - 210.2) ** 0.5
-    elif mg < 10.511:
-        mg_c = 5.371
-    else: 
-        mg_c = mg
-
-    cr1 =  caf2 * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr2 =  baf2 * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr3 =  sapphire *10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr4 =  silica * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    return mg, mg_c, cr1, cr2, cr3, cr4
-
-countfuv = np.vectorize(countfuv)
-
-def countfuv_abs(mg): # for cases where FUV is absent.
-    caf2 = 1.0
-    baf2 = 0.85
-    sapphire = 0.63
-    silica = 0.22
-    mg1 = 18.22
-
-    if 9.323 <= mg <= 15.0:
-        mg_c = 2.634 + (26.316 * mg - 245.329) ** 0.5
-    elif mg < 9.323:
-        mg_c = 2.634
-    else: 
-        mg_c = mg
-
-    mg_c = mg_c - 1.65   
-    cr1 =  caf2 * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr2 =  baf2 * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr3 =  sapphire *10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr4 =  silica * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    return mg, mg_c, cr1, cr2, cr3, cr4
-
-countfuv_abs = np.vectorize(countfuv_abs)
-
-def countnuv(mg):
-    silica = 1.0
-    b4 = 0.22
-    b13 = 0.27
-    b15 = 0.074
-    n2 = 0.055
-    mg1 = 20.0
-
-    if 9.323 <= mg <= 15.0:
-        mg_c = 2.634 + (26.316 * mg - 245.329) ** 0.5
-    elif mg < 9.323:
-        mg_c = 2.634
-    else: 
-        mg_c = mg 
-
-    cr1 =  silica * 10.0 ** ((mg1 - mg_c) * 0.4)
-    cr2 =  b4 * 10 ** ((mg1-mg_c) * 0.4)    
-    cr3 =  b13 * 10 ** ((mg1 - mg_c) * 0.4)    
-    cr4 =  b15 * 10 ** ((mg1 - mg_c) * 0.4)    
-    cr5 =  n2 * 10 ** ((mg1 - mg_c) * 0.4)    
-    return mg, mg_c, cr1, cr2, cr3, cr4, cr5
-
-countnuv = np.vectorize(countnuv)
-
-# Function to find seperation in celestial coordinates.
+# The field centre.
 cc = SkyCoord(RA, DEC, unit = (u.hourangle, u.deg))
-def cel_separation(a, b):
-    coo = SkyCoord(a, b, frame = 'icrs', unit = 'deg')
-    return coo.separation(cc)
 
 # Function to convert ra_deg and dec_deg to ra_hms and dec_dms.
 def deg_to_hms(al, dl):
@@ -216,6 +152,9 @@ header = {'Host': 'galex.stsci.edu',
           'Referer': 'http://galex.stsci.edu/GR6/?page=tilelist&survey=allsurveys',
           'Connection': 'keep-alive'}
 
+# The GALEX products are fetched through the local tile cache.
+tile_cache = TileCache()
+
 # Post request.
 session = Session()
 response = session.post(url = 'http://galex.stsci.edu/GR6/?page=tilelist&survey=allsurveys',
@@ -260,7 +199,7 @@ for link in pp:
 
 if len(catalogue_link) != 0:
     catalogue = catalogue_link[0].split('/')[-1]
-    urllib.urlretrieve(catalogue_link[0], catalogue)
+    tile_cache.fetch(catalogue_link[0], catalogue)
 else:
     no_catalogue = 'Could not find the catalogue for this region.'
     print('\n{}\n'.format(no_catalogue))
@@ -269,30 +208,18 @@ else:
 
 # Reading coordinates from catalogue.
 try:
-    hdu = fits.open(catalogue)
+    mcat = read_mcat(catalogue, tile_cache.sidecar(catalogue_link[0], '.mcat.npy'))
 except IOError:
     incomplete_fits = 'Incomplete FITS file. Check if Galex Servers are working properly.'
     print('\n{}\n'.format(incomplete_fits))
     error_file.write(incomplete_fits)
     sys.exit(1)
 
-alpha = hdu[1].data['alpha_j2000_merged']
-delta = hdu[1].data['delta_j2000_merged']
-
 
 # NUV 
-nuv_mag = hdu[1].data['nuv_mag']
-refined_set = [(al, de, nm) for al, de, nm 
-                            in zip(alpha, delta, nuv_mag)
-                            if int(nm) != -999 and nm <= 22.]
-
-nalpha, ndelta, nuv_mag = zip(*refined_set)
-
-confined_set = [(nm, al, de) for al, de, nm 
-                             in zip(nalpha, ndelta, nuv_mag) 
-                             if cel_separation(al, de) <= field_radius[instrument] * u.arcsec]
-
-nd = np.array(sorted(confined_set))[0:5]
+nd = bright_sources(mcat['nuv_mag'], mcat['alpha'], mcat['delta'],
+                    cc.ra.degree, cc.dec.degree,
+                    field_radius[instrument])
 ma, ma_c, ta, tb, tc, td, te = countnuv(nd[:,0])
 nuv_res = Table([ma, ma_c, ta, tb, tc, td, te],
                names = ('Mag',
@@ -341,7 +268,7 @@ with open('safe_NUV_filters.txt', 'w') as safe_file:
     safe_file.write(nuv_declaration)
 
 # FUV 
-fuv_mag = hdu[1].data['fuv_mag']
+fuv_mag = mcat['fuv_mag']
 
 fuv_absent = 'no'
 if len(np.unique(fuv_mag)) == 1:  # when FUV data is absent.
@@ -352,17 +279,9 @@ if len(np.unique(fuv_mag)) == 1:  # when FUV data is absent.
     with open('absent_FUV.txt', 'w') as the_file:
         the_file.write(warning)
 else:
-    refined_set = [(al, de, fm) for al, de, fm 
-                                in zip(alpha, delta, fuv_mag)
-                                if int(fm) != -999 and fm <= 22.]
-    
-    falpha, fdelta, fuv_mag = zip(*refined_set)
-    
-    confined_set = [(fm, al, de) for al, de, fm 
-                                 in zip(falpha, fdelta, fuv_mag) 
-                                 if cel_separation(al, de) <= field_radius[instrument] * u.arcsec]
-    
-    fd = np.array(sorted(confined_set))[0:5]
+    fd = bright_sources(fuv_mag, mcat['alpha'], mcat['delta'],
+                        cc.ra.degree, cc.dec.degree,
+                        field_radius[instrument])
 
 if fuv_absent == 'no':
     ma, ma_c, ta, tb, tc, td = countfuv(fd[:,0])
@@ -428,7 +347,7 @@ if len(images) != 0:
         
         # To download the data.
         image_file = image.split('/')[-1]
-        urllib.urlretrieve(image, image_file)
+        tile_cache.fetch(image, image_file)
 
         # To read data.
         fitsf = fits.open(image_file)[0].data
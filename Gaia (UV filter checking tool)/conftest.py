@@ -0,0 +1 @@
+'''Makes the uvcheck package of this directory importable by the tests.'''
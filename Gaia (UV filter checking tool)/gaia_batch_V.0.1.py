@@ -0,0 +1,47 @@
+#!/usr/bin/env python2.7
+
+# Run this code in the format: ./script targets.csv results.csv
+# The target list needs ra and dec columns (12:12:12 -12:12:12),
+# name and instrument (uvit, sxt, czti, laxpc) columns are optional.
+
+'''A tool for determining the UVIT FUV and NUV filters of many fields.
+
+
+   Copyright 2026 Prajwel Joseph
+  
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+  
+       http://www.apache.org/licenses/LICENSE-2.0
+  
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License. 
+
+   Changes; when, what
+   -------------------
+   Oct 17, 2026: Batch mode of gaia_V.3.3.py.
+   Oct 18, 2026: The GALEX products go through the uvcheck tile cache,
+                 its hits and misses are reported at the end.
+   Oct 18, 2026: The stages of every check go into <results>_stages.json;
+                 --summary sums them up by kind of work (network, FITS I/O, compute).
+   Oct 18, 2026: --sky-map answers for the fields the all-sky map of safe filters
+                 can decide (uvcheck.skymap), the others are checked in full.
+   Oct 18, 2026: A thin wrapper of python -m uvcheck batch, run only as the main
+                 script (the worker processes may import it again).
+
+'''
+
+
+import sys
+
+from uvcheck.cli import main
+
+
+# The command line is that of python -m uvcheck batch. Guarded, as the
+# worker processes may import this script again.
+if __name__ == '__main__':
+    sys.exit(main(['batch'] + sys.argv[1:]))
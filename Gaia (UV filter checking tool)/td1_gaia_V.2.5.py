@@ -20,6 +20,10 @@
    Changes; when, what
    -------------------
    Jan 10, 2018: Galactic latitude check incorporated.
+   Oct 17, 2026: Field selection uses the vectorised cone search.
+   Oct 17, 2026: TD1 lookups go through a declination-band index.
+   Oct 18, 2026: TD1 count rates from the uvcheck count-rate module.
+   Oct 18, 2026: Only the modules the TD1 method needs are imported.
 
 
    The author would like to acknowledge inputs from Dr. Koshy George
@@ -30,23 +34,14 @@
 
 import os
 import sys
-import string
-import urllib
-import matplotlib
-# Force matplotlib to not use any Xwindows backend.
-matplotlib.use('Agg')
 import numpy as np
-import matplotlib.pyplot as plt
 
-from astropy.io import fits
-from astropy.wcs import WCS
 from astropy.io import ascii
-from requests import Session
-from bs4 import BeautifulSoup
+from astropy.table import Table
+from uvcheck.td1 import TD1Index
 from astropy import units as u
-from matplotlib.colors import LogNorm
-from astropy.table import Table, hstack
 from astropy.coordinates import SkyCoord
+from uvcheck.counts import flux_norm, td1_countnuv, td1_countfuv
 
 
 # To get the user input. 
@@ -66,7 +61,7 @@ os.chdir(working_arena)
 # To read the TD1 catalogue.
 try:
     catalogue = 'td1_catalogue.fits'
-    hdu = fits.open(catalogue)
+    td1_index = TD1Index.load(catalogue)
 except IOError:
     print('Could not find the catalogue file: {}'.format(catalogue))
     sys.exit(1)
@@ -77,39 +72,8 @@ field_radius = {'uvit'  : 1200,
                 'czti'  : 1680,
                 'laxpc' : 1680}
 
-# Functions to convert magnitude to UVIT count rates.
-flux_norm = 2E-13
-def countnuv(flux):
-    silica = 955.0
-    b4 = 218.5
-    b13 = 275.8
-    b15 = 59.6
-    n2 = 50.6
-    flux_ratio = flux / flux_norm
-    cr1 =  silica * flux_ratio
-    cr2 =  b4 * flux_ratio
-    cr3 =  b13 * flux_ratio
-    cr4 =  b15 * flux_ratio
-    cr5 =  n2 * flux_ratio
-    return flux, cr1, cr2, cr3, cr4, cr5
-
-def countfuv(flux):
-    caf2 = 74.5
-    baf2 = 60.0
-    sapphire = 50.0
-    silica = 17.3
-    flux_ratio = flux / flux_norm
-    cr1 =  caf2 * flux_ratio    
-    cr2 =  baf2 * flux_ratio
-    cr3 =  sapphire * flux_ratio
-    cr4 =  silica * flux_ratio 
-    return flux, cr1, cr2, cr3, cr4
-
-# Function to find seperation in celestial coordinates.
+# The field centre.
 cc = SkyCoord(RA, DEC, unit = (u.hourangle, u.deg))
-def cel_separation(a, b):
-    coo = SkyCoord(a, b, frame = 'icrs', unit = 'deg')
-    return coo.separation(cc)
 
 # To check if Galactic latitude is between -30 to 30.
 gal_lat = cc.galactic.b.value
@@ -122,31 +86,21 @@ if -30.0 <= gal_lat <= 30.0:
         gal_warn.write(gal_plane_warning)
     sys.exit(1)
 
-# Reading coordinates and fluxes from catalogue.
-hdu = fits.open(catalogue)
-alpha = hdu[1].data['ra']
-delta = hdu[1].data['dec']
-nuv_flux = hdu[1].data['flux_2365_a']
-fuv_flux = hdu[1].data['flux_1565_a']
+# Fluxes of the sources in the field; one indexed cone query
+# serves both NUV and FUV.
+nuv_flux, fuv_flux = td1_index.fluxes(cc.ra.degree,
+                                      cc.dec.degree,
+                                      field_radius[instrument])
 
 # NUV 
-refined_set = [(al, de, nf) for al, de, nf 
-                            in zip(alpha, delta, nuv_flux)
-                            if (cc.ra.value - 5) <= al <= (cc.ra.value + 5)
-                                and (cc.dec.value - 5) <= de <= (cc.dec.value + 5)]
-
-nalpha, ndelta, nuv_flux = zip(*refined_set)
-
-confined_set = [nf for al, de, nf 
-                   in zip(nalpha, ndelta, nuv_flux) 
-                   if cel_separation(al, de) <= field_radius[instrument] * u.arcsec]
+confined_set = list(nuv_flux)
 
 # If list is empty, normal value need to be taken.
 if len(confined_set) == 0:
     confined_set.append(flux_norm)
 
 nd = sorted(confined_set)[-1]
-flux, ta, tb, tc, td, te = countnuv(nd)
+flux, ta, tb, tc, td, te = td1_countnuv(nd)
 nuv_res = Table([[flux], [ta], [tb], [tc], [td], [te]],
                names = ('flux_2365_a',
                         'silica',
@@ -188,23 +142,14 @@ with open('safe_NUV_filters.txt', 'w') as safe_file:
     safe_file.write(nuv_declaration)
 
 # FUV 
-refined_set = [(al, de, ff) for al, de, ff 
-                            in zip(alpha, delta, fuv_flux)
-                            if (cc.ra.value - 5) <= al <= (cc.ra.value + 5)
-                                and (cc.dec.value - 5) <= de <= (cc.dec.value + 5)]
-
-nalpha, ndelta, fuv_flux = zip(*refined_set)
-
-confined_set = [ff for al, de, ff 
-                   in zip(nalpha, ndelta, fuv_flux) 
-                   if cel_separation(al, de) <= field_radius[instrument] * u.arcsec]
+confined_set = list(fuv_flux)
 
 # If list is empty, normal value need to be taken.
 if len(confined_set) == 0:
     confined_set.append(flux_norm)
 
 fd = sorted(confined_set)[-1]
-flux, ta, tb, tc, td = countfuv(fd)
+flux, ta, tb, tc, td = td1_countfuv(fd)
 fuv_res = Table([[flux], [ta], [tb], [tc], [td]],
                names = ('flux_1565_a',
                         'caf2',
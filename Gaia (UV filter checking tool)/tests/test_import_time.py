@@ -0,0 +1,23 @@
+'''The command line should start quickly and leave the heavy packages
+   to the methods that need them.
+
+'''
+
+from uvcheck.cli import HEAVY_MODULES, IMPORT_BUDGET, probe_import
+
+
+def test_command_line_import():
+    numbers = probe_import()
+    assert numbers['heavy'] == []
+    assert numbers['seconds'] <= IMPORT_BUDGET
+
+def test_heavy_modules_listed():
+    assert set(['astropy', 'matplotlib', 'scipy', 'requests']) <= set(HEAVY_MODULES)
+
+def test_package_imports_nothing():
+    assert probe_import('uvcheck')['loaded'] == []
+
+def test_counts_alone():
+    numbers = probe_import('uvcheck.counts')
+    assert numbers['loaded'] == ['uvcheck.counts']
+    assert numbers['heavy'] == []
@@ -0,0 +1,22 @@
+'''Shared routines for the UVIT FUV and NUV filter checking scripts.
+
+   Nothing is imported here; the scripts import the modules they use
+   (uvcheck.tilecache, uvcheck.counts, ...), so that none pulls in the
+   others.
+
+
+   Copyright 2026 Prajwel Joseph
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+'''
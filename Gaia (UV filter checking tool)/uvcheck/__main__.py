@@ -0,0 +1,8 @@
+'''To run the command line as python -m uvcheck.'''
+
+import sys
+
+from .cli import main
+
+
+sys.exit(main())
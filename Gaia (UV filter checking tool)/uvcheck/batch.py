@@ -0,0 +1,207 @@
+'''Batch mode of the UVIT FUV and NUV filter check.
+
+   The targets are read from a table (CSV, FITS or anything else astropy
+   can read) with ra and dec columns (hh:mm:ss dd:mm:ss) and, optionally,
+   name and instrument columns. They are shared out to a pool of worker
+   processes; every worker keeps one HTTP session, one TD1 index and
+   one GALEX tile index for all the targets it gets, and all of them
+   share the GALEX tile cache. With a sky map (see uvcheck.skymap), the
+   targets it can answer for are not checked; their method is map.
+   The verdicts end up in one table, a row per target. The stages of
+   every check are timed (see uvcheck.stages); their records come back
+   with the rows.
+
+'''
+
+import os
+import numpy as np
+
+from .td1 import TD1Index, TD1_CATALOGUE
+from .tiles import GALEX_TILES
+from .tilecache import TileCache
+from .gaia import CheckError, check_field, load_tile_index, nuv_columns, fuv_columns
+from .stages import Stages
+from .skymap import SkyMap, sky_position
+
+
+# Columns of the consolidated results table.
+count_columns = (['nuv_' + column for column in nuv_columns]
+                 + ['fuv_' + column for column in fuv_columns])
+result_columns = (['name', 'instrument', 'ra', 'dec', 'method', 'catalogue',
+                   'gal_plane', 'fuv_absent']
+                  + count_columns
+                  + ['nuv_safe', 'fuv_safe', 'error'])
+
+# What every worker process keeps between targets.
+worker = {}
+
+
+# Function to set up a worker process.
+def init_worker(download_dir, td1_catalogue = TD1_CATALOGUE,
+                tile_listing = GALEX_TILES, sky_map_file = None):
+    from requests import Session
+
+    worker['session'] = Session()
+    worker['tile_cache'] = TileCache(session = worker['session'])
+    try:
+        worker['td1_index'] = TD1Index.load(os.path.abspath(td1_catalogue))
+    except IOError:
+        worker['td1_index'] = None
+    worker['tile_index'] = load_tile_index(os.path.abspath(tile_listing))
+    worker['sky_map'] = SkyMap.load(sky_map_file) if sky_map_file else None
+
+    # The GALEX products are downloaded here.
+    os.chdir(download_dir)
+
+# Function to turn a sexagesimal string to a number (for sorting).
+def sexagesimal(value):
+    try:
+        parts = [abs(float(part)) for part in value.split(':')]
+        number = parts[0] + parts[1] / 60.0 + parts[2] / 3600.0
+    except (ValueError, IndexError):
+        return 0.0
+    if value.strip().startswith('-'):
+        number = -number
+    return number
+
+# Function to read the target list.
+def read_targets(target_file, instrument = 'uvit'):
+    from astropy.table import Table
+
+    table = Table.read(target_file)
+    columns = dict((name.lower(), name) for name in table.colnames)
+    if 'ra' not in columns or 'dec' not in columns:
+        raise CheckError('The target list needs ra and dec columns.')
+
+    targets = []
+    for i, row in enumerate(table):
+        name = str(row[columns['name']]) if 'name' in columns else str(i + 1)
+        if 'instrument' in columns:
+            target_instrument = str(row[columns['instrument']]).strip().lower()
+        else:
+            target_instrument = instrument
+        targets.append((name,
+                        target_instrument,
+                        str(row[columns['ra']]).strip(),
+                        str(row[columns['dec']]).strip()))
+    return targets
+
+# Function to answer for a target from the sky map, if it can. Returns
+# whether it did.
+def map_target(row, stages):
+    with stages.stage('sky map'):
+        try:
+            ra, dec = sky_position(row['ra'], row['dec'])
+        except (CheckError, ValueError):
+            return False
+        found = worker['sky_map'].lookup(row['instrument'], ra, dec)
+    if found is None:
+        return False
+
+    row['method'] = 'map'
+    for column, rate in zip(nuv_columns, found['nuv_rates']):
+        row['nuv_' + column] = rate
+    for column, rate in zip(fuv_columns, found['fuv_rates']):
+        row['fuv_' + column] = rate
+    row['nuv_safe'] = ' '.join(found['nuv_safe'])
+    row['fuv_safe'] = ' '.join(found['fuv_safe'])
+    row['stages'] = stages.record()
+    return True
+
+# Function to check one target, inside a worker.
+def check_target(target):
+    name, instrument, RA, DEC = target
+    row = dict((column, '') for column in result_columns)
+    row.update({'name': name, 'instrument': instrument, 'ra': RA, 'dec': DEC})
+    for column in count_columns:
+        row[column] = np.nan
+    row['gal_plane'] = False
+    row['fuv_absent'] = False
+
+    stages = Stages(name)
+    if worker.get('sky_map') is not None and map_target(row, stages):
+        return row
+    try:
+        result = check_field(instrument, RA, DEC,
+                             session = worker['session'],
+                             td1_index = worker['td1_index'],
+                             tile_index = worker['tile_index'],
+                             tile_cache = worker['tile_cache'],
+                             make_plots = False,
+                             stages = stages)
+    except CheckError as error:
+        row['error'] = ' '.join(str(error).split())
+        row['stages'] = stages.record()
+        return row
+    except Exception as error:   # A failed target should not stop the batch.
+        row['error'] = '{}: {}'.format(type(error).__name__, error)
+        row['stages'] = stages.record()
+        return row
+    row['stages'] = stages.record()
+
+    row['method'] = result['method']
+    row['catalogue'] = result['catalogue'] or ''
+    row['gal_plane'] = bool(result['gal_plane'])
+    row['fuv_absent'] = bool(result['fuv_absent'])
+
+    # The brightest source in the field decides, so the largest
+    # count rate per filter is kept.
+    for column in nuv_columns:
+        row['nuv_' + column] = float(np.max(result['nuv_res'][column]))
+    for column in fuv_columns:
+        row['fuv_' + column] = float(np.max(result['fuv_res'][column]))
+    row['nuv_safe'] = ' '.join(result['nuv_safe'])
+    row['fuv_safe'] = ' '.join(result['fuv_safe'])
+    return row
+
+# Function to check all the targets. Neighbouring targets are sent to
+# the same worker, so that they can reuse the GALEX tiles. With the
+# file of a sky map, the targets it answers for are not checked.
+def run_batch(targets, processes = None, download_dir = '.', sky_map_file = None):
+    from multiprocessing import Pool, cpu_count
+
+    download_dir = os.path.abspath(download_dir)
+    td1_catalogue = os.path.abspath(TD1_CATALOGUE)
+    tile_listing = os.path.abspath(GALEX_TILES)
+    if sky_map_file:
+        sky_map_file = os.path.abspath(sky_map_file)
+
+    order = sorted(range(len(targets)),
+                   key = lambda k: (int(sexagesimal(targets[k][3])),
+                                    sexagesimal(targets[k][2])))
+    ordered = [targets[k] for k in order]
+
+    if processes == 1:
+        here = os.getcwd()
+        init_worker(download_dir, td1_catalogue, tile_listing, sky_map_file)
+        try:
+            rows = [check_target(target) for target in ordered]
+        finally:
+            os.chdir(here)
+    else:
+        pool = Pool(processes,
+                    initializer = init_worker,
+                    initargs = (download_dir, td1_catalogue, tile_listing, sky_map_file))
+        chunksize = max(1, len(ordered) // (4 * (processes or cpu_count())))
+        try:
+            rows = list(pool.imap(check_target, ordered, chunksize))
+        finally:
+            pool.close()
+            pool.join()
+
+    # Back to the order of the target list.
+    results = [None] * len(targets)
+    for k, row in zip(order, rows):
+        results[k] = row
+    return results
+
+# Function to write the consolidated results table.
+def write_results(rows, results_file):
+    from astropy.table import Table
+
+    table = Table(rows = [[row[column] for column in result_columns] for row in rows],
+                  names = result_columns)
+    for column in count_columns:
+        table[column].format = '4.2f'
+    table.write(results_file, overwrite = True)
+    return table
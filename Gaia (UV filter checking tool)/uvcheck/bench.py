@@ -0,0 +1,406 @@
+'''Offline benchmark of the filter check (python -m uvcheck bench).
+
+   A GALEX tile is made up for the purpose: an mcat with sources of a
+   chosen density, NUV and FUV int maps with the same sources on them,
+   and a tile listing of many tiles pointing at it. The products are
+   served from the disk instead of MAST, and the TD1 catalogue is the
+   one next to the scripts. The check_field() of gaia_V.3.3.py is then
+   run on them, and the times of its stages read from the record it
+   keeps (see uvcheck.stages),
+
+       field centre, tile lookup, download, FITS read, cone selection,
+       count rates, photometry, decision, output (and the TD1 estimate)
+
+   along with that of the whole check. The first round starts from
+   empty caches (cold), the others reuse them (warm). The same seed
+   makes the same fixtures.
+
+   Every run is appended to a history (JSON lines; UVCHECK_BENCH or
+   ~/.uvcheck/bench.jsonl), and compared with the last run of the same
+   settings, so that a version that got slower shows up.
+
+'''
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import numpy as np
+
+from .mcat import MCAT_COLUMNS
+from .counts import NUV_ZPMAG, FUV_ZPMAG
+from .td1 import TD1Index, TD1_CATALOGUE
+from .tiles import TileIndex, TILE_RADIUS
+from .cone import angular_separation
+from .tilecache import TileCache
+from .stages import Stages
+
+
+BENCH_HISTORY = os.environ.get('UVCHECK_BENCH',
+                               os.path.join(os.path.expanduser('~'), '.uvcheck', 'bench.jsonl'))
+
+# Links of the made up products start with this.
+BENCH_LINK = 'bench://'
+
+# Stages of the check, in the order they run.
+stages = ['field centre', 'tile lookup', 'download', 'FITS read', 'cone selection', 'count rates',
+          'photometry', 'decision', 'output', 'td1', 'check_field']
+
+# Settings of a run; runs are only compared with runs of the same ones.
+default_settings = {'ra': 114.2142,        # Field centre (degrees).
+                    'dec': 65.6025,
+                    'instrument': 'uvit',
+                    'density': 4000.0,     # mcat sources per square degree.
+                    'columns': 40,         # Other mcat columns, to be decompressed too.
+                    'pixels': 3840,        # Size of the int maps.
+                    'tiles': 45000,        # Tiles in the listing.
+                    'seed': 1}
+
+# Pixel scale of the GALEX int maps (degrees).
+PIXEL_SCALE = 1.5 / 3600.0
+
+# Sky background of the int maps (counts per second per pixel).
+nuv_background = 1E-3
+fuv_background = 1E-4
+
+
+# Function to turn degrees to the sexagesimal strings the check takes.
+def sexagesimal_strings(ra, dec):
+    def split(value):
+        value = abs(value)
+        whole = int(value)
+        minutes = int((value - whole) * 60.0)
+        seconds = (value - whole - minutes / 60.0) * 3600.0
+        return '{}:{}:{:.3f}'.format(whole, minutes, seconds)
+
+    return split(ra / 15.0), ('-' if dec < 0 else '') + split(dec)
+
+# Function to make up the sources of a tile: positions within the
+# GALEX field of view and magnitudes rising in number towards the
+# faint end, some of them undetected (-999) in FUV.
+def make_sources(ra, dec, density, rng):
+    area = np.pi * TILE_RADIUS ** 2
+    number = rng.poisson(density * area)
+
+    # Uniform over the cap (on the tangent plane; small enough).
+    radius = TILE_RADIUS * np.sqrt(rng.uniform(0, 1, number))
+    angle = rng.uniform(0, 2 * np.pi, number)
+    delta = dec + radius * np.sin(angle)
+    alpha = (ra + radius * np.cos(angle) / np.cos(np.radians(delta))) % 360.0
+
+    nuv_mag = 24.0 - rng.exponential(2.0, number)
+    nuv_mag = np.clip(nuv_mag, 11.0, 25.0)
+    fuv_mag = nuv_mag + rng.normal(1.5, 0.5, number)
+    fuv_mag[rng.uniform(0, 1, number) < 0.3] = -999.0
+    nuv_fwhm = np.abs(rng.normal(0.0015, 0.0005, number))
+    return {'alpha': alpha, 'delta': delta, 'nuv_mag': nuv_mag,
+            'fuv_mag': fuv_mag, 'nuv_fwhm': nuv_fwhm}
+
+# Function to write an mcat of the sources, with the columns the check
+# reads and filler columns to make the table as wide as a real one.
+def write_mcat(file_name, sources, filler, rng):
+    from astropy.io import fits
+
+    columns = [fits.Column(name = column, format = 'D', array = sources[field])
+               for field, column in MCAT_COLUMNS if field in ('alpha', 'delta')]
+    columns += [fits.Column(name = column, format = 'E', array = sources[field])
+                for field, column in MCAT_COLUMNS if field not in ('alpha', 'delta')]
+    number = len(sources['alpha'])
+    for k in range(filler):
+        columns.append(fits.Column(name = 'filler_{}'.format(k), format = 'E',
+                                   array = rng.normal(0, 1, number).astype(np.float32)))
+    fits.HDUList([fits.PrimaryHDU(),
+                  fits.BinTableHDU.from_columns(columns)]).writeto(file_name, overwrite = True)
+
+# Function to write an int map of the sources (counts per second per
+# pixel), a Gaussian of 5 arcsec FWHM each on a Poisson background.
+def write_int_map(file_name, ra, dec, pixels, mag, alpha, delta, zero_point,
+                  background, rng):
+    from astropy.io import fits
+    from astropy.wcs import WCS
+
+    w = WCS(naxis = 2)
+    w.wcs.ctype = ['RA---TAN', 'DEC--TAN']
+    w.wcs.crval = [ra, dec]
+    w.wcs.crpix = [pixels / 2.0 + 0.5, pixels / 2.0 + 0.5]
+    w.wcs.cdelt = [-PIXEL_SCALE, PIXEL_SCALE]
+
+    exposure = 100.0
+    image = rng.poisson(background * exposure, (pixels, pixels)).astype(np.float32) / exposure
+
+    detected = mag > 0
+    x, y = w.all_world2pix(alpha[detected], delta[detected], 0)
+    flux = 10 ** ((zero_point - mag[detected]) / 2.5)
+
+    # The sources are drawn as 9x9 stamps.
+    sigma = 5.0 / 1.5 / 2.3548
+    offsets = np.arange(-4, 5)
+    xc = np.round(x).astype(int)
+    yc = np.round(y).astype(int)
+    for dy in offsets:
+        for dx in offsets:
+            xs = xc + dx
+            ys = yc + dy
+            inside = (xs >= 0) & (xs < pixels) & (ys >= 0) & (ys < pixels)
+            weight = np.exp(-((xs - x) ** 2 + (ys - y) ** 2) / (2 * sigma ** 2)) / (2 * np.pi * sigma ** 2)
+            np.add.at(image, (ys[inside], xs[inside]), (flux * weight)[inside].astype(np.float32))
+
+    header = w.to_header()
+    fits.PrimaryHDU(image, header = header).writeto(file_name, overwrite = True)
+
+# Function to write a tile listing of many tiles over the sky, the
+# first of them being the made up one (the others have no products
+# and stay clear of it).
+def write_listing(file_name, ra, dec, tiles, products, rng):
+    from astropy.table import Table
+
+    ras = rng.uniform(0, 360, tiles - 1)
+    decs = np.degrees(np.arcsin(rng.uniform(-1, 1, tiles - 1)))
+
+    # Nothing else may cover the field.
+    far = angular_separation(ras, decs, ra, dec) > 2 * TILE_RADIUS * 3600.0
+    ras = np.concatenate([[ra], ras[far]])
+    decs = np.concatenate([[dec], decs[far]])
+    tiles = len(ras)
+    names = ['BENCH_{:05d}'.format(k) for k in range(tiles)]
+
+    mcat = [''] * tiles
+    nuv_int = [''] * tiles
+    fuv_int = [''] * tiles
+    mcat[0], nuv_int[0], fuv_int[0] = products
+    Table([names, ras, decs, mcat, nuv_int, fuv_int],
+          names = ('tilename', 'ra_cent', 'dec_cent', 'mcat', 'nuv_int', 'fuv_int')).write(
+          file_name, format = 'ascii.csv', overwrite = True)
+
+# Function to make the fixtures of a run in fixture_dir. Returns the
+# tile listing and the links of the products.
+def make_fixtures(fixture_dir, settings):
+    rng = np.random.RandomState(settings['seed'])
+    ra, dec = settings['ra'], settings['dec']
+    sources = make_sources(ra, dec, settings['density'], rng)
+
+    stem = 'BENCH_00000'
+    mcat_name = stem + '-xd-mcat.fits.gz'
+    nuv_name = stem + '-nd-int.fits.gz'
+    fuv_name = stem + '-fd-int.fits.gz'
+    write_mcat(os.path.join(fixture_dir, mcat_name), sources, settings['columns'], rng)
+    write_int_map(os.path.join(fixture_dir, nuv_name), ra, dec, settings['pixels'],
+                  sources['nuv_mag'], sources['alpha'], sources['delta'],
+                  NUV_ZPMAG, nuv_background, rng)
+    write_int_map(os.path.join(fixture_dir, fuv_name), ra, dec, settings['pixels'],
+                  sources['fuv_mag'], sources['alpha'], sources['delta'],
+                  FUV_ZPMAG, fuv_background, rng)
+
+    products = [BENCH_LINK + name for name in [mcat_name, nuv_name, fuv_name]]
+    listing = os.path.join(fixture_dir, 'bench_tiles.csv')
+    write_listing(listing, ra, dec, settings['tiles'], products, rng)
+    return listing, products
+
+
+# Response of LocalSession, as much of requests' as mast.download() uses.
+class LocalResponse(object):
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.bytes = 0
+
+    def raise_for_status(self):
+        if not os.path.exists(self.file_name):
+            raise IOError('No such product: {}'.format(self.file_name))
+
+    def iter_content(self, chunk_size):
+        with open(self.file_name, 'rb') as f:
+            chunk = f.read(chunk_size)
+            while chunk:
+                self.bytes += len(chunk)
+                yield chunk
+                chunk = f.read(chunk_size)
+
+    def close(self):
+        pass
+
+
+# Session serving the made up products from the fixture directory.
+class LocalSession(object):
+
+    def __init__(self, fixture_dir):
+        self.fixture_dir = fixture_dir
+
+    def get(self, link, stream = False, timeout = None):
+        return LocalResponse(os.path.join(self.fixture_dir, link[len(BENCH_LINK):]))
+
+
+# Function to run the check once, in work_dir (the tile cache and the
+# sidecar files start there empty). Returns the seconds taken by every
+# stage, as check_field() records them (see uvcheck.stages), and by
+# the whole of it.
+def run_stages(settings, listing, fixture_dir, work_dir):
+    from . import gaia
+
+    check_stages = Stages('bench')
+    instrument = settings['instrument']
+    RA, DEC = sexagesimal_strings(settings['ra'], settings['dec'])
+    here = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        session = LocalSession(fixture_dir)
+        tile_cache = TileCache(cache_dir = os.path.join(work_dir, 'tiles'), session = session)
+
+        # The indexes are built as the scripts build them, once.
+        with check_stages.stage('tile lookup'):
+            tile_index = TileIndex.load(listing, os.path.join(work_dir, 'bench_tiles_index.npz'))
+        td1_catalogue = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     TD1_CATALOGUE)
+        with check_stages.stage('td1'):
+            td1_index = TD1Index.load(td1_catalogue, os.path.join(work_dir, 'td1_index.npz'))
+
+        # The whole check, as the script runs it.
+        start = time.time()
+        result = gaia.check_field(instrument, RA, DEC,
+                                  session = session,
+                                  td1_index = td1_index,
+                                  tile_index = tile_index,
+                                  tile_cache = tile_cache,
+                                  make_plots = False,
+                                  stages = check_stages)
+        seconds = time.time() - start
+
+        with check_stages.stage('output'):
+            gaia.write_outputs(result, False)
+
+        # The field has a tile, so the TD1 estimate is made on its own.
+        with check_stages.stage('td1'):
+            gaia.td1_estimate(td1_index, gaia.field_centre(RA, DEC), instrument)
+    finally:
+        os.chdir(here)
+
+    times = dict((stage, 0.0) for stage in stages)
+    for entry in check_stages.record()['stages']:
+        times[entry['name']] = entry['seconds']
+    times['check_field'] = seconds
+    return times
+
+# Function to make the numbers of a run from the times of its rounds:
+# the first (cold) round, the best and the median of the others.
+def summarise(rounds):
+    numbers = {}
+    for stage in stages:
+        warm = sorted(times[stage] for times in rounds[1:])
+        numbers[stage] = {'cold': rounds[0][stage],
+                          'best': warm[0] if warm else rounds[0][stage],
+                          'median': warm[len(warm) // 2] if warm else rounds[0][stage]}
+    return numbers
+
+# Function to describe the code being timed, so that runs of different
+# versions can be told apart.
+def code_version():
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output(['git', 'describe', '--always', '--dirty'],
+                                             cwd = here, stderr = devnull)
+        return output.decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Function to list the versions of what the check runs on.
+def environment():
+    import astropy
+
+    return {'python': platform.python_version(),
+            'numpy': np.__version__,
+            'astropy': astropy.__version__,
+            'machine': platform.machine(),
+            'system': platform.system()}
+
+# Function to run the benchmark. Returns the record of the run.
+def run_bench(settings = None, rounds = 3, label = None, work_dir = None, keep = False):
+    run_settings = dict(default_settings)
+    run_settings.update(settings or {})
+
+    top = work_dir or tempfile.mkdtemp(prefix = 'uvcheck-bench-')
+    fixture_dir = os.path.join(top, 'fixtures')
+    if not os.path.isdir(fixture_dir):
+        os.makedirs(fixture_dir)
+    try:
+        listing, products = make_fixtures(fixture_dir, run_settings)
+        times = []
+        for k in range(rounds):
+            round_dir = os.path.join(top, 'round')
+            if k == 0 and os.path.isdir(round_dir):
+                shutil.rmtree(round_dir)
+            if not os.path.isdir(round_dir):
+                os.makedirs(round_dir)
+            times.append(run_stages(run_settings, listing, fixture_dir, round_dir))
+    finally:
+        if not keep and work_dir is None:
+            shutil.rmtree(top, ignore_errors = True)
+
+    return {'time': time.time(),
+            'label': label,
+            'version': code_version(),
+            'environment': environment(),
+            'settings': run_settings,
+            'rounds': rounds,
+            'stages': summarise(times)}
+
+# Function to read the history of runs.
+def read_history(history_file = None):
+    history_file = history_file or BENCH_HISTORY
+    records = []
+    if not os.path.exists(history_file):
+        return records
+    with open(history_file) as history:
+        for line in history:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+# Function to append a run to the history.
+def append_history(record, history_file = None):
+    history_file = history_file or BENCH_HISTORY
+    history_dir = os.path.dirname(os.path.abspath(history_file))
+    if not os.path.isdir(history_dir):
+        os.makedirs(history_dir)
+    with open(history_file, 'a') as history:
+        history.write(json.dumps(record, sort_keys = True) + '\n')
+
+# Function to find the last run of the same settings in the history.
+def last_run(records, settings):
+    for record in reversed(records):
+        if record['settings'] == settings:
+            return record
+    return None
+
+# Function to compare a run with an earlier one. Returns the stages
+# whose best warm time went up by more than tolerance (a fraction).
+def regressions(record, earlier, tolerance):
+    slower = []
+    for stage in stages:
+        new = record['stages'][stage]['best']
+        old = earlier['stages'].get(stage, {}).get('best')
+        if old and new > old * (1.0 + tolerance):
+            slower.append(stage)
+    return slower
+
+# Function to print a run, next to an earlier one if given.
+def print_run(record, earlier = None, out = sys.stdout):
+    out.write('{:<16}{:>10}{:>10}{:>10}'.format('stage', 'cold', 'best', 'median'))
+    out.write('{:>10}{:>8}\n'.format('before', 'ratio') if earlier else '\n')
+    for stage in stages:
+        numbers = record['stages'][stage]
+        out.write('{:<16}{:>10.4f}{:>10.4f}{:>10.4f}'.format(stage,
+                                                             numbers['cold'],
+                                                             numbers['best'],
+                                                             numbers['median']))
+        old = earlier['stages'].get(stage, {}).get('best') if earlier else None
+        if old:
+            out.write('{:>10.4f}{:>8.2f}\n'.format(old, numbers['best'] / old))
+        else:
+            out.write('\n')
@@ -0,0 +1,612 @@
+'''Command line of the UVIT FUV and NUV filter check.
+
+       python -m uvcheck check uvit 7:36:51.396 65:36:9.170
+       python -m uvcheck check uvit 7:36:51.396 65:36:9.170 --method image
+       python -m uvcheck batch targets.csv results.csv --processes 8
+       python -m uvcheck cache
+       python -m uvcheck verdicts --evict 30
+       python -m uvcheck stages */stages.json
+       python -m uvcheck galex-store --import ais.vot mis.vot --whole-sky
+       python -m uvcheck sky-map --build
+       python -m uvcheck sky-map 7:36:51.396 65:36:9.170
+       python -m uvcheck serve --port 8737
+       python -m uvcheck standin cassette --record
+       python -m uvcheck import-time
+       python -m uvcheck bench --rounds 5
+
+   check runs one of the methods (GALEX catalogue, GALEX image, TD1
+   catalogue or VizieR), or decides between the first three as
+   gaia_V.3.3.py does, and writes the same files. A field checked
+   before is answered from the verdict cache (see uvcheck.verdicts)
+   unless --refresh or --no-cache is given. The stages of a check are
+   timed into stages.json, those of a batch into <results>_stages.json;
+   stages sums such files up (see uvcheck.stages). Nothing heavier than
+   NumPy is imported before a method needs it; import-time checks that
+   this stays so. bench times the stages of the check on made up
+   GALEX products, offline (see uvcheck.bench). galex-store fills the
+   local copy of the GALEX catalogue the VizieR method reads from (see
+   uvcheck.galexstore). sky-map builds the all-sky map of the safe
+   filters from TD1 and that copy, and looks fields up in it (see
+   uvcheck.skymap); batch --sky-map answers from it where it can.
+   standin answers for the GALEX and UVIT sites from recorded
+   exchanges, with delays and faults if asked (see uvcheck.standin).
+
+'''
+
+import os
+import sys
+import time
+import argparse
+
+from .figures import FIGURE_MODE, FIGURE_DPI, figure_modes
+from .skymap import MAP_MARGIN, NSIDE, SKY_MAP
+from .td1 import TD1_CATALOGUE
+
+# Methods of the check command.
+methods = ['auto', 'catalogue', 'image', 'td1', 'vizier']
+
+# Packages that should not be imported by the command line itself.
+HEAVY_MODULES = ['astropy', 'astroquery', 'matplotlib', 'skimage', 'scipy',
+                 'bs4', 'requests']
+
+# Seconds the command line may take to import (see import-time).
+IMPORT_BUDGET = 1.0
+
+
+# Function to check one field and write its tables and safe filters.
+# A stored verdict of the field is used unless asked otherwise.
+def check(args):
+    from .verdicts import VerdictCache
+    from .figures import Renderer
+    from .stages import Stages
+    from .gaia import (CheckError, check_field, verdict, cacheable, write_notes,
+                       write_outputs, write_verdict)
+
+    # To do all the stuff in a specific directory.
+    os.chdir(args.dir)
+
+    # An error file.
+    error_file = open('error.txt', 'w')
+
+    # The stages of the check are timed into stages.json.
+    stages = Stages()
+
+    # The pyramid search may find other sources; its verdicts are not kept.
+    verdict_cache = VerdictCache(max_days = 0 if args.no_cache or args.pyramid else None)
+    answer = None
+    if not args.refresh:
+        with stages.stage('verdict cache'):
+            answer = verdict_cache.get(args.instrument, args.RA, args.DEC, args.method)
+
+    if answer is not None:
+        if not args.quiet:
+            print('Verdict of {} (from the verdict cache).'.format(
+                  time.strftime('%Y-%m-%d %H:%M', time.localtime(answer['checked']))))
+        error_file.close()
+        with stages.stage('output'):
+            write_verdict(answer, not args.quiet)
+        method = answer['method']
+    else:
+        # The marked images are drawn while the check goes on, and
+        # written after the verdict.
+        renderer = Renderer('off' if args.no_plots else args.figures, args.dpi)
+        try:
+            if args.method == 'image':
+                from .image import check_image
+                with stages.stage('check'):
+                    result = check_image(args.instrument, args.RA, args.DEC,
+                                         make_plots = not args.no_plots,
+                                         renderer = renderer,
+                                         pyramid = args.pyramid)
+            elif args.method == 'vizier':
+                from .vizier import check_vizier
+                with stages.stage('check', 'network'):
+                    result = check_vizier(args.instrument, args.RA, args.DEC)
+            else:
+                result = check_field(args.instrument, args.RA, args.DEC,
+                                     make_plots = not args.no_plots,
+                                     method = None if args.method == 'auto' else args.method,
+                                     renderer = renderer,
+                                     stages = stages)
+        except CheckError as error:
+            renderer.close()
+            write_notes(error.notes, not args.quiet)
+            print('\n{}\n'.format(error))
+            error_file.write(str(error))
+            error_file.close()
+            stages.write()
+            return 1
+        except Exception:
+            renderer.close()
+            raise
+        error_file.close()
+
+        with stages.stage('output'):
+            write_outputs(result, not args.quiet)
+        answer = verdict(result)
+        if cacheable(answer):
+            with stages.stage('verdict cache'):
+                verdict_cache.put(args.instrument, args.RA, args.DEC, args.method, answer)
+        method = result['method']
+        with stages.stage('figures'):
+            renderer.close()
+
+    stages.write()
+
+    # The TD1 estimates are flagged by the exit status.
+    if method == 'td1':
+        return 1
+
+    if not args.quiet:
+        print('Done!\n')
+    return 0
+
+# Function to check the fields of a target list.
+def batch(args):
+    from .gaia import CheckError
+    from .tilecache import TileCache
+    from .batch import read_targets, run_batch, write_results
+    from .stages import summarise, print_summary, stages_file_name, write_batch
+
+    try:
+        targets = read_targets(args.targets, args.instrument)
+    except (CheckError, IOError) as error:
+        print('\n{}\n'.format(error))
+        return 1
+
+    if args.sky_map is not None and not os.path.exists(args.sky_map):
+        print('\nNo sky map at {}; build it with sky-map --build.\n'.format(args.sky_map))
+        return 1
+
+    tile_cache = TileCache()
+    before = tile_cache.stats()
+
+    print('\nChecking {} targets.\n'.format(len(targets)))
+    rows = run_batch(targets, args.processes, args.download_dir, args.sky_map)
+    write_results(rows, args.results)
+
+    failed = sum(1 for row in rows if row['error'])
+    mapped = sum(1 for row in rows if row['method'] == 'map')
+    print('{} checked ({} from the sky map), {} failed. Results in {}\n'.format(
+          len(rows) - failed, mapped, failed, args.results))
+
+    # The stages of all the checks, summed up if asked.
+    records = [row['stages'] for row in rows if 'stages' in row]
+    write_batch(records, stages_file_name(args.results))
+    if args.summary:
+        print_summary(summarise(records))
+
+    if tile_cache.enabled:
+        after = tile_cache.stats()
+        print('GALEX tile cache: {} hits, {} misses, {:.1f} MB downloaded, {:.1f} MB saved.\n'.format(
+              after['hits'] - before['hits'],
+              after['misses'] - before['misses'],
+              (after['bytes_downloaded'] - before['bytes_downloaded']) / 1048576.0,
+              (after['bytes_saved'] - before['bytes_saved']) / 1048576.0))
+    return 0
+
+# Function to show (or clear) the numbers of the GALEX tile cache.
+def cache(args):
+    from .tilecache import TileCache
+
+    tile_cache = TileCache()
+    if not tile_cache.enabled:
+        print('The GALEX tile cache is off (UVCHECK_CACHE_MB=0).')
+        return 0
+    if args.clear_stats:
+        tile_cache.clear_stats()
+    numbers = tile_cache.stats()
+    print('GALEX tile cache: {}'.format(tile_cache.cache_dir))
+    print('{} tiles, {:.1f} MB of {:.1f} MB.'.format(numbers['tiles'],
+                                                     numbers['bytes'] / 1048576.0,
+                                                     tile_cache.max_bytes / 1048576.0))
+    print('{} hits, {} misses, {} evictions, {:.1f} MB downloaded, {:.1f} MB saved.'.format(
+          numbers['hits'],
+          numbers['misses'],
+          numbers['evictions'],
+          numbers['bytes_downloaded'] / 1048576.0,
+          numbers['bytes_saved'] / 1048576.0))
+    return 0
+
+# Function to show the numbers of the verdict cache, or drop verdicts.
+def verdicts(args):
+    from .verdicts import VerdictCache
+
+    verdict_cache = VerdictCache()
+    if not verdict_cache.enabled:
+        print('The verdict cache is off (UVCHECK_VERDICT_DAYS=0).')
+        return 0
+
+    if args.forget is not None:
+        try:
+            gone = verdict_cache.forget(args.instrument, args.forget[0], args.forget[1],
+                                        args.method, args.version)
+        except ValueError as error:
+            print('\n{}\n'.format(error))
+            return 1
+        print('{} verdicts forgotten.'.format(gone))
+    elif args.clear or args.method or args.version or args.instrument:
+        gone = verdict_cache.forget(args.instrument, method = args.method, version = args.version)
+        print('{} verdicts forgotten.'.format(gone))
+    if args.evict is not None:
+        print('{} verdicts evicted.'.format(verdict_cache.evict(args.evict)))
+    if args.clear_stats:
+        verdict_cache.clear_stats()
+
+    numbers = verdict_cache.stats()
+    print('Verdict cache: {}'.format(verdict_cache.db_file))
+    print('{} verdicts, kept {:g} days, pointings within {:g} arcsec.'.format(
+          numbers['verdicts'], verdict_cache.max_age / 86400.0, verdict_cache.arcsec))
+    print('{} hits, {} misses, {} evictions.'.format(numbers['hits'],
+                                                    numbers['misses'],
+                                                    numbers['evictions']))
+    return 0
+
+# Function to sum up the stages files of checks (or batches).
+def stages(args):
+    from .stages import read_records, summarise, print_summary
+
+    try:
+        records = read_records(args.files)
+    except (IOError, ValueError) as error:
+        print('\n{}\n'.format(error))
+        return 1
+    print_summary(summarise(records))
+    return 0
+
+# Function to fill the local copy of the GALEX catalogue and show its
+# numbers.
+def galex_store(args):
+    from .galexstore import GalexStore
+    from .gaia import CheckError, field_centre, field_radius
+
+    store = GalexStore(args.store_dir)
+    radius = args.radius or field_radius.get(args.instrument)
+    try:
+        if args.import_files:
+            cone = None
+            if args.cone is not None:
+                cc = field_centre(*args.cone)
+                cone = (cc.ra.deg, cc.dec.deg, radius)
+            written = store.import_dumps(args.import_files, cone, args.format, args.whole_sky)
+            print('{} partitions imported.'.format(written))
+        if args.fetch is not None:
+            cc = field_centre(*args.fetch)
+            present, missing = store.split(cc.ra.deg, cc.dec.deg, radius)
+            print('{} partitions fetched from VizieR.'.format(store.fetch(missing)))
+    except (CheckError, IOError, KeyError, ValueError) as error:
+        print('\n{}\n'.format(error))
+        return 1
+
+    partitions = store.partitions()
+    sources = 0
+    size = 0
+    for pixel in partitions:
+        columns = store.read(pixel)
+        sources += len(columns['RAJ2000'])
+        size += sum(column.nbytes for column in columns.values())
+    print('GALEX catalogue store: {} (NSIDE {})'.format(store.store_dir, store.nside))
+    print('{} partitions, {} sources, {:.1f} MB.'.format(len(partitions), sources,
+                                                         size / 1048576.0))
+    return 0
+
+# Function to build the sky map, or look a field up in it.
+def sky_map(args):
+    from .gaia import CheckError
+    from .skymap import (SkyMap, SKY_MAP, build_sky_map, save_sky_map, sky_position,
+                         nuv_map_filters, fuv_map_filters)
+
+    file_name = args.file or SKY_MAP
+    if args.build:
+        from .galexstore import open_store
+
+        start = time.time()
+        try:
+            arrays = build_sky_map(args.nside, args.td1, open_store(args.store_dir))
+        except (IOError, ValueError) as error:
+            print('\n{}\n'.format(error))
+            return 1
+        save_sky_map(arrays, file_name)
+        print('Sky map of NSIDE {} in {} ({:.1f} MB, {:.1f} s).'.format(
+              args.nside, file_name, os.path.getsize(file_name) / 1048576.0, time.time() - start))
+        print('GALEX store covers {} of {} pixels.'.format(
+              int(arrays['covered'].any(axis = 0).sum()), arrays['covered'].shape[1]))
+        return 0
+
+    if not args.position:
+        print('\nGive RA DEC to look up, or --build.\n')
+        return 1
+    try:
+        ra, dec = sky_position(*args.position)
+        sky = SkyMap.load(file_name)
+    except (CheckError, IOError) as error:
+        print('\n{}\n'.format(error))
+        return 1
+    start = time.time()
+    found = sky.lookup(args.instrument, ra, dec, args.margin)
+    seconds = time.time() - start
+    if found is None:
+        print('\nNear the limits (or not mapped); check the field in full.\n')
+        return 2
+    print('\nNUV safe filters: {}'.format(', '.join(found['nuv_safe']) or 'none'))
+    print('NUV unsafe filters: {}'.format(
+          ', '.join(name for name in nuv_map_filters if name not in found['nuv_safe']) or 'none'))
+    print('FUV safe filters: {}'.format(', '.join(found['fuv_safe']) or 'none'))
+    print('FUV unsafe filters: {}'.format(
+          ', '.join(name for name in fuv_map_filters if name not in found['fuv_safe']) or 'none'))
+    print('Looked up in {:.1f} microseconds.\n'.format(seconds * 1E6))
+    return 0
+
+# Function to run the filter check service.
+def serve(args):
+    from .server import serve
+
+    serve(args.host, args.port, args.dir, not args.quiet)
+    return 0
+
+# Function to run the stand-in of the GALEX and UVIT sites.
+def standin(args):
+    from .standin import Faults, serve_standin
+
+    faults = Faults(args.latency / 1000.0, args.jitter / 1000.0, args.bandwidth,
+                    args.error_rate, args.drop_rate, args.seed)
+    numbers = serve_standin(args.cassette, args.host, args.port, faults,
+                            args.record, not args.quiet)
+    print('\n' + ', '.join('{} {}'.format(key, numbers[key])
+                           for key in ['replayed', 'recorded', 'missed', 'errors', 'dropped']))
+    return 0
+
+# Function to time the import of a module (the command line by
+# default) in a fresh interpreter. Returns the seconds it took, the
+# heavy packages and the uvcheck modules it pulled in.
+def probe_import(module = 'uvcheck.cli'):
+    import json
+    import subprocess
+
+    probe = ('import sys, time, json\n'
+             'start = time.time()\n'
+             'import {}\n'
+             'seconds = time.time() - start\n'
+             'heavy = sorted(set(name.split(".")[0] for name in sys.modules)\n'
+             '               & set({}))\n'
+             'loaded = sorted(name for name in sys.modules if name.startswith("uvcheck."))\n'
+             'print(json.dumps({{"seconds": seconds, "heavy": heavy, "loaded": loaded}}))\n'
+             ).format(module, HEAVY_MODULES)
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', probe], cwd = here)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+# Function to time the import of the command line and list the heavy
+# packages it pulled in. Fails if it went over the budget or pulled
+# any in (tests/test_import_time.py checks the same).
+def import_time(args):
+    numbers = probe_import()
+    print('import uvcheck.cli: {:.3f} s (budget {:.3f} s)'.format(numbers['seconds'], args.budget))
+    if numbers['heavy']:
+        print('Heavy packages imported: {}'.format(', '.join(numbers['heavy'])))
+        return 1
+    if numbers['seconds'] > args.budget:
+        return 1
+    return 0
+
+# Function to benchmark the check offline and keep the numbers.
+def bench(args):
+    from . import bench
+
+    settings = dict((key, getattr(args, key)) for key in bench.default_settings
+                    if getattr(args, key) is not None)
+    record = bench.run_bench(settings, args.rounds, args.label, args.work_dir, args.keep)
+
+    history_file = args.history or bench.BENCH_HISTORY
+    earlier = bench.last_run(bench.read_history(history_file), record['settings'])
+    print('Benchmark of {} (seconds, {} rounds):\n'.format(record['version'] or 'this version',
+                                                         record['rounds']))
+    bench.print_run(record, earlier)
+    if not args.no_history:
+        bench.append_history(record, history_file)
+
+    if earlier is not None and args.tolerance is not None:
+        slower = bench.regressions(record, earlier, args.tolerance / 100.0)
+        if slower:
+            print('\nSlower than before ({}): {}'.format(earlier['version'] or earlier['label'],
+                                                        ', '.join(slower)))
+            return 1
+    return 0
+
+
+# Function to build the argument parser.
+def make_parser():
+    parser = argparse.ArgumentParser(prog = 'python -m uvcheck',
+                                     description = 'UVIT FUV and NUV filter check.')
+    commands = parser.add_subparsers(dest = 'command')
+
+    check_parser = commands.add_parser('check', help = 'check one field')
+    check_parser.add_argument('instrument', help = 'uvit, sxt, czti or laxpc')
+    check_parser.add_argument('RA', help = 'like 7:36:51.396')
+    check_parser.add_argument('DEC', help = 'like 65:36:9.170')
+    check_parser.add_argument('--method', choices = methods, default = 'auto',
+                              help = 'method to use (default: auto, as gaia_V.3.3.py)')
+    check_parser.add_argument('--dir', default = '.',
+                              help = 'where the files are written')
+    check_parser.add_argument('--no-plots', action = 'store_true',
+                              help = 'do not save the marked images (same as --figures off)')
+    check_parser.add_argument('--figures', choices = figure_modes, default = None,
+                              help = 'draw the marked images now, in the background '
+                                     'or not at all (default: {})'.format(FIGURE_MODE))
+    check_parser.add_argument('--dpi', type = int, default = None,
+                              help = 'resolution of the marked images (default: {})'.format(FIGURE_DPI))
+    check_parser.add_argument('--pyramid', action = 'store_true',
+                              help = 'search large images at half resolution (image method)')
+    check_parser.add_argument('--quiet', action = 'store_true',
+                              help = 'only write the files')
+    check_parser.add_argument('--refresh', action = 'store_true',
+                              help = 'check again and replace the stored verdict')
+    check_parser.add_argument('--no-cache', action = 'store_true',
+                              help = 'neither use nor store a verdict')
+    check_parser.set_defaults(run = check)
+
+    batch_parser = commands.add_parser('batch', help = 'check the fields of a target list')
+    batch_parser.add_argument('targets', help = 'target list (CSV, FITS, ...)')
+    batch_parser.add_argument('results', help = 'consolidated results table (CSV, FITS, ...)')
+    batch_parser.add_argument('--instrument', default = 'uvit',
+                              help = 'instrument when the target list has none (default: uvit)')
+    batch_parser.add_argument('--processes', type = int, default = None,
+                              help = 'number of worker processes (default: number of CPUs)')
+    batch_parser.add_argument('--download-dir', default = '.',
+                              help = 'where the GALEX products are downloaded')
+    batch_parser.add_argument('--summary', action = 'store_true',
+                              help = 'sum up the stages of the checks by kind of work')
+    batch_parser.add_argument('--sky-map', nargs = '?', const = SKY_MAP, default = None,
+                              help = 'answer from the sky map where it can '
+                                     '(default: UVCHECK_SKY_MAP or ~/.uvcheck/skymap.npz)')
+    batch_parser.set_defaults(run = batch)
+
+    cache_parser = commands.add_parser('cache', help = 'numbers of the GALEX tile cache')
+    cache_parser.add_argument('--clear-stats', action = 'store_true',
+                              help = 'reset the hit and miss counts')
+    cache_parser.set_defaults(run = cache)
+
+    verdicts_parser = commands.add_parser('verdicts', help = 'numbers of the verdict cache')
+    verdicts_parser.add_argument('--forget', nargs = 2, metavar = ('RA', 'DEC'),
+                                 help = 'drop the verdicts of a field')
+    verdicts_parser.add_argument('--instrument', help = 'only those of an instrument')
+    verdicts_parser.add_argument('--method', choices = methods,
+                                 help = 'only those of a method')
+    verdicts_parser.add_argument('--version', help = 'only those of a catalogue version')
+    verdicts_parser.add_argument('--clear', action = 'store_true',
+                                 help = 'drop all the verdicts')
+    verdicts_parser.add_argument('--evict', type = float, metavar = 'DAYS',
+                                 help = 'drop the verdicts older than DAYS')
+    verdicts_parser.add_argument('--clear-stats', action = 'store_true',
+                                 help = 'reset the hit and miss counts')
+    verdicts_parser.set_defaults(run = verdicts)
+
+    stages_parser = commands.add_parser('stages', help = 'sum up the stages of checks')
+    stages_parser.add_argument('files', nargs = '+',
+                               help = 'stages files of checks or batches')
+    stages_parser.set_defaults(run = stages)
+
+    store_parser = commands.add_parser('galex-store',
+                                       help = 'fill the local copy of the GALEX catalogue')
+    store_parser.add_argument('--import', dest = 'import_files', nargs = '+', default = None,
+                              metavar = 'DUMP', help = 'VizieR dumps of II/312 to import')
+    store_parser.add_argument('--format', default = None,
+                              help = 'table format of the dumps (default: guessed)')
+    dump_group = store_parser.add_mutually_exclusive_group()
+    dump_group.add_argument('--cone', nargs = 2, default = None, metavar = ('RA', 'DEC'),
+                            help = 'the dumps are of the field around RA DEC (of --radius)')
+    dump_group.add_argument('--whole-sky', action = 'store_true',
+                            help = 'the dumps are of whole surveys, every partition they reach is whole')
+    store_parser.add_argument('--fetch', nargs = 2, default = None, metavar = ('RA', 'DEC'),
+                              help = 'get the partitions of the field missing from VizieR')
+    store_parser.add_argument('--instrument', default = 'uvit',
+                              help = 'field size of --cone and --fetch (default: uvit)')
+    store_parser.add_argument('--radius', type = float, default = None, metavar = 'ARCSEC',
+                              help = 'field radius of --cone and --fetch (default: the instrument\'s)')
+    store_parser.add_argument('--dir', dest = 'store_dir', default = None,
+                              help = 'where the store is (default: UVCHECK_GALEX_STORE or ~/.uvcheck/galex)')
+    store_parser.set_defaults(run = galex_store)
+
+    map_parser = commands.add_parser('sky-map', help = 'build or look up the all-sky map of safe filters')
+    map_parser.add_argument('position', nargs = '*', metavar = 'RA DEC',
+                            help = 'field to look up (hh:mm:ss dd:mm:ss)')
+    map_parser.add_argument('--instrument', default = 'uvit',
+                            help = 'uvit, sxt, czti or laxpc (default: uvit)')
+    map_parser.add_argument('--margin', type = float, default = MAP_MARGIN,
+                            help = 'factor the rates should be off the limits '
+                                   '(default: {})'.format(MAP_MARGIN))
+    map_parser.add_argument('--build', action = 'store_true',
+                            help = 'build the map from TD1 and the GALEX store')
+    map_parser.add_argument('--nside', type = int, default = NSIDE,
+                            help = 'resolution of the map (default: {})'.format(NSIDE))
+    map_parser.add_argument('--td1', default = TD1_CATALOGUE,
+                            help = 'TD1 catalogue (default: {})'.format(TD1_CATALOGUE))
+    map_parser.add_argument('--store', dest = 'store_dir', default = None,
+                            help = 'GALEX store (default: UVCHECK_GALEX_STORE or ~/.uvcheck/galex)')
+    map_parser.add_argument('--file', default = None,
+                            help = 'the map (default: UVCHECK_SKY_MAP or ~/.uvcheck/skymap.npz)')
+    map_parser.set_defaults(run = sky_map)
+
+    serve_parser = commands.add_parser('serve', help = 'run the filter check service')
+    serve_parser.add_argument('--host', default = '127.0.0.1',
+                              help = 'address to listen on (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type = int, default = 8737,
+                              help = 'port to listen on (default: 8737)')
+    serve_parser.add_argument('--dir', default = '.',
+                              help = 'where the GALEX products are downloaded')
+    serve_parser.add_argument('--quiet', action = 'store_true',
+                              help = 'do not log the requests')
+    serve_parser.set_defaults(run = serve)
+
+    standin_parser = commands.add_parser('standin',
+                                         help = 'stand in for the GALEX and UVIT sites')
+    standin_parser.add_argument('cassette', help = 'directory of the recorded exchanges')
+    standin_parser.add_argument('--record', action = 'store_true',
+                                help = 'ask the real sites what is not in the cassette, and keep it')
+    standin_parser.add_argument('--host', default = '127.0.0.1',
+                                help = 'address to listen on (default: 127.0.0.1)')
+    standin_parser.add_argument('--port', type = int, default = 8738,
+                                help = 'port to listen on (default: 8738)')
+    standin_parser.add_argument('--latency', type = float, default = 0.0, metavar = 'MS',
+                                help = 'wait before every answer (default: 0)')
+    standin_parser.add_argument('--jitter', type = float, default = 0.0, metavar = 'MS',
+                                help = 'vary the wait by up to this much (default: 0)')
+    standin_parser.add_argument('--bandwidth', type = float, default = None, metavar = 'MB/S',
+                                help = 'send the answers no faster than this')
+    standin_parser.add_argument('--error-rate', type = float, default = 0.0,
+                                help = 'share of the requests answered with 503 (default: 0)')
+    standin_parser.add_argument('--drop-rate', type = float, default = 0.0,
+                                help = 'share of the requests left unanswered (default: 0)')
+    standin_parser.add_argument('--seed', type = int, default = 0,
+                                help = 'seed of the delays and faults (default: 0)')
+    standin_parser.add_argument('--quiet', action = 'store_true',
+                                help = 'do not log the requests')
+    standin_parser.set_defaults(run = standin)
+
+    time_parser = commands.add_parser('import-time',
+                                      help = 'check that the command line starts fast')
+    time_parser.add_argument('--budget', type = float, default = IMPORT_BUDGET,
+                             help = 'seconds allowed (default: {})'.format(IMPORT_BUDGET))
+    time_parser.set_defaults(run = import_time)
+
+    bench_parser = commands.add_parser('bench', help = 'time the stages of the check offline')
+    bench_parser.add_argument('--rounds', type = int, default = 3,
+                              help = 'rounds to run, the first one cold (default: 3)')
+    bench_parser.add_argument('--density', type = float, default = None,
+                              help = 'mcat sources per square degree (default: 4000)')
+    bench_parser.add_argument('--columns', type = int, default = None,
+                              help = 'other mcat columns (default: 40)')
+    bench_parser.add_argument('--pixels', type = int, default = None,
+                              help = 'size of the int maps (default: 3840)')
+    bench_parser.add_argument('--tiles', type = int, default = None,
+                              help = 'tiles in the listing (default: 45000)')
+    bench_parser.add_argument('--instrument', default = None,
+                              help = 'uvit, sxt, czti or laxpc (default: uvit)')
+    bench_parser.add_argument('--ra', type = float, default = None,
+                              help = 'field centre in degrees')
+    bench_parser.add_argument('--dec', type = float, default = None,
+                              help = 'field centre in degrees')
+    bench_parser.add_argument('--seed', type = int, default = None,
+                              help = 'seed of the made up products (default: 1)')
+    bench_parser.add_argument('--label', default = None,
+                              help = 'name of the run in the history')
+    bench_parser.add_argument('--history', default = None,
+                              help = 'history file (default: UVCHECK_BENCH or ~/.uvcheck/bench.jsonl)')
+    bench_parser.add_argument('--no-history', action = 'store_true',
+                              help = 'do not add the run to the history')
+    bench_parser.add_argument('--tolerance', type = float, default = None, metavar = 'PERCENT',
+                              help = 'fail if a stage got slower than this since the last run')
+    bench_parser.add_argument('--work-dir', default = None,
+                              help = 'where the products are made (default: a temporary directory)')
+    bench_parser.add_argument('--keep', action = 'store_true',
+                              help = 'keep the temporary directory')
+    bench_parser.set_defaults(run = bench)
+    return parser
+
+def main(argv = None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'run', None) is None:
+        parser.print_help()
+        return 2
+    return args.run(args)
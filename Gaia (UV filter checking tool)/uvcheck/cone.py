@@ -0,0 +1,41 @@
+'''Cone search over whole catalogue columns.
+
+   The scripts used to build one SkyCoord per catalogue row to find
+   the sources inside the field of view. Here the separations of all
+   the rows are found in one array operation instead.
+
+'''
+
+import numpy as np
+
+
+# Function to find the angular seperation (in arcsec) between catalogue
+# positions and a field centre. All the positions are in degrees and
+# any of them can be arrays, they are broadcasted against each other.
+def angular_separation(alpha, delta, ra_cen, dec_cen):
+    alpha = np.radians(np.asarray(alpha, dtype = np.float64))
+    delta = np.radians(np.asarray(delta, dtype = np.float64))
+    ra_cen = np.radians(np.asarray(ra_cen, dtype = np.float64))
+    dec_cen = np.radians(np.asarray(dec_cen, dtype = np.float64))
+
+    # The Vincenty formula (same as astropy) is used. It has no trouble
+    # at the RA = 0/360 wrap, near the poles or at tiny separations.
+    d_alpha = alpha - ra_cen
+    sin_dalpha = np.sin(d_alpha)
+    cos_dalpha = np.cos(d_alpha)
+    sin_delta = np.sin(delta)
+    cos_delta = np.cos(delta)
+    sin_dec_cen = np.sin(dec_cen)
+    cos_dec_cen = np.cos(dec_cen)
+
+    num1 = cos_delta * sin_dalpha
+    num2 = cos_dec_cen * sin_delta - sin_dec_cen * cos_delta * cos_dalpha
+    denominator = sin_dec_cen * sin_delta + cos_dec_cen * cos_delta * cos_dalpha
+    separation = np.arctan2(np.hypot(num1, num2), denominator)
+    return np.degrees(separation) * 3600.0
+
+# Function to select the catalogue positions within radius (arcsec)
+# of the field centre. Returns the boolean mask and the separations.
+def cone_search(alpha, delta, ra_cen, dec_cen, radius):
+    separation = angular_separation(alpha, delta, ra_cen, dec_cen)
+    return separation <= radius, separation
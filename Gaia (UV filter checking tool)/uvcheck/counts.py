@@ -0,0 +1,95 @@
+'''UVIT count rates from GALEX magnitudes and TD1 fluxes.
+
+   The filter coefficients are kept as arrays (one entry per filter,
+   in the order of the result columns), so that the count rates of
+   all the filters come out of one broadcasted expression for any
+   number of sources (and fields). The bright-end correction of the
+   GALEX magnitudes is bounded below, where the old formula had no
+   real value.
+
+'''
+
+import numpy as np
+
+
+# Safe limits (counts per second) on the UVIT filters.
+count_limit = 1500
+nuv_grating_limit = 1133
+fuv_grating_limit = 892
+
+# The filters, their throughput relative to the first one and the
+# magnitude giving 1 count per second in the first one.
+NUV_FILTERS = ['silica', 'b4', 'b13', 'b15', 'n2']
+NUV_THROUGHPUT = np.array([1.0, 0.22, 0.27, 0.074, 0.055])
+NUV_MG1 = 20.0
+
+FUV_FILTERS = ['caf2', 'baf2', 'sapphire', 'silica']
+FUV_THROUGHPUT = np.array([1.0, 0.85, 0.63, 0.22])
+FUV_MG1 = 18.22
+
+# Correction of the bright (non-linear) GALEX magnitudes,
+#     mg_c = offset + (slope * mg - intercept) ** 0.5
+# for lower <= mg <= 15, and mg_c = offset below lower.
+NUV_CORRECTION = (2.634, 26.316, 245.329, 9.323)
+FUV_CORRECTION = (5.371, 20.0, 210.2, 10.511)
+FAINT_MAG = 15.0
+
+# FUV magnitude taken from the NUV when FUV is absent.
+FUV_FROM_NUV = 1.65
+
+# UVIT count rates of a TD1 source of flux flux_norm.
+flux_norm = 2E-13
+TD1_NUV_RATES = np.array([955.0, 218.5, 275.8, 59.6, 50.6])
+TD1_FUV_RATES = np.array([74.5, 60.0, 50.0, 17.3])
+
+# Functions to convert GALEX CPS to AB magnitude.
+NUV_ZPMAG = 20.08
+FUV_ZPMAG = 18.82
+def magfuv(fl):
+    return (-2.5 * np.log10(np.array(fl)) + FUV_ZPMAG)
+
+def magnuv(fl):
+    return (-2.5 * np.log10(np.array(fl)) + NUV_ZPMAG)
+
+
+# Function to correct bright GALEX magnitudes.
+def corrected_mag(mg, correction):
+    offset, slope, intercept, lower = correction
+    mg = np.asarray(mg, dtype = np.float64)
+    root = np.sqrt(np.maximum(slope * mg - intercept, 0.0))
+    return np.where(mg > FAINT_MAG, mg, np.where(mg < lower, offset, offset + root))
+
+# Function to find the count rates in every filter. The last axis of
+# the result runs over the filters.
+def count_rates(mg, mg1, throughput, correction, shift = 0.0):
+    mg = np.asarray(mg, dtype = np.float64)
+    mg_c = corrected_mag(mg, correction) - shift
+    rates = throughput * 10.0 ** ((mg1 - mg_c)[..., np.newaxis] * 0.4)
+    return mg, mg_c, rates
+
+# Functions to convert GALEX magnitude to UVIT count rates. They
+# return mg, mg_c and the count rate of every filter, as the scripts
+# always had them.
+def countnuv(mg):
+    mg, mg_c, rates = count_rates(mg, NUV_MG1, NUV_THROUGHPUT, NUV_CORRECTION)
+    return (mg, mg_c) + tuple(np.moveaxis(rates, -1, 0))
+
+def countfuv(mg):
+    mg, mg_c, rates = count_rates(mg, FUV_MG1, FUV_THROUGHPUT, FUV_CORRECTION)
+    return (mg, mg_c) + tuple(np.moveaxis(rates, -1, 0))
+
+def countfuv_abs(mg): # for cases where FUV is absent.
+    mg, mg_c, rates = count_rates(mg, FUV_MG1, FUV_THROUGHPUT, NUV_CORRECTION,
+                                  shift = FUV_FROM_NUV)
+    return (mg, mg_c) + tuple(np.moveaxis(rates, -1, 0))
+
+# Functions to convert TD1 flux to UVIT count rates.
+def td1_rates(flux, rates):
+    flux = np.asarray(flux, dtype = np.float64)
+    return rates * (flux / flux_norm)[..., np.newaxis]
+
+def td1_countnuv(flux):
+    return (flux,) + tuple(np.moveaxis(td1_rates(flux, TD1_NUV_RATES), -1, 0))
+
+def td1_countfuv(flux):
+    return (flux,) + tuple(np.moveaxis(td1_rates(flux, TD1_FUV_RATES), -1, 0))
@@ -0,0 +1,129 @@
+'''The GALEX images with the bright sources marked (PNG).
+
+   Drawing the figures takes longer than the rest of a check, and
+   nothing waits on them. A Renderer draws them as they come ('now'),
+   in a pool of workers while the check goes on ('background'), or not
+   at all ('off'); close() waits for the last of them. The workers are
+   started at the first figure.
+
+   The mode is UVCHECK_FIGURES ('background' by default) and the
+   resolution UVCHECK_DPI (300 by default).
+
+'''
+
+import os
+import numpy as np
+
+
+FIGURE_MODE = os.environ.get('UVCHECK_FIGURES', 'background')
+FIGURE_DPI = int(os.environ.get('UVCHECK_DPI', 300))
+
+figure_modes = ['now', 'background', 'off']
+
+
+# Function to save the image with the sources marked. The figure is
+# made without pyplot, so that figures can be drawn in threads.
+def plot_marked(fitsf, x_det, y_det, figure_name, dpi = FIGURE_DPI):
+    from matplotlib.figure import Figure
+    from matplotlib.colors import LogNorm
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot(111)
+
+    # To plot the image.
+    axes.imshow(fitsf,
+                cmap = 'gray',
+                norm = LogNorm(),
+                interpolation = 'none')
+
+    axes.set_title('Detected bright sources marked')
+    axes.invert_yaxis()
+    axes.set_xticks([])
+    axes.set_yticks([])
+
+    # To plot detected sources.
+    axes.scatter(x_det, y_det,
+                 color = 'r',
+                 marker = 'o',
+                 alpha = 0.2)
+
+    # To annotate positions.
+    anno = np.arange(len(x_det)) + 1
+    for q, txt in enumerate(anno):
+        axes.annotate(txt, (x_det[q], y_det[q]))
+
+    # To save the image.
+    figure.savefig(figure_name,
+                   format = 'png',
+                   bbox_inches = 'tight',
+                   dpi = dpi)
+    return figure_name
+
+
+# Function to import matplotlib in a worker before the first figure.
+def start_worker():
+    from importlib import import_module
+
+    for name in ['matplotlib.figure', 'matplotlib.colors', 'matplotlib.backends.backend_agg']:
+        import_module(name)
+
+
+
+class Renderer(object):
+
+    def __init__(self, mode = None, dpi = None, processes = 2):
+        self.mode = mode or FIGURE_MODE
+        if self.mode not in figure_modes:
+            raise ValueError('Unknown figure mode: {}'.format(self.mode))
+        self.dpi = FIGURE_DPI if dpi is None else dpi
+        self.processes = processes
+        self.pool = None
+        self.pending = []
+
+    # To start the workers, at the first figure (not on creation, so
+    # that a Renderer made at import does not start processes). They
+    # import matplotlib first. Processes unless this is a daemonic process itself (a
+    # batch worker), which cannot have children; threads then.
+    def start(self):
+        import multiprocessing
+
+        if multiprocessing.current_process().daemon:
+            from multiprocessing.pool import ThreadPool
+            self.pool = ThreadPool(self.processes, start_worker)
+        else:
+            self.pool = multiprocessing.Pool(self.processes, start_worker)
+
+    # To draw a figure, or have it drawn, as the mode says.
+    def submit(self, fitsf, x_det, y_det, figure_name):
+        if self.mode == 'off':
+            return
+        if self.mode == 'now':
+            plot_marked(fitsf, x_det, y_det, figure_name, self.dpi)
+            return
+        if self.pool is None:
+            self.start()
+        self.pending.append(self.pool.apply_async(plot_marked,
+                                                  (np.asarray(fitsf),
+                                                   np.asarray(x_det),
+                                                   np.asarray(y_det),
+                                                   figure_name,
+                                                   self.dpi)))
+
+    # To wait for the figures being drawn. Returns the names of those
+    # drawn since the last wait.
+    def wait(self):
+        names = [job.get() for job in self.pending]
+        self.pending = []
+        return names
+
+    # To wait for the figures and stop the workers.
+    def close(self):
+        try:
+            return self.wait()
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+                self.pool = None
@@ -0,0 +1,694 @@
+'''The GALEX catalogue, GALEX image, and TD1 catalogue methods of
+   determining the UVIT FUV and NUV filters, as used by gaia_V.3.3.py.
+
+   check_field() runs the whole decision for one pointing and returns
+   the count rate tables and the safe filters. Nothing is written to
+   the disk other than the downloaded GALEX products (and the marked
+   images), write_outputs() does the rest for the command line script.
+   The stages of the check are timed into result['stages'] (see
+   uvcheck.stages).
+
+'''
+
+import numpy as np
+
+from .mcat import read_mcat, bright_sources
+from .photometry import box_flux
+from .intmap import read_header, read_section, circular_mask
+from .figures import plot_marked
+from .counts import (count_limit, nuv_grating_limit, fuv_grating_limit, flux_norm,
+                     magnuv, magfuv, countnuv, countfuv, countfuv_abs,
+                     td1_countnuv, td1_countfuv)
+from .td1 import TD1Index, TD1_CATALOGUE
+from . import mast
+from .tilecache import TileCache
+from .tiles import TileIndex, GALEX_TILES
+from .stages import Stages
+
+
+# instrument and radius of search in arsec.
+field_radius = {'uvit'  : 1200,
+                'sxt'   : 1500,
+                'czti'  : 1680,
+                'laxpc' : 1680}
+
+# instrument and required window size.
+field_radius_im = {'uvit'  : 800,
+                   'sxt'   : 1500,
+                   'czti'  : 1120,
+                   'laxpc' : 1120}
+
+nuv_filter_dict = {0: 'Silica', 1: 'NUV-B4', 2: 'NUV-B13', 3: 'NUV-B15', 4: 'NUV-N2'}
+fuv_filter_dict = {0: 'CaF2', 1: 'BaF2', 2: 'Sapphire', 3: 'Silica'}
+nuv_columns = ['silica', 'b4', 'b13', 'b15', 'n2']
+fuv_columns = ['caf2', 'baf2', 'sapphire', 'silica']
+
+no_galex_tiles = '0 Galex tiles found. Galex observations around \
+                  \nthe given target is not available. Using TD1\
+                  \ncatalogue to estimate UVIT count rates.'
+
+no_galex_images = '0 Galex tiles found. Galex observations around \
+                   \nthe given target is not available. Please follow\
+                   \nthe mandatory check document.'
+
+gal_plane_warning = 'The galactic latitude is between -30 to 30. \
+                    \nYour field cannot be checked using TD1 catalogue!'
+
+fuv_absent_warning = '\nFUV observations seem to be absent! Using M_fuv = M_nuv - 1.65.'
+
+incomplete_fits = 'Incomplete FITS file. Check if Galex Servers are working properly.'
+
+
+# Raised when a field cannot be checked. The message is meant
+# for the user (and the error file), the notes are what was found
+# out before giving up.
+class CheckError(Exception):
+
+    def __init__(self, message, notes = None):
+        Exception.__init__(self, message)
+        self.notes = notes or []
+
+
+# Function to read the RA, DEC user input.
+def field_centre(RA, DEC):
+    from astropy import units as u
+    from astropy.coordinates import SkyCoord
+
+    if not (DEC.count(':') == RA.count(':') == 2):
+        raise CheckError('Check your RA DEC input.')
+    return SkyCoord(RA, DEC, unit = (u.hourangle, u.deg))
+
+# Function to convert ra_deg and dec_deg to ra_hms and dec_dms.
+def deg_to_hms(al, dl):
+    from astropy.table import Table
+    from astropy.coordinates import SkyCoord
+
+    fuv_coord = SkyCoord(np.asarray(al, dtype = float),
+                         np.asarray(dl, dtype = float),
+                         frame = 'icrs',
+                         unit = 'deg')
+
+    RAhms_DECdms = fuv_coord.to_string('hmsdms', sep = ':')
+    ra_hms, dec_dms = zip(*[hmdm.split(' ') for hmdm in RAhms_DECdms])
+    sl_no = np.arange(len(ra_hms)) + 1
+    xy_tab = Table([sl_no, ra_hms, dec_dms], names = ('sl_no', 'ra_hms', 'dec_dms'))
+    return xy_tab
+
+# Function to format NUV data.
+def format_nuv(nuv_counts):
+    from astropy.table import Table
+
+    ntab = Table(list(nuv_counts),
+                 names = ('Mag',
+                          'Mag_corrected',
+                          'silica',
+                          'b4',
+                          'b13',
+                          'b15',
+                          'n2'),
+                 meta = {'name': 'NUV counts'})
+
+    for column in ntab.colnames:
+        ntab[column].format = '4.2f'
+    return ntab
+
+# Function to format FUV data.
+def format_fuv(fuv_counts):
+    from astropy.table import Table
+
+    ftab = Table(list(fuv_counts),
+                 names = ('Mag',
+                          'Mag_corrected',
+                          'caf2',
+                          'baf2',
+                          'sapphire',
+                          'silica'),
+                 meta = {'name': 'FUV counts'})
+
+    for column in ftab.colnames:
+        ftab[column].format = '4.2f'
+    return ftab
+
+# Functions to select the safe filters from the count rate tables.
+def nuv_safe_filters(nuv_res):
+    nuv_safe = []
+    for i, column in enumerate(nuv_columns):
+        Filter = np.array(nuv_res[column])
+        if sum(Filter > count_limit) == 0:
+            nuv_safe.append(nuv_filter_dict[i])
+        if i == 0:
+            if sum(Filter > nuv_grating_limit) == 0:
+                nuv_safe.append('NUV-grating')
+    return nuv_safe
+
+def fuv_safe_filters(fuv_res):
+    fuv_safe = []
+    for j, column in enumerate(fuv_columns):
+        Filter = np.array(fuv_res[column])
+        if sum(Filter > count_limit) == 0:
+            fuv_safe.append(fuv_filter_dict[j])
+        if j == 0:
+            if sum(Filter > fuv_grating_limit) == 0:
+                fuv_safe.append('FUV-grating')
+    return fuv_safe
+
+# Function to do all the work on TD1_catalogue.
+def td1_estimate(td1_index, cc, instrument):
+    from astropy.table import Table
+
+    # One indexed cone query serves both NUV and FUV.
+    nuv_flux, fuv_flux = td1_index.fluxes(cc.ra.degree,
+                                          cc.dec.degree,
+                                          field_radius[instrument])
+
+    # NUV
+    confined_set = list(nuv_flux)
+
+    # If list is empty, normal value need to be taken.
+    if len(confined_set) == 0:
+        confined_set.append(flux_norm)
+
+    nd = sorted(confined_set)[-1]
+    flux, ta, tb, tc, td, te = td1_countnuv(nd)
+    nuv_res = Table([[flux], [ta], [tb], [tc], [td], [te]],
+                   names = ('flux_2365_a',
+                            'silica',
+                            'b4',
+                            'b13',
+                            'b15',
+                            'n2'),
+                   meta = {'name': 'NUV counts'})
+
+    for column in nuv_columns:
+        nuv_res[column].format = '4.1f'
+
+    # FUV
+    confined_set = list(fuv_flux)
+
+    # If list is empty, normal value need to be taken.
+    if len(confined_set) == 0:
+        confined_set.append(flux_norm)
+
+    fd = sorted(confined_set)[-1]
+    flux, ta, tb, tc, td = td1_countfuv(fd)
+    fuv_res = Table([[flux], [ta], [tb], [tc], [td]],
+                   names = ('flux_1565_a',
+                            'caf2',
+                            'baf2',
+                            'sapphire',
+                            'silica'),
+                   meta = {'name': 'NUV counts'})
+
+    for column in fuv_columns:
+        fuv_res[column].format = '4.1f'
+    return nuv_res, fuv_res
+
+# Function to select the brightest catalogue sources in the field.
+# Returns arrays of (mag, ra, dec[, fwhm]) rows, brightest first.
+def catalogue_sources(catalogue, cc, instrument, cache_file = None, stages = None):
+    if stages is None:
+        stages = Stages()
+
+    # Reading coordinates from catalogue.
+    with stages.stage('FITS read', 'FITS I/O') as stage:
+        try:
+            mcat = read_mcat(catalogue, cache_file)
+        except IOError:
+            raise CheckError(incomplete_fits)
+        stage.count(rows = len(mcat))
+
+    with stages.stage('cone selection') as stage:
+        # NUV
+        nd = bright_sources(mcat['nuv_mag'], mcat['alpha'], mcat['delta'],
+                            cc.ra.degree, cc.dec.degree,
+                            field_radius[instrument],
+                            extra = [mcat['nuv_fwhm']])
+        stage.count(rows = len(mcat), sources = len(nd))
+
+        # FUV
+        fuv_absent = len(np.unique(mcat['fuv_mag'])) == 1
+        if fuv_absent:  # when FUV data is absent.
+            fd = nd
+        else:
+            fd = bright_sources(mcat['fuv_mag'], mcat['alpha'], mcat['delta'],
+                                cc.ra.degree, cc.dec.degree,
+                                field_radius[instrument])
+            stage.count(rows = len(mcat), sources = len(fd))
+
+    return nd, fd, fuv_absent
+
+# Function to cut the field out of a GALEX intensity map, with the
+# pixels outside the field radius set to 0. Only the pixels of the
+# cutout are read, through the image cache (cache_file) of a gzipped
+# map. Returns the cutout, the WCS of the map and the offset (x, y) of
+# the cutout in it.
+def field_cutout(int_map, cc, instrument, cache_file = None):
+    from astropy.wcs import WCS
+
+    # To read the WCS.
+    try:
+        w = WCS(read_header(int_map))
+    except IOError:
+        raise CheckError(incomplete_fits)
+
+    # To convert RA & DEC to pixel coordinates.
+    cor = w.all_world2pix(cc.ra.degree, cc.dec.degree, 1)
+    try:
+        selcen = [int(round(float(x))) for x in cor]
+    except ValueError:
+        raise CheckError('The provided RA DEC values fell outside the GALEX image.')
+
+    # The pixel scale of GALEX taken here is 1.5 arcsec/pixel.
+    # To select a rectangular region centered on the provided positions.
+    radius = field_radius_im[instrument]
+    xfi = max(0, selcen[0] - radius)
+    yfi = max(0, selcen[1] - radius)
+    xse = selcen[0] + radius
+    yse = selcen[1] + radius
+
+    # To read data.
+    try:
+        fitsf = read_section(int_map, yfi, yse, xfi, xse, cache_file)
+    except IOError:
+        raise CheckError(incomplete_fits)
+
+    # To put a circular mask on the image (cut like the image, from
+    # the first corner).
+    mask = circular_mask(radius)
+    mask_xshape, mask_yshape = mask.shape
+    fitsf_xshape, fitsf_yshape = fitsf.shape
+    x_mask_start = mask_xshape - fitsf_xshape
+    y_mask_start = mask_yshape - fitsf_yshape
+    fitsf[mask[x_mask_start:, y_mask_start:]] = 0
+    return fitsf, w, xfi, yfi
+
+# Function to estimate the fluxes of known sources on a GALEX
+# intensity map. The marked image is saved if figure_name is given,
+# by the renderer if there is one (see figures.Renderer); cache_file
+# is the image cache of the map (see field_cutout).
+def im_flux(int_map, cc, instrument, m_ra, m_dec, figure_name = None,
+            cache_file = None, renderer = None, stages = None):
+    if stages is None:
+        stages = Stages()
+
+    with stages.stage('FITS read', 'FITS I/O') as stage:
+        fitsf, w, xfi, yfi = field_cutout(int_map, cc, instrument, cache_file)
+        stage.count(bytes = fitsf.nbytes)
+
+    with stages.stage('photometry') as stage:
+        # To mark positions of bright objects
+        det_pos = w.all_world2pix(m_ra, m_dec, 1)
+        x_det = det_pos[0] - xfi
+        y_det = det_pos[1] - yfi
+
+        # Using a 7x7 box to estimate the flux of detected objects.
+        # the units are counts/sec/pixel.
+        fluxes = box_flux(fitsf, x_det, y_det)
+        stage.count(sources = len(fluxes))
+
+    if figure_name is not None:
+        with stages.stage('figures'):
+            mark_sources(fitsf, x_det, y_det, figure_name, renderer)
+    return fluxes
+
+# Function to save the image with the sources marked, now or through
+# the renderer.
+def mark_sources(fitsf, x_det, y_det, figure_name, renderer = None):
+    if renderer is None:
+        plot_marked(fitsf, x_det, y_det, figure_name)
+    else:
+        renderer.submit(fitsf, x_det, y_det, figure_name)
+
+# Function to fill in the result of a field from the TD1 catalogue.
+def td1_result(result, td1_index, cc, instrument):
+    if result['gal_plane']:
+        raise CheckError(gal_plane_warning, result['notes'])
+
+    stages = result['stages']
+    if td1_index is None:
+        with stages.stage('FITS read', 'FITS I/O') as stage:
+            try:
+                td1_index = TD1Index.load(TD1_CATALOGUE)
+            except IOError:
+                raise CheckError('Could not find the catalogue file: {}'.format(TD1_CATALOGUE))
+            stage.count(rows = len(td1_index.ra))
+
+    with stages.stage('td1'):
+        nuv_res, fuv_res = td1_estimate(td1_index, cc, instrument)
+
+    with stages.stage('decision'):
+        result['method'] = 'td1'
+        result['nuv_res'] = nuv_res
+        result['fuv_res'] = fuv_res
+        result['nuv_safe'] = nuv_safe_filters(nuv_res)
+        result['fuv_safe'] = fuv_safe_filters(fuv_res)
+    return result
+
+# Function to load the GALEX tile index, None when there is no tile
+# listing to build it from.
+def load_tile_index(listing = GALEX_TILES):
+    try:
+        return TileIndex.load(listing)
+    except IOError:
+        return None
+
+# Function to check a field. Returns a dictionary with the count rate
+# tables and the safe filters, raises CheckError if it cannot be done.
+#
+# session, td1_index, tile_index and tile_cache can be passed in to be
+# reused between fields; make_plots decides if the marked images are
+# saved, by the renderer if one is given (they are drawn before the
+# check returns otherwise). Without a tile index (no tile listing) the
+# MAST pages are used.
+#
+# method picks one of the methods instead of deciding between them:
+# 'catalogue' leaves the images out, 'td1' goes to the TD1 catalogue
+# without looking for a GALEX tile.
+#
+# The stages are timed into stages (a Stages, see uvcheck.stages) if
+# one is given, so that they are known when the check fails too; into
+# a Stages of its own otherwise. It is result['stages'] either way.
+def check_field(instrument, RA, DEC,
+                session = None,
+                td1_index = None,
+                tile_index = None,
+                tile_cache = None,
+                make_plots = True,
+                method = None,
+                renderer = None,
+                stages = None):
+
+    from astropy.table import hstack
+
+    if instrument not in field_radius:
+        raise CheckError('Unknown instrument: {}'.format(instrument))
+    if renderer is not None and renderer.mode == 'off':
+        make_plots = False
+    if method not in (None, 'catalogue', 'td1'):
+        raise CheckError('Unknown method: {}'.format(method))
+
+    if stages is None:
+        stages = Stages()
+
+    with stages.stage('field centre'):
+        cc = field_centre(RA, DEC)
+
+        # To check if Galactic latitude is between -30 to 30.
+        gal_lat = cc.galactic.b.value
+
+    result = {'instrument': instrument,
+              'RA': RA,
+              'DEC': DEC,
+              'method': None,
+              'catalogue': None,
+              'fuv_absent': False,
+              'figures': [],
+              'downloads': [],
+              'notes': [],
+              'stages': stages}
+    result['gal_plane'] = -30.0 <= gal_lat <= 30.0
+
+    if method == 'td1':
+        return td1_result(result, td1_index, cc, instrument)
+
+    if session is None:
+        from requests import Session
+        session = Session()
+    if tile_cache is None:
+        tile_cache = TileCache(session = session)
+    if tile_index is None:
+        with stages.stage('FITS read', 'FITS I/O'):
+            tile_index = load_tile_index()
+
+    # To find the GALEX tile and its products.
+    if tile_index is not None:
+        with stages.stage('tile lookup') as stage:
+            products = tile_index.products(cc.ra.deg, cc.dec.deg)
+            stage.count(rows = len(tile_index.dec))
+    else:
+        with stages.stage('tile lookup', 'network'):
+            tile_page = mast.find_tile(session, RA, DEC)
+            products = None
+            if tile_page is not None:
+                products = mast.product_links(session, tile_page)
+
+    if products is None:
+        result['notes'].append(no_galex_tiles)
+        return td1_result(result, td1_index, cc, instrument)
+
+    catalogue_links, images = products
+    if method == 'catalogue':
+        images = []
+
+    # To download the mcat (galex catalogue) and the galex images
+    # together, through the tile cache.
+    if len(catalogue_links) == 0:
+        raise CheckError('Could not find the catalogue for this region.')
+    with stages.stage('download', 'network') as stage:
+        downloads = tile_cache.fetch_all([catalogue_links[0]] + images)
+        stage.count(bytes = sum(size for file_name, size, seconds, cached in downloads
+                                if not cached))
+    result['downloads'] = downloads
+    catalogue = downloads[0][0]
+    result['catalogue'] = catalogue
+
+    nd, fd, fuv_absent = catalogue_sources(catalogue, cc, instrument,
+                                           tile_cache.sidecar(catalogue_links[0], '.mcat.npy'),
+                                           stages)
+    result['fuv_absent'] = fuv_absent
+    if fuv_absent:
+        result['notes'].append(fuv_absent_warning)
+
+    with stages.stage('count rates'):
+        # NUV
+        cat_nuv_counts = countnuv(nd[:,0])
+        cat_nuv_res = format_nuv(cat_nuv_counts)
+
+        # To convert ra_deg and dec_deg to ra_hms and dec_dms.
+        xy_tab = deg_to_hms(nd[:,1], nd[:,2])
+        cat_nuv_res = hstack([xy_tab, cat_nuv_res])
+
+        balance = cat_nuv_res['ra_hms', 'dec_dms','Mag']
+        balance.rename_column('Mag', 'CAT_Mag')
+        balance['fwhm'] = nd[:,3]
+        balance['fwhm'].format = '4.4f'
+
+        # FUV
+        if not fuv_absent:
+            cat_fuv_counts = countfuv(fd[:,0])
+        else:
+            cat_fuv_counts = countfuv_abs(fd[:,0])
+
+        cat_fuv_res = format_fuv(cat_fuv_counts)
+
+        # To convert ra_deg and dec_deg to ra_hms and dec_dms.
+        xy_tab = deg_to_hms(fd[:,1], fd[:,2])
+        cat_fuv_res = hstack([xy_tab, cat_fuv_res])
+
+    # To sort out the galex images.
+    nuv_intmap = None
+    fuv_intmap = None
+    image_caches = {}
+    for link, download in zip(images, downloads[1:]):
+        image_file = download[0]
+        detector = str(image_file[-14:-13]).lower()
+        if detector == 'f':
+            fuv_intmap = image_file
+        elif detector == 'n':
+            nuv_intmap = image_file
+        else:
+            raise CheckError('Cannot determine filter! exiting.')
+        image_caches[image_file] = tile_cache.sidecar(link, '.int.npy')
+
+    # NUV
+    im_nuv_res = None
+    if nuv_intmap is not None:
+        figure_name = None
+        if make_plots:
+            figure_name = nuv_intmap.replace('.fits.gz', '.png')
+            result['figures'].append(figure_name)
+        m_ra = nd[:,1]
+        m_dec = nd[:,2]
+        n_fluxes = im_flux(nuv_intmap, cc, instrument, m_ra, m_dec, figure_name,
+                           image_caches[nuv_intmap], renderer, stages)
+        with stages.stage('count rates'):
+            n_mags = magnuv(n_fluxes)
+            n_counts = countnuv(n_mags)
+            im_nuv_res = format_nuv(n_counts)
+            xy_tab = deg_to_hms(m_ra, m_dec)
+            im_nuv_res = hstack([xy_tab, im_nuv_res])
+            balance['IM_Mag'] = im_nuv_res['Mag']
+
+    # FUV
+    im_fuv_res = None
+    if fuv_intmap is None and nuv_intmap is not None:
+        with stages.stage('count rates'):
+            f_counts = countfuv_abs(n_mags)
+            im_fuv_res = format_fuv(f_counts)
+            im_fuv_res = hstack([xy_tab, im_fuv_res])
+
+    elif fuv_intmap is not None:
+        figure_name = None
+        if make_plots:
+            figure_name = fuv_intmap.replace('.fits.gz', '.png')
+            result['figures'].append(figure_name)
+        m_ra = fd[:,1]
+        m_dec = fd[:,2]
+        f_fluxes = im_flux(fuv_intmap, cc, instrument, m_ra, m_dec, figure_name,
+                           image_caches[fuv_intmap], renderer, stages)
+        with stages.stage('count rates'):
+            f_mags = magfuv(f_fluxes)
+            f_counts = countfuv(f_mags)
+            im_fuv_res = format_fuv(f_counts)
+            xy_tab = deg_to_hms(m_ra, m_dec)
+            im_fuv_res = hstack([xy_tab, im_fuv_res])
+
+    with stages.stage('decision'):
+        # To decide between catalogue or image.
+        use_catalogue = True
+        if im_nuv_res is not None and im_fuv_res is not None:
+            balance['diff'] = balance['IM_Mag'] - balance['CAT_Mag']
+            if sum(balance['diff'] > 1.2) != 0 or sum(balance['fwhm'] > 0.0043) != 0:
+                use_catalogue = False
+
+        if use_catalogue:
+            result['method'] = 'catalogue'
+            nuv_res = cat_nuv_res
+            fuv_res = cat_fuv_res
+        else:
+            result['method'] = 'image'
+            nuv_res = im_nuv_res
+            fuv_res = im_fuv_res
+
+        result['nuv_res'] = nuv_res
+        result['fuv_res'] = fuv_res
+        result['nuv_safe'] = nuv_safe_filters(nuv_res)
+        result['fuv_safe'] = fuv_safe_filters(fuv_res)
+    return result
+
+# Function to list the files the notes of a field go into, as
+# (file name, text) pairs.
+def note_files(notes):
+    files = []
+    for note in notes:
+        if note == no_galex_tiles or note.endswith(no_galex_images):
+            files.append(('zero_tiles.txt', note))
+        elif note == fuv_absent_warning:
+            files.append(('absent_FUV.txt', note))
+    return files
+
+# Function to write the notes of a field into their own files.
+def write_notes(notes, verbose = True):
+    if verbose:
+        for note in notes:
+            print('\n\n{}\n\n'.format(note))
+    for file_name, text in note_files(notes):
+        with open(file_name, 'w') as note_file:
+            note_file.write(text)
+
+# Function to turn a table into the CSV text written to file.
+def csv_text(table):
+    from io import StringIO
+    from astropy.io import ascii
+
+    text = StringIO()
+    ascii.write(table, text, format = 'csv')
+    return text.getvalue()
+
+# Function to list the tables and safe filters of a checked field,
+# as (file name, text) pairs.
+def result_files(result):
+    if 'tables' in result:
+        nuv_table, fuv_table = result['tables']
+    elif result['method'] == 'td1':
+        nuv_table = 'NUV_td1-nd-int.txt'
+        fuv_table = 'FUV_td1-fd-int.txt'
+    else:
+        catalogue = result['catalogue']
+        nuv_table = 'NUV_' + catalogue.replace('.fits.gz', '-nd-int.txt')
+        fuv_table = 'FUV_' + catalogue.replace('.fits.gz', '-fd-int.txt')
+
+    return [(nuv_table, csv_text(result['nuv_res'])),
+            ('safe_NUV_filters.txt', 'Safe filters in NUV: {}'.format(result['nuv_safe'])),
+            (fuv_table, csv_text(result['fuv_res'])),
+            ('safe_FUV_filters.txt', 'Safe filters in FUV: {}'.format(result['fuv_safe']))]
+
+# Function to list all the files of a checked field, as the script
+# writes them.
+def output_files(result):
+    return note_files(result['notes']) + result_files(result)
+
+# Function to write the tables and safe filters of a checked field
+# into the working directory, as the script always did.
+def write_outputs(result, verbose = True):
+    write_notes(result['notes'], verbose)
+    files = result_files(result)
+    if verbose:
+        for file_name, size, seconds, cached in result['downloads']:
+            print('{}: {:.1f} MB in {:.1f} s{}'.format(file_name,
+                                                       size / 1048576.0,
+                                                       seconds,
+                                                       ' (cached)' if cached else ''))
+        print('\n\n### NUV\n\n{}\n'.format(result['nuv_res']))
+        print('\n\n{}\n'.format(files[1][1]))
+        print('\n### FUV \n\n{}\n\n'.format(result['fuv_res']))
+        print('\n\n{}\n'.format(files[3][1]))
+
+    # To write to file.
+    for file_name, text in files:
+        with open(file_name, 'w') as output_file:
+            output_file.write(text)
+
+# Function to turn a value of a table into plain Python.
+def plain(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+# Function to turn a table into columns and rows.
+def table_json(table):
+    return {'columns': list(table.colnames),
+            'rows': [[plain(value) for value in row] for row in table]}
+
+# Function to turn a checked field into plain data (for JSON): the
+# verdict, the count rate tables and the files the script writes.
+def verdict(result):
+    return {'instrument': result['instrument'],
+            'ra': result['RA'],
+            'dec': result['DEC'],
+            'method': result['method'],
+            'catalogue': result['catalogue'],
+            'gal_plane': bool(result['gal_plane']),
+            'fuv_absent': bool(result['fuv_absent']),
+            'notes': result['notes'],
+            'nuv_safe': result['nuv_safe'],
+            'fuv_safe': result['fuv_safe'],
+            'nuv_res': table_json(result['nuv_res']),
+            'fuv_res': table_json(result['fuv_res']),
+            'files': output_files(result)}
+
+# Function to tell whether a verdict may be kept in the verdict cache.
+# A TD1 estimate made for want of GALEX tiles is not; the tile search
+# may have found none only because MAST was down.
+def cacheable(answer):
+    return not (answer['method'] == 'td1' and no_galex_tiles in answer['notes'])
+
+# Function to write the files of a verdict into the working directory,
+# as write_outputs() does for a checked field.
+def write_verdict(answer, verbose = True):
+    files = [(str(file_name), text) for file_name, text in answer['files']]
+    if verbose:
+        for note in answer['notes']:
+            print('\n\n{}\n\n'.format(note))
+        if answer['method'] == 'image':
+            print('\nThe marked images are not drawn again for a verdict from the'
+                  '\nverdict cache; UVCHECK_VERDICT_DAYS=0 (or --refresh) checks afresh.\n')
+        tables = files[-4:]
+        print('\n\n### NUV\n\n{}\n'.format(tables[0][1]))
+        print('\n\n{}\n'.format(tables[1][1]))
+        print('\n### FUV \n\n{}\n\n'.format(tables[2][1]))
+        print('\n\n{}\n'.format(tables[3][1]))
+
+    for file_name, text in files:
+        with open(file_name, 'w') as output_file:
+            output_file.write(text)
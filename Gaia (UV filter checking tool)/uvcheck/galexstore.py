@@ -0,0 +1,221 @@
+'''Local copy of the GALEX catalogue at VizieR (II/312), for the VizieR
+   method.
+
+   The sources are kept in HEALPix partitions (NESTED, NSIDE 16, some
+   13 square degrees each): a directory per partition holding one .npy
+   file per column (RAJ2000, DEJ2000, NUV, FUV; a magnitude not
+   measured is NaN), which are read memory-mapped. A partition is in
+   the store only when all of its sources are, so a cone query is
+   answered from the partitions it reaches that are there, and VizieR
+   is asked only about the others.
+
+   The store is filled from VizieR dumps (VOTable, FITS or any table
+   astropy reads, positions in degrees) of whole surveys or of cones
+   larger than a partition with import_dumps(), or from VizieR itself,
+   one partition at a time, with fetch(). It is kept in
+   ~/.uvcheck/galex, or wherever UVCHECK_GALEX_STORE points.
+
+'''
+
+import os
+import json
+import shutil
+import numpy as np
+
+from .cone import cone_search
+from .healpix import ang2pix, pix2ang, cone_pixels, max_pixrad, nside2npix, check_nside
+from .tilecache import part_name
+
+
+GALEX_STORE = os.environ.get('UVCHECK_GALEX_STORE',
+                             os.path.join(os.path.expanduser('~'), '.uvcheck', 'galex'))
+
+STORE_FILE = 'store.json'
+
+# Resolution of the partitions.
+NSIDE = 16
+
+# Columns kept, with their types.
+store_columns = [('RAJ2000', np.float64), ('DEJ2000', np.float64),
+                 ('NUV', np.float32), ('FUV', np.float32)]
+
+# Names the positions may have in the dumps (VizieR adds the computed
+# _RAJ2000 and _DEJ2000 when asked).
+position_names = {'RAJ2000': ['RAJ2000', '_RAJ2000', 'RAdeg', 'ra'],
+                  'DEJ2000': ['DEJ2000', '_DEJ2000', 'DEdeg', 'dec']}
+
+
+# Function to pick the column of a table going by any of names.
+def table_column(table, names):
+    for name in names:
+        if name in table.colnames:
+            return table[name]
+    raise KeyError('None of the columns {} in the table.'.format(', '.join(names)))
+
+# Function to turn a (possibly masked) table column to an array, NaN
+# where masked.
+def column_values(column, dtype):
+    values = np.ma.masked_invalid(np.ma.asarray(column, dtype = np.float64))
+    return values.filled(np.nan).astype(dtype)
+
+# Function to take the store columns out of a VizieR table.
+def table_columns(table):
+    columns = {}
+    for name, dtype in store_columns:
+        if name in position_names:
+            columns[name] = column_values(table_column(table, position_names[name]), dtype)
+        else:
+            columns[name] = column_values(table[name], dtype)
+    return columns
+
+
+
+class GalexStore(object):
+
+    def __init__(self, store_dir = None, nside = None):
+        self.store_dir = store_dir or GALEX_STORE
+        store_file = os.path.join(self.store_dir, STORE_FILE)
+        if os.path.exists(store_file):
+            with open(store_file) as numbers:
+                self.nside = json.load(numbers)['nside']
+            if nside is not None and nside != self.nside:
+                raise ValueError('The store at {} is of NSIDE {}.'.format(self.store_dir, self.nside))
+        else:
+            self.nside = nside or NSIDE
+        check_nside(self.nside)
+
+    # To write down the layout of the store, before the first partition.
+    def create(self):
+        store_file = os.path.join(self.store_dir, STORE_FILE)
+        if os.path.exists(store_file):
+            return
+        if not os.path.isdir(self.store_dir):
+            os.makedirs(self.store_dir)
+        with open(part_name(store_file), 'w') as numbers:
+            json.dump({'nside': self.nside,
+                       'catalogue': 'II/312',
+                       'columns': [name for name, dtype in store_columns]},
+                      numbers, indent = 1)
+        os.rename(part_name(store_file), store_file)
+
+    def partition_dir(self, pixel):
+        return os.path.join(self.store_dir, '{:03d}'.format(pixel // 1024), str(pixel))
+
+    def has(self, pixel):
+        return os.path.isdir(self.partition_dir(pixel))
+
+    # To list the partitions in the store.
+    def partitions(self):
+        return [pixel for pixel in range(nside2npix(self.nside)) if self.has(pixel)]
+
+    # To read the columns of a partition (memory-mapped).
+    def read(self, pixel):
+        part_dir = self.partition_dir(pixel)
+        return dict((name, np.load(os.path.join(part_dir, name + '.npy'), mmap_mode = 'r'))
+                    for name, dtype in store_columns)
+
+    # To write a partition, replacing what was there. The partition
+    # appears whole or not at all.
+    def write(self, pixel, columns):
+        self.create()
+        part_dir = self.partition_dir(pixel)
+        temp_dir = part_name(part_dir)
+        os.makedirs(temp_dir)
+        try:
+            for name, dtype in store_columns:
+                np.save(os.path.join(temp_dir, name + '.npy'),
+                        np.ascontiguousarray(columns[name], dtype = dtype))
+            if os.path.isdir(part_dir):
+                shutil.rmtree(part_dir)
+            os.rename(temp_dir, part_dir)
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors = True)
+            raise
+
+    # To file the sources of columns into the partitions of pixels (all
+    # those they fall in if not given). Partitions without sources are
+    # written empty, they are known to have none.
+    def add(self, columns, pixels = None):
+        pixel = ang2pix(self.nside, columns['RAJ2000'], columns['DEJ2000'])
+        order = np.argsort(pixel, kind = 'stable')
+        pixel = pixel[order]
+        if pixels is None:
+            pixels = np.unique(pixel)
+        start = np.searchsorted(pixel, pixels, side = 'left')
+        stop = np.searchsorted(pixel, pixels, side = 'right')
+        for k, p in enumerate(pixels):
+            rows = order[start[k]:stop[k]]
+            self.write(int(p), dict((name, columns[name][rows]) for name, dtype in store_columns))
+        return len(pixels)
+
+    # To split the partitions a cone (radius in arcsec) reaches into
+    # those in the store and those missing.
+    def split(self, ra_cen, dec_cen, radius):
+        pixels = cone_pixels(self.nside, ra_cen, dec_cen, radius)
+        present = [int(p) for p in pixels if self.has(p)]
+        missing = [int(p) for p in pixels if not self.has(p)]
+        return present, missing
+
+    # To find the sources of the partitions within radius (arcsec) of
+    # the field centre. Returns their columns.
+    def query(self, ra_cen, dec_cen, radius, pixels):
+        pieces = dict((name, []) for name, dtype in store_columns)
+        for pixel in pixels:
+            columns = self.read(pixel)
+            inside, separation = cone_search(columns['RAJ2000'], columns['DEJ2000'],
+                                             ra_cen, dec_cen, radius)
+            rows = np.nonzero(inside)[0]
+            for name, dtype in store_columns:
+                pieces[name].append(np.asarray(columns[name][rows]))
+        return dict((name, np.concatenate(pieces[name]) if pieces[name] else np.zeros(0, dtype))
+                    for name, dtype in store_columns)
+
+    # To import VizieR dumps, of a cone (RA, DEC in degrees, radius in
+    # arcsec) or, with whole_sky, of whole surveys. Of a cone only the
+    # partitions wholly inside it are kept; of whole surveys every
+    # partition their sources fall in is taken to be whole in them.
+    # Returns the number of partitions written.
+    def import_dumps(self, file_names, cone = None, table_format = None, whole_sky = False):
+        from astropy.table import Table, vstack
+
+        if cone is None and not whole_sky:
+            raise ValueError('Say which cone the dumps are of (--cone), or that they are of '
+                             'whole surveys (--whole-sky).')
+        pixels = None
+        if cone is not None:
+            # Partitions whose centres are a pixel inside the cone.
+            ra_cen, dec_cen, radius = cone
+            pixrad = max_pixrad(self.nside) * 3600.0
+            pixels = cone_pixels(self.nside, ra_cen, dec_cen, radius - 2 * pixrad)
+            if len(pixels) == 0:
+                raise ValueError('No partition lies wholly within a cone of {:.0f} arcsec; '
+                                 'dumps of cones of {:.0f} arcsec or more are needed.'.format(
+                                     radius, 2 * pixrad))
+
+        tables = [Table.read(file_name, format = table_format) for file_name in file_names]
+        columns = table_columns(vstack(tables, metadata_conflicts = 'silent'))
+        return self.add(columns, pixels)
+
+    # To get partitions from VizieR, one cone around each of them.
+    def fetch(self, pixels):
+        from .vizier import query_vizier
+
+        radius = max_pixrad(self.nside) * 3600.0 * 1.01
+        for pixel in pixels:
+            centre_ra, centre_dec = pix2ang(self.nside, pixel)
+            table = query_vizier(float(centre_ra), float(centre_dec), radius)
+            columns = table_columns(table) if len(table) else empty_columns()
+            self.add(columns, [pixel])
+        return len(pixels)
+
+
+# Function to make the columns of no sources.
+def empty_columns():
+    return dict((name, np.zeros(0, dtype)) for name, dtype in store_columns)
+
+# Function to open the store if there is one.
+def open_store(store_dir = None):
+    store_dir = store_dir or GALEX_STORE
+    if not os.path.exists(os.path.join(store_dir, STORE_FILE)):
+        return None
+    return GalexStore(store_dir)
@@ -0,0 +1,159 @@
+'''HEALPix pixels (NESTED ordering) of positions on the sky.
+
+   Just what the partitioned catalogues need, in NumPy: the pixel of
+   a position, the centre of a pixel and the pixels a cone can reach.
+   The numbers are those of healpy (ang2pix and pix2ang with nest =
+   True, max_pixrad), which is not needed for them.
+
+'''
+
+import math
+import numpy as np
+
+from .cone import angular_separation
+
+
+# Ring and longitude numbers of the first pixel of every base face.
+face_ring = np.array([2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4])
+face_phi = np.array([1, 3, 5, 7, 0, 2, 4, 6, 1, 3, 5, 7])
+
+
+# Function to check that nside is a power of 2, as NESTED needs.
+def check_nside(nside):
+    if nside < 1 or nside & (nside - 1):
+        raise ValueError('nside should be a power of 2: {}'.format(nside))
+
+# Function to find the number of pixels of a map.
+def nside2npix(nside):
+    return 12 * nside * nside
+
+# Function to interleave the bits of x and y (x on the even ones).
+def xy2nest(ix, iy):
+    ix = np.asarray(ix, dtype = np.int64)
+    iy = np.asarray(iy, dtype = np.int64)
+    pix = np.zeros(np.broadcast(ix, iy).shape, dtype = np.int64)
+    bit = 0
+    while np.any((ix >> bit) | (iy >> bit)):
+        pix |= ((ix >> bit) & 1) << (2 * bit)
+        pix |= ((iy >> bit) & 1) << (2 * bit + 1)
+        bit += 1
+    return pix
+
+# Function to part the bits of a pixel within its face into x and y.
+def nest2xy(pix):
+    pix = np.asarray(pix, dtype = np.int64)
+    ix = np.zeros(pix.shape, dtype = np.int64)
+    iy = np.zeros(pix.shape, dtype = np.int64)
+    bit = 0
+    while np.any(pix >> (2 * bit)):
+        ix |= ((pix >> (2 * bit)) & 1) << bit
+        iy |= ((pix >> (2 * bit + 1)) & 1) << bit
+        bit += 1
+    return ix, iy
+
+# Function to find the pixels of positions (RA and DEC in degrees).
+def ang2pix(nside, ra, dec):
+    check_nside(nside)
+    ra = np.asarray(ra, dtype = np.float64)
+    dec = np.asarray(dec, dtype = np.float64)
+    z = np.sin(np.radians(dec))
+    za = np.abs(z)
+    tt = (np.radians(ra) % (2 * np.pi)) / (0.5 * np.pi)   # in [0, 4)
+
+    # Equatorial region.
+    temp1 = nside * (0.5 + tt)
+    temp2 = nside * z * 0.75
+    jp = (temp1 - temp2).astype(np.int64)
+    jm = (temp1 + temp2).astype(np.int64)
+    ifp = jp // nside
+    ifm = jm // nside
+    face = np.where(ifp == ifm, ifp | 4, np.where(ifp < ifm, ifp, ifm + 8))
+    ix = jm & (nside - 1)
+    iy = nside - (jp & (nside - 1)) - 1
+
+    # Polar caps.
+    polar = za > 2.0 / 3.0
+    if np.any(polar):
+        ntt = np.minimum(tt.astype(np.int64), 3)
+        tp = tt - ntt
+        tmp = nside * np.sqrt(3 * (1 - za))
+        jp_cap = np.minimum((tp * tmp).astype(np.int64), nside - 1)
+        jm_cap = np.minimum(((1 - tp) * tmp).astype(np.int64), nside - 1)
+        north = z >= 0
+        face = np.where(polar, np.where(north, ntt, ntt + 8), face)
+        ix = np.where(polar, np.where(north, nside - jm_cap - 1, jp_cap), ix)
+        iy = np.where(polar, np.where(north, nside - jp_cap - 1, jm_cap), iy)
+
+    return face * nside * nside + xy2nest(ix, iy)
+
+# Function to find the pixel of one position (RA and DEC in degrees),
+# as ang2pix() does, in plain Python for the speed of single lookups.
+def ang2pix_one(nside, ra, dec):
+    z = math.sin(math.radians(dec))
+    za = abs(z)
+    tt = (math.radians(ra) % (2 * math.pi)) / (0.5 * math.pi)
+    if za <= 2.0 / 3.0:
+        temp1 = nside * (0.5 + tt)
+        temp2 = nside * z * 0.75
+        jp = int(temp1 - temp2)
+        jm = int(temp1 + temp2)
+        ifp = jp // nside
+        ifm = jm // nside
+        face = (ifp | 4) if ifp == ifm else (ifp if ifp < ifm else ifm + 8)
+        ix = jm & (nside - 1)
+        iy = nside - (jp & (nside - 1)) - 1
+    else:
+        ntt = min(int(tt), 3)
+        tp = tt - ntt
+        tmp = nside * math.sqrt(3 * (1 - za))
+        jp = min(int(tp * tmp), nside - 1)
+        jm = min(int((1 - tp) * tmp), nside - 1)
+        if z >= 0:
+            face, ix, iy = ntt, nside - jm - 1, nside - jp - 1
+        else:
+            face, ix, iy = ntt + 8, jp, jm
+    pix = 0
+    bit = 0
+    while (ix >> bit) | (iy >> bit):
+        pix |= ((ix >> bit) & 1) << (2 * bit)
+        pix |= ((iy >> bit) & 1) << (2 * bit + 1)
+        bit += 1
+    return face * nside * nside + pix
+
+# Function to find the centres of pixels (RA and DEC in degrees).
+def pix2ang(nside, pix):
+    check_nside(nside)
+    pix = np.asarray(pix, dtype = np.int64)
+    npix = nside2npix(nside)
+    face = pix // (nside * nside)
+    ix, iy = nest2xy(pix % (nside * nside))
+
+    jr = face_ring[face] * nside - ix - iy - 1
+    north = jr < nside
+    south = jr > 3 * nside
+    nr = np.where(north, jr, np.where(south, 4 * nside - jr, nside))
+    z = np.where(north, 1 - nr * nr * 4.0 / npix,
+                 np.where(south, nr * nr * 4.0 / npix - 1,
+                          (2 * nside - jr) * 8.0 * nside / npix))
+    kshift = np.where(north | south, 0, (jr - nside) & 1)
+
+    jp = (face_phi[face] * nr + ix - iy + 1 + kshift) // 2
+    jp = np.where(jp > 4 * nside, jp - 4 * nside, jp)
+    jp = np.where(jp < 1, jp + 4 * nside, jp)
+    phi = (jp - (kshift + 1) * 0.5) * (0.5 * np.pi / nr)
+    return np.degrees(phi) % 360.0, np.degrees(np.arcsin(np.clip(z, -1.0, 1.0)))
+
+# Function to find the largest distance (degrees) between the centre
+# of a pixel and its corners.
+def max_pixrad(nside):
+    t1 = (1 - 1.0 / nside) ** 2
+    ra1, dec1 = np.degrees(np.pi / (4 * nside)), np.degrees(np.arcsin(2.0 / 3.0))
+    ra2, dec2 = 0.0, np.degrees(np.arcsin(1 - t1 / 3.0))
+    return float(angular_separation(ra1, dec1, ra2, dec2)) / 3600.0
+
+# Function to list the pixels a cone (radius in arcsec) can reach:
+# those whose centres are within the radius and a pixel of it.
+def cone_pixels(nside, ra, dec, radius):
+    centre_ra, centre_dec = pix2ang(nside, np.arange(nside2npix(nside)))
+    separation = angular_separation(centre_ra, centre_dec, ra, dec)
+    return np.nonzero(separation <= radius + max_pixrad(nside) * 3600.0)[0]
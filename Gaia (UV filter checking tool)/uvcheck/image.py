@@ -0,0 +1,184 @@
+'''The GALEX image method of determining the UVIT FUV and NUV filters,
+   as used by image_gaia_V.2.6.py.
+
+   The bright sources are detected on the GALEX intensity maps
+   themselves (laplacian of gaussian blobs) instead of being taken
+   from the mcat, so only the images of the tile are downloaded.
+   check_image() returns what gaia.check_field() does.
+
+'''
+
+import numpy as np
+
+from .counts import magnuv, magfuv, countnuv, countfuv, countfuv_abs
+from .gaia import (CheckError, field_centre, field_cutout, deg_to_hms,
+                   format_nuv, format_fuv, nuv_safe_filters, fuv_safe_filters,
+                   mark_sources, load_tile_index, fuv_absent_warning, no_galex_images)
+from . import mast
+from .photometry import box_flux
+from .scalespace import scale_space_blobs, pyramid_blobs
+from .tilecache import TileCache
+
+
+# Number of blobs to find before the brightest are picked.
+MIN_BLOBS = 10
+
+# Number of bright sources kept per image.
+NUMBER = 5
+
+
+# Function to detect blobs using the laplacian of gaussian method.
+# The threshold is halved until there are enough of them, over a scale
+# space made once (see scalespace). Returns rows of (y, x, sigma),
+# strongest first; only the first number of them if given. A pyramid
+# level is searched on large images if pyramid is set.
+def detect_blobs(fitsf, min_blobs = MIN_BLOBS, number = None, pyramid = False):
+    # The image values scaled to the range -1 to 1, as skimage wanted.
+    fits_f = (0.99 / fitsf.max()) * fitsf
+
+    if pyramid:
+        blobs_log, response = pyramid_blobs(fits_f, min_blobs, number)
+    else:
+        blobs_log, response = scale_space_blobs(fits_f, min_blobs, number)
+    return blobs_log
+
+# Function to detect blobs on a GALEX intensity map and estimate their
+# fluxes. Returns the fluxes, RA and DEC of the brightest few. The
+# marked image is saved if figure_name is given, by the renderer if
+# there is one; cache_file is the image cache of the map (see
+# gaia.field_cutout). pyramid is passed on to detect_blobs().
+def image_sources(int_map, cc, instrument, figure_name = None, number = NUMBER,
+                  cache_file = None, renderer = None, pyramid = False):
+    fitsf, w, xfi, yfi = field_cutout(int_map, cc, instrument, cache_file)
+    blobs_log = detect_blobs(fitsf, pyramid = pyramid)
+
+    # Using a 7x7 box to estimate the flux of detected objects.
+    # the units are counts/sec/pixel.
+    fluxes = box_flux(fitsf, blobs_log[:, 1], blobs_log[:, 0])
+
+    # The brightest first, as sorting the (flux, blob) pairs did.
+    order = np.lexsort((blobs_log[:, 2], blobs_log[:, 1], blobs_log[:, 0], fluxes))[::-1]
+    order = order[:number]
+    pos_y = blobs_log[order, 0]
+    pos_x = blobs_log[order, 1]
+    ra_deg, dec_deg = w.all_pix2world(pos_x + xfi, pos_y + yfi, 0)
+
+    if figure_name is not None:
+        mark_sources(fitsf, pos_x, pos_y, figure_name, renderer)
+    return fluxes[order], ra_deg, dec_deg
+
+# Function to check a field from the GALEX images alone. Returns a
+# dictionary like gaia.check_field() does, raises CheckError if it
+# cannot be done. The marked images are saved as check_field() does.
+def check_image(instrument, RA, DEC,
+                session = None,
+                tile_index = None,
+                tile_cache = None,
+                make_plots = True,
+                renderer = None,
+                pyramid = False):
+
+    from astropy.table import hstack
+
+    if renderer is not None and renderer.mode == 'off':
+        make_plots = False
+
+    cc = field_centre(RA, DEC)
+
+    result = {'instrument': instrument,
+              'RA': RA,
+              'DEC': DEC,
+              'method': 'image',
+              'catalogue': None,
+              'fuv_absent': False,
+              'figures': [],
+              'downloads': [],
+              'notes': []}
+
+    # To check if Galactic latitude is between -30 to 30.
+    gal_lat = cc.galactic.b.value
+    result['gal_plane'] = -30.0 <= gal_lat <= 30.0
+
+    if session is None:
+        from requests import Session
+        session = Session()
+    if tile_cache is None:
+        tile_cache = TileCache(session = session)
+    if tile_index is None:
+        tile_index = load_tile_index()
+
+    # To find the GALEX tile and its images.
+    if tile_index is not None:
+        products = tile_index.products(cc.ra.deg, cc.dec.deg)
+    else:
+        tile_page = mast.find_tile(session, RA, DEC, radius = '0.0001')
+        products = None
+        if tile_page is not None:
+            products = mast.product_links(session, tile_page)
+
+    if products is None or len(products[1]) == 0:
+        gal_plane_info = ''
+        if result['gal_plane']:
+            gal_plane_info = 'Your field lies on the Galactic plane.\n'
+        raise CheckError('No GALEX images for this field.',
+                         [gal_plane_info + no_galex_images])
+
+    # The images are fetched together over the session, through the
+    # tile cache.
+    downloads = tile_cache.fetch_all(products[1])
+    result['downloads'] = downloads
+
+    nuv_intmap = None
+    fuv_intmap = None
+    image_caches = {}
+    for link, download in zip(products[1], downloads):
+        image_file = download[0]
+        detector = str(image_file[-14:-13]).lower()
+        if detector == 'f':
+            fuv_intmap = image_file
+        elif detector == 'n':
+            nuv_intmap = image_file
+        else:
+            raise CheckError('Cannot determine filter! exiting.')
+        image_caches[image_file] = tile_cache.sidecar(link, '.int.npy')
+
+    # NUV
+    if nuv_intmap is None:
+        raise CheckError('Could not find the NUV image for this region.')
+    figure_name = None
+    if make_plots:
+        figure_name = nuv_intmap.replace('.fits.gz', '.png')
+        result['figures'].append(figure_name)
+    n_fluxes, n_ra, n_dec = image_sources(nuv_intmap, cc, instrument, figure_name,
+                                          cache_file = image_caches[nuv_intmap],
+                                          renderer = renderer,
+                                          pyramid = pyramid)
+    n_mags = magnuv(n_fluxes)
+    nuv_res = hstack([deg_to_hms(n_ra, n_dec), format_nuv(countnuv(n_mags))])
+    nuv_table = 'NUV_' + nuv_intmap.replace('.fits.gz', '-nd-int.txt')
+
+    # FUV
+    if fuv_intmap is None:
+        result['fuv_absent'] = True
+        result['notes'].append(fuv_absent_warning)
+        fuv_res = hstack([deg_to_hms(n_ra, n_dec), format_fuv(countfuv_abs(n_mags))])
+        fuv_table = 'FUV_' + nuv_intmap.replace('.fits.gz', '-fd-int.txt')
+    else:
+        figure_name = None
+        if make_plots:
+            figure_name = fuv_intmap.replace('.fits.gz', '.png')
+            result['figures'].append(figure_name)
+        f_fluxes, f_ra, f_dec = image_sources(fuv_intmap, cc, instrument, figure_name,
+                                              cache_file = image_caches[fuv_intmap],
+                                              renderer = renderer,
+                                              pyramid = pyramid)
+        f_mags = magfuv(f_fluxes)
+        fuv_res = hstack([deg_to_hms(f_ra, f_dec), format_fuv(countfuv(f_mags))])
+        fuv_table = 'FUV_' + fuv_intmap.replace('.fits.gz', '-fd-int.txt')
+
+    result['tables'] = (nuv_table, fuv_table)
+    result['nuv_res'] = nuv_res
+    result['fuv_res'] = fuv_res
+    result['nuv_safe'] = nuv_safe_filters(nuv_res)
+    result['fuv_safe'] = fuv_safe_filters(fuv_res)
+    return result
@@ -0,0 +1,111 @@
+'''Cutouts of the GALEX intensity maps (int).
+
+   The scripts decompressed a whole int map to look at the few hundred
+   pixels around the field. Here a gzipped map is decompressed once
+   into an uncompressed float32 array (.npy) which later reads
+   memory-map, so only the pixels of the cutout are read from disk.
+   Uncompressed and tile-compressed FITS copies (such as .fits.fz) are
+   read a section at a time as they are.
+
+   The circular masks of the field are made once per radius.
+
+'''
+
+import os
+import numpy as np
+
+from .tilecache import part_name
+
+
+# Circular masks already made, by radius (pixels).
+masks = {}
+
+
+# Function to name the image cache of an int map next to it.
+def image_file_name(int_map):
+    stem = int_map[:-len('.fits.gz')] if int_map.endswith('.fits.gz') \
+           else os.path.splitext(int_map)[0]
+    return stem + '_image.npy'
+
+# Function to find the HDU holding the image of a FITS file (the
+# first one for the GALEX maps, the second for tile-compressed copies).
+def image_hdu(hdu_list):
+    from astropy.io.fits import CompImageHDU
+
+    for hdu in hdu_list[:2]:
+        if isinstance(hdu, CompImageHDU) or hdu.header.get('NAXIS', 0) == 2:
+            return hdu
+    raise IOError('No image in the FITS file.')
+
+# Function to read the header of the image of an int map. The header
+# of a gzipped map is read alone; opening the map would decompress it
+# to its end.
+def read_header(int_map):
+    from astropy.io import fits
+
+    if int_map.endswith('.gz'):
+        import gzip
+
+        with gzip.open(int_map, 'rb') as f:
+            try:
+                return fits.Header.fromfile(f)
+            except (EOFError, ValueError):
+                raise IOError('Could not read the header of {}'.format(int_map))
+
+    with fits.open(int_map) as hdu_list:
+        return image_hdu(hdu_list).header.copy()
+
+# Function to read a gzipped int map through its image cache, building
+# the cache first if it is missing or older than the map. Returns the
+# memory-mapped float32 image.
+def read_image(int_map, cache_file = None):
+    from astropy.io import fits
+
+    if cache_file is None:
+        cache_file = image_file_name(int_map)
+
+    fresh = os.path.exists(cache_file)
+    if fresh and os.path.exists(int_map):
+        fresh = os.path.getmtime(cache_file) >= os.path.getmtime(int_map)
+    if fresh:
+        return np.load(cache_file, mmap_mode = 'r')
+
+    with fits.open(int_map) as hdu_list:
+        image = image_hdu(hdu_list).data.astype(np.float32)
+    part_file = part_name(cache_file)
+    try:
+        with open(part_file, 'wb') as part:
+            np.save(part, image)
+        os.rename(part_file, cache_file)
+    except (IOError, OSError):
+        return image   # A read-only place is fine, the image is in memory.
+    return np.load(cache_file, mmap_mode = 'r')
+
+# Function to read the pixels [y0:y1, x0:x1] of an int map (cut at the
+# edges of the map) as a float32 array of its own.
+def read_section(int_map, y0, y1, x0, x1, cache_file = None):
+    from astropy.io import fits
+
+    y0 = max(0, y0)
+    x0 = max(0, x0)
+    if int_map.endswith('.gz'):
+        image = read_image(int_map, cache_file)
+        return np.array(image[y0:y1, x0:x1], dtype = np.float32)
+
+    with fits.open(int_map, memmap = True) as hdu_list:
+        hdu = image_hdu(hdu_list)
+        ny, nx = hdu.shape
+        y1 = max(y0, min(y1, ny))
+        x1 = max(x0, min(x1, nx))
+        return np.array(hdu.section[y0:y1, x0:x1], dtype = np.float32)
+
+# Function to get the mask of the pixels outside a circle of radius
+# (pixels), on a square 2 * radius on a side. Made once per radius.
+def circular_mask(radius):
+    mask = masks.get(radius)
+    if mask is None:
+        yo, xo = np.ogrid[-radius: radius, -radius: radius]
+        mask = xo * xo + yo * yo > radius ** 2
+        mask.setflags(write = False)
+        masks[radius] = mask
+    return mask
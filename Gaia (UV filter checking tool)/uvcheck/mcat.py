@@ -0,0 +1,93 @@
+'''Column cache of the GALEX merged catalogues (mcat).
+
+   Reading a gzipped mcat means decompressing all of its columns, and
+   the scripts then walked the rows one by one as Python tuples. Here
+   the five columns used by the filter check are decompressed once and
+   written into an uncompressed structured array (.npy) which later
+   reads memory-map; the selection of the brightest sources in a field
+   then runs on NumPy views of it.
+
+'''
+
+import os
+import numpy as np
+
+from .cone import cone_search
+from .tilecache import part_name
+
+
+# Fields of the column cache and the mcat columns they come from.
+MCAT_COLUMNS = [('alpha', 'alpha_j2000_merged'),
+                ('delta', 'delta_j2000_merged'),
+                ('nuv_mag', 'nuv_mag'),
+                ('nuv_fwhm', 'nuv_fwhm_world'),
+                ('fuv_mag', 'fuv_mag')]
+
+# Sources fainter than this (magnitude) are left out.
+MAG_LIMIT = 22.
+
+
+# Function to name the column cache of an mcat next to it.
+def columns_file_name(catalogue):
+    stem = catalogue[:-len('.fits.gz')] if catalogue.endswith('.fits.gz') \
+           else os.path.splitext(catalogue)[0]
+    return stem + '_columns.npy'
+
+# Function to read the needed columns of an mcat into a structured
+# array. The columns keep their FITS types (in native byte order).
+def mcat_columns(catalogue):
+    from astropy.io import fits
+
+    with fits.open(catalogue) as hdu:
+        data = hdu[1].data
+        dtype = [(field, data[column].dtype.newbyteorder('=').str)
+                 for field, column in MCAT_COLUMNS]
+        columns = np.empty(len(data), dtype = dtype)
+        for field, column in MCAT_COLUMNS:
+            columns[field] = data[column]
+    return columns
+
+# Function to read an mcat through its column cache, building the
+# cache first if it is missing or older than the mcat. Returns the
+# memory-mapped structured array (fields alpha, delta, nuv_mag,
+# nuv_fwhm and fuv_mag).
+def read_mcat(catalogue, cache_file = None):
+    if cache_file is None:
+        cache_file = columns_file_name(catalogue)
+
+    fresh = os.path.exists(cache_file)
+    if fresh and os.path.exists(catalogue):
+        fresh = os.path.getmtime(cache_file) >= os.path.getmtime(catalogue)
+    if fresh:
+        return np.load(cache_file, mmap_mode = 'r')
+
+    columns = mcat_columns(catalogue)
+    part_file = part_name(cache_file)
+    try:
+        with open(part_file, 'wb') as part:
+            np.save(part, columns)
+        os.rename(part_file, cache_file)
+    except (IOError, OSError):
+        return columns   # A read-only place is fine, the columns are in memory.
+    return np.load(cache_file, mmap_mode = 'r')
+
+# Function to select the brightest sources within radius (arcsec) of
+# the field centre, leaving out undetected (-999) and faint ones.
+# Returns the rows (mag, ra, dec, extra columns...) of the brightest
+# few, ordered as sorting the row tuples would order them.
+def bright_sources(mag, alpha, delta, ra_cen, dec_cen, radius,
+                   extra = (), number = 5, limit = MAG_LIMIT):
+    mag = np.asarray(mag)
+    keep = (mag.astype(int) != -999) & (mag <= limit)
+    rows = np.flatnonzero(keep)
+
+    inside, separation = cone_search(np.asarray(alpha)[rows],
+                                     np.asarray(delta)[rows],
+                                     ra_cen, dec_cen, radius)
+    rows = rows[inside]
+
+    table = [mag[rows], np.asarray(alpha)[rows], np.asarray(delta)[rows]]
+    table += [np.asarray(column)[rows] for column in extra]
+    table = np.column_stack(table).astype(np.float64)
+    order = np.lexsort(table.T[::-1])
+    return table[order][0:number]
@@ -0,0 +1,51 @@
+'''Aperture photometry on the GALEX intensity maps.
+
+   The scripts used to sum a 7x7 box around every source, one slice at
+   a time. Here the summed-area table (integral image) of the cutout is
+   made once and the box sums of all the sources are gathered from it
+   in one array operation. Boxes that cross the edge of the image are
+   cut at the edge.
+
+'''
+
+import numpy as np
+
+
+# Half size of the box used to estimate the fluxes (7x7 pixels).
+BOX_HALF = 3
+
+
+# Function to make the summed-area table of an image. The table is one
+# row and column larger than the image; table[y, x] is the sum of
+# image[:y, :x].
+def integral_image(image):
+    image = np.asarray(image, dtype = np.float64)
+    table = np.zeros((image.shape[0] + 1, image.shape[1] + 1))
+    np.cumsum(image, axis = 0, out = table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis = 1, out = table[1:, 1:])
+    return table
+
+# Function to sum the image over the boxes [y0:y1, x0:x1] (arrays of
+# pixel indices) from its summed-area table. The boxes are cut at the
+# edges of the image; the parts outside add nothing.
+def box_sums(table, y0, x0, y1, x1):
+    ny = table.shape[0] - 1
+    nx = table.shape[1] - 1
+    y0 = np.clip(y0, 0, ny)
+    y1 = np.clip(y1, y0, ny)
+    x0 = np.clip(x0, 0, nx)
+    x1 = np.clip(x1, x0, nx)
+    return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+# Function to estimate the fluxes of sources at (x, y) (pixels of the
+# image, 0 based) as the sums of the (2 * half + 1) boxes starting
+# half pixels before them. The summed-area table can be passed in to
+# be reused.
+def box_flux(image, x, y, half = BOX_HALF, table = None):
+    if table is None:
+        table = integral_image(image)
+
+    # Truncated as int() did.
+    xdet = np.trunc(np.asarray(x, dtype = np.float64)).astype(np.int64)
+    ydet = np.trunc(np.asarray(y, dtype = np.float64)).astype(np.int64)
+    return box_sums(table, ydet - half, xdet - half, ydet + half + 1, xdet + half + 1)
@@ -0,0 +1,279 @@
+'''Filter check service on a local HTTP/JSON endpoint.
+
+   The TD1 index, the GALEX tile index, the tile cache and the HTTP
+   sessions are set up once and kept warm between checks, which are
+   answered one thread per request:
+
+       POST /gaia    {"instrument": "uvit", "ra": "7:36:51.396",
+                      "dec": "65:36:9.170", "method": "auto"}
+       POST /theia   {"instrument": "uvit", "ra": "12:57:59.71",
+                      "dec": "27:59:45.5"}
+       GET  /health
+
+   The answers carry the safe filters and the count rate tables, and
+   under "files" the files the scripts write for the field, with their
+   contents. A field that cannot be checked is answered with status
+   422 and the error (as in error.txt). Fields checked before are
+   answered from the verdict cache ("cached": true) unless the request
+   has "refresh": true. Fields checked afresh carry the timings of the
+   stages of the check under "stages" (see uvcheck.stages).
+
+   The VIS check is the vischeck package of the Theia directory, found
+   next to this one unless UVCHECK_THEIA says otherwise.
+
+'''
+
+import os
+import sys
+import json
+import time
+import threading
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+
+from .td1 import TD1Index, TD1_CATALOGUE
+from .tiles import GALEX_TILES
+from .tilecache import TileCache
+from .verdicts import VerdictCache
+from .gaia import CheckError, check_field, load_tile_index, note_files, verdict, cacheable
+
+
+HOST = '127.0.0.1'
+PORT = 8737
+
+THEIA_DIR = os.environ.get('UVCHECK_THEIA',
+                           os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+                               os.path.abspath(__file__)))),
+                               'Theia (UVIT VIS Filter Check)'))
+
+# Fields every check request should have.
+required_fields = ['ra', 'dec']
+
+# Connections kept open per host by the sessions.
+POOL_SIZE = 16
+
+# Packages imported before the service starts.
+WARM_MODULES = ['astropy.units', 'astropy.coordinates', 'astropy.table',
+                'astropy.io.ascii', 'bs4']
+
+
+# Function to make an HTTP session with a connection pool large
+# enough for the request threads.
+def pooled_session(pool_size = POOL_SIZE):
+    from requests import Session
+    from requests.adapters import HTTPAdapter
+
+    session = Session()
+    adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Function to import the packages the checks need before the request
+# threads do; threads importing one package at once can deadlock.
+def warm_up(modules = WARM_MODULES):
+    from importlib import import_module
+
+    for name in modules:
+        import_module(name)
+
+class FilterService(object):
+
+    def __init__(self, td1_catalogue = TD1_CATALOGUE,
+                 tile_listing = GALEX_TILES,
+                 theia_dir = THEIA_DIR):
+        self.session = pooled_session()
+        self.tile_cache = TileCache(session = self.session)
+        self.verdicts = VerdictCache()
+        try:
+            self.td1_index = TD1Index.load(os.path.abspath(td1_catalogue))
+        except IOError:
+            self.td1_index = None
+        self.tile_index = load_tile_index(os.path.abspath(tile_listing))
+        self.theia_dir = os.path.abspath(theia_dir)
+        self.theia = None
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.served = 0
+
+    # To import the VIS check on first use.
+    def theia_module(self):
+        with self.lock:
+            if self.theia is None:
+                if self.theia_dir not in sys.path:
+                    sys.path.append(self.theia_dir)
+                from vischeck import theia
+                self.theia = theia
+        return self.theia
+
+    def count(self):
+        with self.lock:
+            self.served += 1
+
+    # To check a field with the GALEX catalogue, GALEX image, TD1 or
+    # VizieR method. Returns the status and the answer.
+    def gaia(self, request):
+        instrument = str(request.get('instrument', 'uvit'))
+        RA = str(request['ra'])
+        DEC = str(request['dec'])
+        method = request.get('method', 'auto')
+
+        start = time.time()
+        if not request.get('refresh', False):
+            answer = self.verdicts.get(instrument, RA, DEC, method)
+            if answer is not None:
+                self.count()
+                answer.update({'ra': RA, 'dec': DEC, 'cached': True})
+                answer['files'] = dict(answer['files'])
+                answer['seconds'] = time.time() - start
+                return 200, answer
+
+        try:
+            if method == 'image':
+                from .image import check_image
+                result = check_image(instrument, RA, DEC,
+                                     session = self.session,
+                                     tile_index = self.tile_index,
+                                     tile_cache = self.tile_cache,
+                                     make_plots = False)
+            elif method == 'vizier':
+                from .vizier import check_vizier
+                result = check_vizier(instrument, RA, DEC)
+            else:
+                result = check_field(instrument, RA, DEC,
+                                     session = self.session,
+                                     td1_index = self.td1_index,
+                                     tile_index = self.tile_index,
+                                     tile_cache = self.tile_cache,
+                                     make_plots = False,
+                                     method = None if method == 'auto' else method)
+        except CheckError as error:
+            files = note_files(error.notes) + [('error.txt', str(error))]
+            return 422, {'error': str(error),
+                         'notes': error.notes,
+                         'files': dict(files)}
+        finally:
+            self.count()
+
+        answer = verdict(result)
+        if cacheable(answer):
+            self.verdicts.put(instrument, RA, DEC, method, answer)
+        answer['cached'] = False
+        if 'stages' in result:
+            answer['stages'] = result['stages'].record()
+        answer['files'] = dict(answer['files'])
+        answer['seconds'] = time.time() - start
+        return 200, answer
+
+    # To check the VIS filters of a field. Returns the status and the
+    # answer.
+    def theia_check(self, request):
+        theia = self.theia_module()
+        instrument = str(request.get('instrument', 'uvit'))
+        RA = str(request['ra'])
+        DEC = str(request['dec'])
+
+        start = time.time()
+        try:
+            result = theia.check_field(instrument, RA, DEC, session = self.session)
+        except theia.CheckError as error:
+            return 422, {'error': str(error)}
+        finally:
+            self.count()
+
+        return 200, {'instrument': instrument,
+                     'ra': RA,
+                     'dec': DEC,
+                     'columns': theia.columns,
+                     'rows': result['rows'],
+                     'safe_filters': result['safe_filters'],
+                     'too_close': result['too_close'],
+                     'close_pairs': result['close_pairs'],
+                     'files': {theia.output_name(result): theia.output_text(result)},
+                     'stages': result['stages'].record(),
+                     'seconds': time.time() - start}
+
+    def health(self):
+        return 200, {'status': 'ok',
+                     'uptime': time.time() - self.started,
+                     'served': self.served,
+                     'td1_index': self.td1_index is not None,
+                     'tile_index': self.tile_index is not None,
+                     'tile_cache': self.tile_cache.stats(),
+                     'verdicts': self.verdicts.stats()}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    def answer(self, status, body):
+        text = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            self.answer(*self.server.service.health())
+        else:
+            self.answer(404, {'error': 'Unknown path: {}'.format(self.path)})
+
+    def do_POST(self):
+        service = self.server.service
+        routes = {'/gaia': service.gaia, '/theia': service.theia_check}
+        route = routes.get(self.path.rstrip('/'))
+        if route is None:
+            self.answer(404, {'error': 'Unknown path: {}'.format(self.path)})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            if not isinstance(request, dict):
+                raise ValueError('The request should be a JSON object.')
+            missing = [field for field in required_fields if field not in request]
+            if missing:
+                raise ValueError('Missing field: {}'.format(', '.join(missing)))
+        except ValueError as error:
+            self.answer(400, {'error': str(error)})
+            return
+
+        try:
+            self.answer(*route(request))
+        except Exception as error:   # A failed check should not stop the service.
+            self.answer(500, {'error': '{}: {}'.format(type(error).__name__, error)})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+# Function to run the service until interrupted. The GALEX products
+# are downloaded into download_dir.
+def serve(host = HOST, port = PORT, download_dir = '.', verbose = True):
+    warm_up()
+    service = FilterService()
+
+    # The GALEX products are downloaded here.
+    os.chdir(download_dir)
+
+    server = ThreadingServer((host, port), RequestHandler)
+    server.service = service
+    server.verbose = verbose
+    print('Serving filter checks on http://{}:{}/'.format(host, server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,289 @@
+'''All-sky map of the filter safety, for answers without a check.
+
+   For every HEALPix pixel (NESTED) and every instrument of
+   field_radius, the map keeps the count rates of the brightest
+   sources any pointing inside the pixel could have in its field:
+   those within the field radius and a pixel of the pixel centre
+   (worst), and of those every such pointing has in its field, within
+   the field radius less a pixel (sure). All the filters of a band
+   (the gratings too) go with one rate of a source, so four numbers
+   are kept per pixel: the GALEX NUV and FUV rates in the first filter
+   (from the local copy of the catalogue, uvcheck.galexstore) and the
+   TD1 NUV and FUV fluxes. Rates too faint to matter are left out.
+
+   A lookup takes a filter to be safe when its worst rate is below the
+   limit by the margin, unsafe when its sure rate is above the limit by
+   the margin, and answers only when every filter is one or the other.
+   Otherwise (near the limits), where the GALEX copy lacks partitions
+   of the pixel and near the Galactic plane, it does not answer, and
+   the field should be checked in full. The map is more cautious than
+   a check, taking the brightest source of both catalogues; without a
+   GALEX copy it answers for no field.
+
+   The map is kept in ~/.uvcheck/skymap.npz, or wherever
+   UVCHECK_SKY_MAP points.
+
+'''
+
+import os
+import time
+import numpy as np
+
+from .healpix import ang2pix_one, pix2ang, max_pixrad, nside2npix, check_nside
+from .counts import (count_limit, nuv_grating_limit, fuv_grating_limit,
+                     NUV_THROUGHPUT, NUV_MG1, NUV_CORRECTION,
+                     FUV_THROUGHPUT, FUV_MG1, FUV_CORRECTION, FUV_FROM_NUV,
+                     FAINT_MAG, corrected_mag, flux_norm, TD1_NUV_RATES, TD1_FUV_RATES)
+from .td1 import TD1Index, TD1_CATALOGUE
+from .gaia import CheckError, field_radius
+
+
+SKY_MAP = os.environ.get('UVCHECK_SKY_MAP',
+                         os.path.join(os.path.expanduser('~'), '.uvcheck', 'skymap.npz'))
+
+# Resolution of the map.
+NSIDE = 128
+
+# Factor (in count rate) a rate should be off a limit to be decided
+# by the map; the map keeps rates down to MAX_MARGIN below the limits.
+MAP_MARGIN = 2.0
+MAX_MARGIN = 4.0
+
+# Galactic latitude (degrees) within which the checks stop, and the
+# map does not answer (for any pointing of the pixel).
+PLANE_LATITUDE = 30.0
+
+# Numbers kept per pixel.
+map_columns = ['galex_nuv', 'galex_fuv', 'td1_nuv', 'td1_fuv']
+
+# The filters, in the order the checks list the safe ones (the
+# grating goes with the first filter of the band), with their limits.
+nuv_map_filters = ['Silica', 'NUV-grating', 'NUV-B4', 'NUV-B13', 'NUV-B15', 'NUV-N2']
+fuv_map_filters = ['CaF2', 'FUV-grating', 'BaF2', 'Sapphire', 'Silica']
+nuv_map_limits = [count_limit, nuv_grating_limit] + [count_limit] * 4
+fuv_map_limits = [count_limit, fuv_grating_limit] + [count_limit] * 3
+
+# Rate of every filter per unit of the GALEX and TD1 numbers kept.
+nuv_factors = [(float(throughput), float(rate) / flux_norm) for throughput, rate in
+               zip(NUV_THROUGHPUT[:1].tolist() + NUV_THROUGHPUT.tolist(),
+                   TD1_NUV_RATES[:1].tolist() + TD1_NUV_RATES.tolist())]
+fuv_factors = [(float(throughput), float(rate) / flux_norm) for throughput, rate in
+               zip(FUV_THROUGHPUT[:1].tolist() + FUV_THROUGHPUT.tolist(),
+                   TD1_FUV_RATES[:1].tolist() + TD1_FUV_RATES.tolist())]
+
+
+# Function to find the rate of GALEX magnitudes in the first filter
+# (0 where not measured).
+def galex_rate(mag, mg1, correction, shift = 0.0):
+    measured = ~np.isnan(mag)
+    mag_c = corrected_mag(np.where(measured, mag, FAINT_MAG), correction) - shift
+    return np.where(measured, 10.0 ** ((mg1 - mag_c) * 0.4), 0.0)
+
+# Function to find the faintest GALEX rate worth keeping for the
+# filters of factors and limits.
+def floor(factors, limits):
+    return min(limit / galex for (galex, td1), limit in zip(factors, limits)) / MAX_MARGIN
+
+# Function to find the rates of the filters of a band from its GALEX
+# and TD1 numbers, the larger of the two.
+def band_rates(galex, td1, factors):
+    return [max(galex * galex_factor, td1 * td1_factor) for galex_factor, td1_factor in factors]
+
+# Function to turn positions (degrees) to unit vectors.
+def unit_vectors(ra, dec):
+    ra = np.radians(ra)
+    dec = np.radians(dec)
+    return np.column_stack([np.cos(dec) * np.cos(ra),
+                            np.cos(dec) * np.sin(ra),
+                            np.sin(dec)])
+
+# Function to find the chord of an angle (degrees).
+def chord(angle):
+    return 2 * np.sin(np.radians(min(angle, 180.0)) / 2)
+
+# Function to gather the bright sources of the TD1 catalogue and the
+# GALEX store. Returns their positions and a row of map_columns each.
+def bright_sources(td1_index, store = None):
+    ra = [td1_index.ra]
+    dec = [td1_index.dec]
+    nuv = np.where(np.isnan(td1_index.nuv_flux), 0.0, td1_index.nuv_flux)
+    fuv = np.where(np.isnan(td1_index.fuv_flux), 0.0, td1_index.fuv_flux)
+    zeros = np.zeros(len(nuv))
+    values = [np.column_stack([zeros, zeros, nuv, fuv])]
+
+    if store is not None:
+        nuv_floor = floor(nuv_factors, nuv_map_limits)
+        fuv_floor = floor(fuv_factors, fuv_map_limits)
+        for pixel in store.partitions():
+            columns = store.read(pixel)
+            nuv_mag = np.asarray(columns['NUV'], dtype = np.float64)
+            fuv_mag = np.asarray(columns['FUV'], dtype = np.float64)
+            nuv = galex_rate(nuv_mag, NUV_MG1, NUV_CORRECTION)
+            # Without FUV the check takes M_fuv = M_nuv - 1.65.
+            fuv = np.where(np.isnan(fuv_mag),
+                           galex_rate(nuv_mag, FUV_MG1, NUV_CORRECTION, FUV_FROM_NUV),
+                           galex_rate(fuv_mag, FUV_MG1, FUV_CORRECTION))
+            bright = (nuv >= nuv_floor) | (fuv >= fuv_floor)
+            zeros = np.zeros(np.count_nonzero(bright))
+            ra.append(np.asarray(columns['RAJ2000'])[bright])
+            dec.append(np.asarray(columns['DEJ2000'])[bright])
+            values.append(np.column_stack([nuv[bright], fuv[bright], zeros, zeros]))
+    return np.concatenate(ra), np.concatenate(dec), np.concatenate(values)
+
+# Function to find, for every pixel, the largest numbers of the
+# sources within radius (degrees) of its centre.
+def disc_maxima(tree, vectors, values, radius, npix):
+    maxima = np.zeros((npix, values.shape[1]), dtype = np.float64)
+    if radius <= 0:
+        return maxima
+    neighbours = tree.query_ball_point(vectors, chord(radius))
+    counts = np.array([len(pixels) for pixels in neighbours])
+    if counts.sum() == 0:
+        return maxima
+    pixels = np.concatenate([np.asarray(p, dtype = np.intp) for p in neighbours if len(p)])
+    np.maximum.at(maxima, pixels, np.repeat(values, counts, axis = 0))
+    return maxima
+
+# Function to find the pixels whose discs (radius in degrees) lie
+# wholly within partitions of the GALEX store.
+def store_coverage(store, centres, radius):
+    from scipy.spatial import cKDTree
+
+    npix = nside2npix(store.nside)
+    present = np.zeros(npix, dtype = bool)
+    present[store.partitions()] = True
+    tree = cKDTree(unit_vectors(*pix2ang(store.nside, np.arange(npix))))
+    reach = tree.query_ball_point(centres, chord(radius + max_pixrad(store.nside)))
+    return np.array([present[partitions].all() for partitions in reach])
+
+# Function to build the map from the TD1 catalogue and the GALEX store
+# (if any). Returns the arrays saved by save_sky_map().
+def build_sky_map(nside = NSIDE, td1_catalogue = TD1_CATALOGUE, store = None, radii = None):
+    from scipy.spatial import cKDTree
+    from astropy.coordinates import SkyCoord
+
+    check_nside(nside)
+    radii = radii or field_radius
+    instruments = sorted(radii)
+    npix = nside2npix(nside)
+    pixrad = max_pixrad(nside)
+
+    centre_ra, centre_dec = pix2ang(nside, np.arange(npix))
+    centres = unit_vectors(centre_ra, centre_dec)
+    gal_lat = SkyCoord(centre_ra, centre_dec, unit = 'deg').galactic.b.degree
+
+    ra, dec, values = bright_sources(TD1Index.load(td1_catalogue), store)
+    tree = cKDTree(centres)
+    vectors = unit_vectors(ra, dec)
+
+    shape = (len(instruments), npix, len(map_columns))
+    worst = np.zeros(shape, dtype = np.float32)
+    sure = np.zeros(shape, dtype = np.float32)
+    covered = np.zeros(shape[:2], dtype = bool)
+    for k, instrument in enumerate(instruments):
+        radius = radii[instrument] / 3600.0
+        worst[k] = disc_maxima(tree, vectors, values, radius + pixrad, npix)
+        sure[k] = disc_maxima(tree, vectors, values, radius - pixrad, npix)
+        if store is not None:
+            covered[k] = store_coverage(store, centres, radius + pixrad)
+
+    return {'nside': nside,
+            'instruments': np.array(instruments),
+            'radii': np.array([radii[name] for name in instruments], dtype = np.float64),
+            'columns': np.array(map_columns),
+            'worst': worst,
+            'sure': sure,
+            'covered': covered,
+            'plane': np.abs(gal_lat) - pixrad <= PLANE_LATITUDE,
+            'built': time.time()}
+
+# Function to write the map, compressed (most pixels have no bright
+# source), under its name only when complete.
+def save_sky_map(sky_map, file_name = None):
+    from .tilecache import part_name
+
+    file_name = file_name or SKY_MAP
+    if os.path.dirname(file_name) and not os.path.isdir(os.path.dirname(file_name)):
+        os.makedirs(os.path.dirname(file_name))
+    part_file = part_name(file_name)
+    with open(part_file, 'wb') as part:
+        np.savez_compressed(part, **sky_map)
+    os.rename(part_file, file_name)
+    return file_name
+
+
+
+class SkyMap(object):
+
+    def __init__(self, arrays):
+        self.nside = int(arrays['nside'])
+        self.instruments = [str(name) for name in arrays['instruments']]
+        self.worst = arrays['worst']
+        self.sure = arrays['sure']
+        self.covered = arrays['covered']
+        self.plane = arrays['plane']
+        self.built = float(arrays['built'])
+
+    @classmethod
+    def load(cls, file_name = None):
+        with np.load(file_name or SKY_MAP) as arrays:
+            return cls(dict((key, arrays[key]) for key in arrays.files))
+
+    # To decide the filters of a band from the numbers of a pixel.
+    # Returns the safe ones, or None if any is near its limit.
+    @staticmethod
+    def decide(worst, sure, filters, limits, margin):
+        safe = []
+        for name, worst_rate, sure_rate, limit in zip(filters, worst, sure, limits):
+            if worst_rate * margin <= limit:
+                safe.append(name)
+            elif sure_rate <= limit * margin:
+                return None
+        return safe
+
+    # To look up the safe filters of a pointing (degrees). Returns a
+    # dictionary with nuv_safe, fuv_safe and the worst rates of the
+    # filters (as the count columns), or None where the field should be
+    # checked in full. Plain Python from the pixel on, for speed.
+    def lookup(self, instrument, ra, dec, margin = MAP_MARGIN):
+        if instrument not in self.instruments or margin > MAX_MARGIN:
+            return None
+        k = self.instruments.index(instrument)
+        pixel = ang2pix_one(self.nside, ra, dec)
+        if self.plane[pixel] or not self.covered[k, pixel]:
+            return None
+
+        galex_nuv, galex_fuv, td1_nuv, td1_fuv = self.worst[k, pixel].tolist()
+        nuv_worst = band_rates(galex_nuv, td1_nuv, nuv_factors)
+        fuv_worst = band_rates(galex_fuv, td1_fuv, fuv_factors)
+        galex_nuv, galex_fuv, td1_nuv, td1_fuv = self.sure[k, pixel].tolist()
+        nuv_sure = band_rates(galex_nuv, td1_nuv, nuv_factors)
+        fuv_sure = band_rates(galex_fuv, td1_fuv, fuv_factors)
+
+        nuv_safe = self.decide(nuv_worst, nuv_sure, nuv_map_filters, nuv_map_limits, margin)
+        fuv_safe = self.decide(fuv_worst, fuv_sure, fuv_map_filters, fuv_map_limits, margin)
+        if nuv_safe is None or fuv_safe is None:
+            return None
+        return {'nuv_safe': nuv_safe,
+                'fuv_safe': fuv_safe,
+                'nuv_rates': nuv_worst[:1] + nuv_worst[2:],
+                'fuv_rates': fuv_worst[:1] + fuv_worst[2:]}
+
+
+# Function to turn a sexagesimal RA DEC to degrees, as fast as can be.
+def sky_position(RA, DEC):
+    if not (DEC.count(':') == RA.count(':') == 2):
+        raise CheckError('Check your RA DEC input.')
+    position = []
+    for value, scale in [(RA, 15.0), (DEC, 1.0)]:
+        hours, minutes, seconds = [abs(float(part)) for part in value.split(':')]
+        number = scale * (hours + minutes / 60.0 + seconds / 3600.0)
+        position.append(-number if value.strip().startswith('-') else number)
+    return position[0], position[1]
+
+# Function to open the map if there is one.
+def open_sky_map(file_name = None):
+    file_name = file_name or SKY_MAP
+    if not os.path.exists(file_name):
+        return None
+    return SkyMap.load(file_name)
@@ -0,0 +1,218 @@
+'''Timings and resources of the stages of a check.
+
+   A Stages keeps, for every stage of a check, the wall time, the bytes
+   transferred, the rows scanned, the sources selected and the peak
+   memory of the process when the stage ended. Every stage is of a kind
+   (network, FITS I/O or compute), so that the records of many checks
+   (a batch) can be summed up to show which of them the time goes to.
+
+   The scripts write the record as JSON next to their outputs
+   (stages.json); python -m uvcheck stages sums up such files. The
+   records of the VIS check (vischeck.stages) are of the same form.
+
+   The peak memory is the high-water mark of the resident size of the
+   whole process, as the operating system tells it (None where it
+   cannot); with checks in threads it is shared between them.
+
+'''
+
+import os
+import sys
+import json
+import time
+import threading
+
+try:
+    import resource
+except ImportError:   # Not on Windows.
+    resource = None
+
+
+STAGES_FILE = 'stages.json'
+
+# Kinds of work of the stages.
+stage_kinds = ['network', 'FITS I/O', 'compute']
+
+# Numbers counted for every stage.
+stage_counts = ['bytes', 'rows', 'sources']
+
+
+# Function to find the peak resident size of the process (MB).
+def peak_memory():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / 1048576.0   # bytes there, kilobytes elsewhere.
+    return peak / 1024.0
+
+
+
+class Stage(object):
+
+    def __init__(self, stages, name, kind):
+        self.stages = stages
+        self.name = name
+        self.kind = kind
+
+    def __enter__(self):
+        self.stages.entry(self.name, self.kind)
+        self.start = time.time()
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        self.stages.add(self.name, time.time() - self.start)
+        return False
+
+    def count(self, **numbers):
+        self.stages.count(self.name, **numbers)
+
+
+
+class Stages(object):
+
+    def __init__(self, label = None):
+        self.label = label
+        self.started = time.time()
+        self.entries = []
+        self.names = {}
+        self.lock = threading.RLock()   # Stages may count from threads.
+
+    # To get the entry of a stage, made on first use.
+    def entry(self, name, kind = 'compute'):
+        with self.lock:
+            if name not in self.names:
+                entry = {'name': name,
+                         'kind': kind,
+                         'seconds': 0.0,
+                         'calls': 0,
+                         'peak_mb': None}
+                for key in stage_counts:
+                    entry[key] = 0
+                self.names[name] = entry
+                self.entries.append(entry)
+            return self.names[name]
+
+    # To time a stage, as in
+    #
+    #     with stages.stage('download', 'network') as stage:
+    #         ...
+    #         stage.count(bytes = size)
+    #
+    # A stage run more than once adds up.
+    def stage(self, name, kind = 'compute'):
+        return Stage(self, name, kind)
+
+    def add(self, name, seconds):
+        with self.lock:
+            entry = self.entry(name)
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+            entry['peak_mb'] = peak_memory()
+
+    def count(self, name, **numbers):
+        with self.lock:
+            entry = self.entry(name)
+            for key, value in numbers.items():
+                if key not in stage_counts:
+                    raise ValueError('Unknown count: {}'.format(key))
+                entry[key] += int(value)
+
+    # To get the record of the check so far.
+    def record(self):
+        return {'label': self.label,
+                'started': self.started,
+                'seconds': time.time() - self.started,
+                'peak_mb': peak_memory(),
+                'stages': [dict(entry) for entry in self.entries]}
+
+    def write(self, file_name = STAGES_FILE):
+        with open(file_name, 'w') as stages_file:
+            json.dump(self.record(), stages_file, indent = 1, sort_keys = True)
+        return file_name
+
+
+# Function to read the records of stages files, of single checks or
+# of batches (see write_batch()).
+def read_records(file_names):
+    records = []
+    for file_name in file_names:
+        with open(file_name) as stages_file:
+            numbers = json.load(stages_file)
+        if 'records' in numbers:
+            records.extend(numbers['records'])
+        else:
+            records.append(numbers)
+    return records
+
+# Function to sum up the records of many checks: the numbers of every
+# stage and the share of the time every kind of work took.
+def summarise(records):
+    stages = []
+    names = {}
+    kinds = dict((kind, 0.0) for kind in stage_kinds)
+    for record in records:
+        for entry in record['stages']:
+            if entry['name'] not in names:
+                total = {'name': entry['name'],
+                         'kind': entry['kind'],
+                         'checks': 0,
+                         'seconds': 0.0,
+                         'calls': 0,
+                         'peak_mb': None}
+                for key in stage_counts:
+                    total[key] = 0
+                names[entry['name']] = total
+                stages.append(total)
+            total = names[entry['name']]
+            total['checks'] += 1
+            total['seconds'] += entry['seconds']
+            total['calls'] += entry['calls']
+            for key in stage_counts:
+                total[key] += entry[key]
+            if entry['peak_mb'] is not None:
+                total['peak_mb'] = max(total['peak_mb'] or 0.0, entry['peak_mb'])
+            kinds[entry['kind']] = kinds.get(entry['kind'], 0.0) + entry['seconds']
+
+    seconds = sum(kinds.values())
+    return {'checks': len(records),
+            'seconds': seconds,
+            'wall_seconds': sum(record['seconds'] for record in records),
+            'stages': stages,
+            'kinds': dict((kind, {'seconds': value,
+                                  'share': value / seconds if seconds > 0 else 0.0})
+                          for kind, value in kinds.items())}
+
+# Function to print a summary of many checks.
+def print_summary(summary, out = sys.stdout):
+    out.write('{} checks, {:.1f} s in the stages ({:.1f} s wall).\n\n'.format(
+              summary['checks'], summary['seconds'], summary['wall_seconds']))
+    out.write('{:<16}{:<10}{:>7}{:>10}{:>10}{:>10}{:>10}{:>9}{:>10}\n'.format(
+              'stage', 'kind', 'checks', 'seconds', 'mean', 'MB', 'rows', 'sources', 'peak MB'))
+    for total in summary['stages']:
+        out.write('{:<16}{:<10}{:>7}{:>10.2f}{:>10.3f}{:>10.1f}{:>10}{:>9}{:>10}\n'.format(
+                  total['name'][:15],
+                  total['kind'],
+                  total['checks'],
+                  total['seconds'],
+                  total['seconds'] / max(total['checks'], 1),
+                  total['bytes'] / 1048576.0,
+                  total['rows'],
+                  total['sources'],
+                  '' if total['peak_mb'] is None else '{:.0f}'.format(total['peak_mb'])))
+    out.write('\n')
+    for kind in sorted(summary['kinds'], key = lambda kind: -summary['kinds'][kind]['seconds']):
+        numbers = summary['kinds'][kind]
+        out.write('{:<10}{:>10.2f} s{:>7.0f}%\n'.format(kind, numbers['seconds'],
+                                                      100 * numbers['share']))
+
+# Function to name the stages file of a results file (of a batch).
+def stages_file_name(results_file):
+    return os.path.splitext(results_file)[0] + '_stages.json'
+
+# Function to write the records of a batch and their summary.
+def write_batch(records, file_name):
+    with open(file_name, 'w') as stages_file:
+        json.dump({'summary': summarise(records), 'records': records},
+                  stages_file, indent = 1, sort_keys = True)
+    return file_name
@@ -0,0 +1,359 @@
+'''Stand-in for the web services the checks depend on.
+
+   The checks ask the GALEX site at MAST (tile pages and products) and
+   the UVIT site (BSWT and ETC) over HTTP. The stand-in serves both on
+   a local port, under /galex and /uvit, from a cassette: a directory
+   of the exchanges recorded from the real sites. Pointed at it with
+
+       UVCHECK_MAST=http://127.0.0.1:8738/galex
+       VISCHECK_UVIT=http://127.0.0.1:8738/uvit
+
+   the checks run offline, and their timings, concurrency and caching
+   can be measured again and again on the same answers.
+
+   With record set, exchanges missing from the cassette are forwarded
+   to the real site and kept (each one once); without, they are
+   answered with 404. Every answer can be held back (latency, jitter
+   and bandwidth) and some answered with 503 or dropped unanswered, as
+   Faults says. The delays and faults of an exchange depend on the
+   seed, the exchange and how many times it was asked for, not on the
+   order the threads come in, so that runs can be repeated.
+
+   A cassette holds exchanges.jsonl (method, path, key of the request,
+   status and type of the answer, sha256 of its body) and the bodies
+   under bodies/. GET /_standin reports on the stand-in.
+
+'''
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+
+try:
+    from urlparse import parse_qsl
+    from urllib import urlencode
+except ImportError:
+    from urllib.parse import parse_qsl, urlencode
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+except ImportError:
+    from http.server import BaseHTTPRequestHandler
+
+from .server import ThreadingServer
+from .tilecache import part_name
+
+
+HOST = '127.0.0.1'
+PORT = 8738
+
+EXCHANGES_FILE = 'exchanges.jsonl'
+
+# Sites stood in for, by the first part of the path.
+sites = {'galex': 'http://galex.stsci.edu',
+         'uvit': 'https://uvit.iiap.res.in/cgi-bin'}
+
+# Environment of the checks for every site.
+site_variables = {'galex': 'UVCHECK_MAST',
+                  'uvit': 'VISCHECK_UVIT'}
+
+# Seconds to wait for a real site while recording.
+FORWARD_TIMEOUT = 120
+
+# Bytes sent at a time.
+CHUNK_SIZE = 1 << 16
+
+
+# Function to make the key of a request: its method, path and (form)
+# body, the fields of a form in order, so that the same question asked
+# by the scripts and the service is the same exchange.
+def exchange_key(method, path, body = b''):
+    if body:
+        try:
+            body = urlencode(sorted(parse_qsl(body.decode('utf-8'),
+                                              keep_blank_values = True))).encode('utf-8')
+        except UnicodeDecodeError:
+            pass
+    digest = hashlib.sha256()
+    digest.update('{} {}\n'.format(method, path).encode('utf-8'))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+
+class Cassette(object):
+
+    def __init__(self, cassette_dir):
+        self.cassette_dir = cassette_dir
+        self.body_dir = os.path.join(cassette_dir, 'bodies')
+        self.index_file = os.path.join(cassette_dir, EXCHANGES_FILE)
+        self.lock = threading.Lock()
+        self.exchanges = {}
+        if not os.path.isdir(self.body_dir):
+            os.makedirs(self.body_dir)
+        if os.path.exists(self.index_file):
+            with open(self.index_file) as index:
+                for line in index:
+                    if line.strip():
+                        exchange = json.loads(line)
+                        self.exchanges[exchange['key']] = exchange
+
+    def __len__(self):
+        return len(self.exchanges)
+
+    def find(self, key):
+        return self.exchanges.get(key)
+
+    def body_path(self, sha256):
+        return os.path.join(self.body_dir, sha256[:2], sha256)
+
+    # To keep the answer of a real site, read in chunks from answer.
+    def record(self, method, path, key, status, content_type, chunks):
+        part_file = part_name(os.path.join(self.body_dir, key))
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(part_file, 'wb') as part:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    part.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            os.remove(part_file)
+            raise
+
+        sha256 = digest.hexdigest()
+        body_file = self.body_path(sha256)
+        if not os.path.isdir(os.path.dirname(body_file)):
+            try:
+                os.makedirs(os.path.dirname(body_file))
+            except OSError:   # Made by another thread meanwhile.
+                if not os.path.isdir(os.path.dirname(body_file)):
+                    raise
+        os.rename(part_file, body_file)
+
+        exchange = {'key': key,
+                    'method': method,
+                    'path': path,
+                    'status': status,
+                    'content_type': content_type,
+                    'sha256': sha256,
+                    'bytes': size,
+                    'recorded': time.time()}
+        with self.lock:
+            with open(self.index_file, 'a') as index:
+                index.write(json.dumps(exchange, sort_keys = True) + '\n')
+            self.exchanges[key] = exchange
+        return exchange
+
+
+
+class Faults(object):
+
+    def __init__(self, latency = 0.0, jitter = 0.0, bandwidth = None,
+                 error_rate = 0.0, drop_rate = 0.0, seed = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.seed = seed
+
+    # To plan the answer to the times-th asking of an exchange. Returns
+    # the seconds to wait before answering and the fault, if any
+    # ('error' or 'drop').
+    def plan(self, key, times):
+        rng = random.Random('{}:{}:{}'.format(self.seed, key, times))
+        delay = max(self.latency + rng.uniform(-self.jitter, self.jitter), 0.0)
+        draw = rng.random()
+        if draw < self.drop_rate:
+            return delay, 'drop'
+        if draw < self.drop_rate + self.error_rate:
+            return delay, 'error'
+        return delay, None
+
+    # To find the seconds it takes to send size bytes.
+    def send_time(self, size):
+        if not self.bandwidth:
+            return 0.0
+        return size / (self.bandwidth * 1048576.0)
+
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+
+    # Keep-alive, as the real sites allow.
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/_standin':
+            self.answer(200, 'application/json',
+                        json.dumps(self.server.stats()).encode('utf-8'))
+        else:
+            self.exchange('GET')
+
+    def do_POST(self):
+        self.exchange('POST')
+
+    def answer(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def fail(self, status, message):
+        self.answer(status, 'text/plain', (message + '\n').encode('utf-8'))
+
+    def exchange(self, method):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+
+        site = self.path.lstrip('/').split('/')[0]
+        if site not in sites:
+            server.count('unknown')
+            self.fail(404, 'Unknown site: {}'.format(self.path))
+            return
+        path = self.path[len(site) + 1:] or '/'
+        key = exchange_key(method, self.path, body)
+
+        delay, fault = server.faults.plan(key, server.times(key))
+        time.sleep(delay)
+        if fault == 'drop':
+            server.count('dropped')
+            self.close_connection = True
+            return
+        if fault == 'error':
+            server.count('errors')
+            self.fail(503, 'Service unavailable (injected).')
+            return
+
+        exchange = server.cassette.find(key)
+        if exchange is None:
+            if not server.record:
+                server.count('missed')
+                self.fail(404, 'Not in the cassette: {} {}'.format(method, self.path))
+                return
+            try:
+                exchange = self.forward(method, site, path, key, body)
+            except Exception as error:
+                server.count('missed')
+                self.fail(502, '{}: {}'.format(type(error).__name__, error))
+                return
+            server.count('recorded')
+        else:
+            server.count('replayed')
+        self.replay(exchange)
+
+    # To ask the real site and keep its answer.
+    def forward(self, method, site, path, key, body):
+        headers = {}
+        for name in ['Content-Type', 'User-Agent', 'Accept', 'Referer']:
+            if self.headers.get(name):
+                headers[name] = self.headers.get(name)
+        response = self.server.session().request(method, sites[site] + path,
+                                                 data = body or None,
+                                                 headers = headers,
+                                                 stream = True,
+                                                 timeout = FORWARD_TIMEOUT)
+        try:
+            return self.server.cassette.record(method, self.path, key,
+                                               response.status_code,
+                                               response.headers.get('Content-Type',
+                                                                    'application/octet-stream'),
+                                               response.iter_content(CHUNK_SIZE))
+        finally:
+            response.close()
+
+    # To send a recorded answer, as fast as the bandwidth allows.
+    def replay(self, exchange):
+        server = self.server
+        self.send_response(exchange['status'])
+        self.send_header('Content-Type', exchange['content_type'])
+        self.send_header('Content-Length', str(exchange['bytes']))
+        self.end_headers()
+        with open(server.cassette.body_path(exchange['sha256']), 'rb') as body:
+            while True:
+                chunk = body.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                time.sleep(server.faults.send_time(len(chunk)))
+                self.wfile.write(chunk)
+        server.count('bytes', exchange['bytes'])
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+
+class StandinServer(ThreadingServer):
+
+    def __init__(self, address, cassette, faults = None, record = False, verbose = True):
+        ThreadingServer.__init__(self, address, StandinHandler)
+        self.cassette = cassette
+        self.faults = faults or Faults()
+        self.record = record
+        self.verbose = verbose
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.asked = {}
+        self.numbers = dict((key, 0) for key in ['replayed', 'recorded', 'missed',
+                                                 'errors', 'dropped', 'unknown', 'bytes'])
+        self.forward_session = None
+
+    # To count how many times an exchange was asked for, this time included.
+    def times(self, key):
+        with self.lock:
+            self.asked[key] = self.asked.get(key, 0) + 1
+            return self.asked[key]
+
+    def count(self, key, value = 1):
+        with self.lock:
+            self.numbers[key] += value
+
+    # To get the session to the real sites, made on first use.
+    def session(self):
+        with self.lock:
+            if self.forward_session is None:
+                from .server import pooled_session
+                self.forward_session = pooled_session()
+            return self.forward_session
+
+    def stats(self):
+        with self.lock:
+            numbers = dict(self.numbers)
+        numbers.update({'uptime': time.time() - self.started,
+                        'exchanges': len(self.cassette),
+                        'record': self.record})
+        return numbers
+
+    # To find the site addresses the checks should be given.
+    def site_addresses(self):
+        host, port = self.server_address[:2]
+        return dict((site_variables[site], 'http://{}:{}/{}'.format(host, port, site))
+                    for site in sites)
+
+
+# Function to run the stand-in until interrupted.
+def serve_standin(cassette_dir, host = HOST, port = PORT, faults = None,
+                  record = False, verbose = True):
+    server = StandinServer((host, port), Cassette(cassette_dir), faults, record, verbose)
+    print('Standing in for {} from {} ({} exchanges{}).'.format(
+          ' and '.join(sorted(sites.values())), cassette_dir, len(server.cassette),
+          ', recording' if record else ''))
+    print('Point the checks at it with\n')
+    for name, address in sorted(server.site_addresses().items()):
+        print('    export {}={}'.format(name, address))
+    print('')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return server.stats()
@@ -0,0 +1,150 @@
+'''Spatial index over the TD1 catalogue.
+
+   The rows of td1_catalogue.fits are grouped into declination bands
+   and sorted by RA inside every band. A cone query then only looks at
+   the few bands (and the RA range within them) that can reach the
+   field, instead of scanning the whole catalogue. The sorted columns
+   are kept in a sidecar file which is built once, on first use.
+
+'''
+
+import os
+import numpy as np
+
+from .cone import cone_search
+
+
+TD1_CATALOGUE = 'td1_catalogue.fits'
+
+# Width of the declination bands in degrees.
+BAND_WIDTH = 1.0
+
+
+# Function to name the sidecar file of a catalogue.
+def index_file_name(catalogue):
+    return os.path.splitext(catalogue)[0] + '_index.npz'
+
+
+class TD1Index(object):
+
+    def __init__(self, ra, dec, nuv_flux, fuv_flux, band_start,
+                 band_width = BAND_WIDTH):
+        self.ra = ra
+        self.dec = dec
+        self.nuv_flux = nuv_flux
+        self.fuv_flux = fuv_flux
+        self.band_start = band_start
+        self.band_width = band_width
+
+    # To sort the catalogue columns into declination bands.
+    @classmethod
+    def from_columns(cls, ra, dec, nuv_flux, fuv_flux,
+                     band_width = BAND_WIDTH):
+        ra = np.asarray(ra, dtype = np.float64) % 360.0
+        dec = np.asarray(dec, dtype = np.float64)
+        n_bands = int(np.ceil(180.0 / band_width))
+        band = np.clip(((dec + 90.0) / band_width).astype(int), 0, n_bands - 1)
+        order = np.lexsort((ra, band))
+        band_start = np.searchsorted(band[order], np.arange(n_bands + 1))
+        return cls(ra[order], dec[order],
+                   np.asarray(nuv_flux, dtype = np.float64)[order],
+                   np.asarray(fuv_flux, dtype = np.float64)[order],
+                   band_start, band_width)
+
+    # To build the index from the FITS catalogue.
+    @classmethod
+    def from_fits(cls, catalogue = TD1_CATALOGUE, band_width = BAND_WIDTH):
+        from astropy.io import fits
+
+        with fits.open(catalogue) as hdu:
+            data = hdu[1].data
+            return cls.from_columns(data['ra'],
+                                    data['dec'],
+                                    data['flux_2365_a'],
+                                    data['flux_1565_a'],
+                                    band_width)
+
+    # To load the index, building the sidecar file if it is missing
+    # or older than the catalogue.
+    @classmethod
+    def load(cls, catalogue = TD1_CATALOGUE, index_file = None):
+        if index_file is None:
+            index_file = index_file_name(catalogue)
+
+        fresh = os.path.exists(index_file)
+        if fresh and os.path.exists(catalogue):
+            fresh = os.path.getmtime(index_file) >= os.path.getmtime(catalogue)
+
+        if fresh:
+            with np.load(index_file) as side:
+                return cls(side['ra'], side['dec'],
+                           side['nuv_flux'], side['fuv_flux'],
+                           side['band_start'], float(side['band_width']))
+
+        index = cls.from_fits(catalogue)
+        try:
+            index.save(index_file)
+        except (IOError, OSError):
+            pass   # A read-only place is fine, the index is in memory.
+        return index
+
+    def save(self, index_file):
+        with open(index_file, 'wb') as side:
+            np.savez(side,
+                     ra = self.ra,
+                     dec = self.dec,
+                     nuv_flux = self.nuv_flux,
+                     fuv_flux = self.fuv_flux,
+                     band_start = self.band_start,
+                     band_width = self.band_width)
+
+    # To find the rows within radius (arcsec) of the field centre.
+    # Returns the row numbers (in index order) and their separations.
+    def query(self, ra_cen, dec_cen, radius):
+        ra_cen = ra_cen % 360.0
+        radius_deg = radius / 3600.0
+        n_bands = len(self.band_start) - 1
+        dec_lo = max(dec_cen - radius_deg, -90.0)
+        dec_hi = min(dec_cen + radius_deg, 90.0)
+        first = int(np.clip((dec_lo + 90.0) / self.band_width, 0, n_bands - 1))
+        last = int(np.clip((dec_hi + 90.0) / self.band_width, 0, n_bands - 1))
+
+        # Half width of the RA range to be looked at in every band.
+        cos_dec = np.cos(np.radians(max(abs(dec_lo), abs(dec_hi))))
+        if dec_hi >= 90.0 or dec_lo <= -90.0 or radius_deg >= 180.0 * cos_dec:
+            ra_half = 180.0
+        else:
+            ra_half = np.degrees(np.arcsin(min(1.0,
+                                  np.sin(np.radians(radius_deg)) / cos_dec)))
+
+        pieces = []
+        for band in range(first, last + 1):
+            start, stop = self.band_start[band], self.band_start[band + 1]
+            if start == stop:
+                continue
+            if ra_half >= 180.0:
+                pieces.append(np.arange(start, stop))
+                continue
+            band_ra = self.ra[start:stop]
+            ra_lo, ra_hi = ra_cen - ra_half, ra_cen + ra_half
+            ranges = [(max(ra_lo, 0.0), min(ra_hi, 360.0))]
+            if ra_lo < 0.0:
+                ranges.append((ra_lo + 360.0, 360.0))
+            if ra_hi > 360.0:
+                ranges.append((0.0, ra_hi - 360.0))
+            for lo, hi in ranges:
+                i = np.searchsorted(band_ra, lo, side = 'left')
+                j = np.searchsorted(band_ra, hi, side = 'right')
+                pieces.append(np.arange(start + i, start + j))
+
+        if len(pieces) == 0:
+            return np.zeros(0, dtype = int), np.zeros(0)
+        rows = np.concatenate(pieces)
+        inside, separation = cone_search(self.ra[rows], self.dec[rows],
+                                         ra_cen, dec_cen, radius)
+        return rows[inside], separation[inside]
+
+    # To get the NUV and FUV fluxes of the sources in the field.
+    def fluxes(self, ra_cen, dec_cen, radius):
+        rows, separation = self.query(ra_cen, dec_cen, radius)
+        return self.nuv_flux[rows], self.fuv_flux[rows]
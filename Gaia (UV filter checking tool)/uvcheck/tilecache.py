@@ -0,0 +1,274 @@
+'''Local cache of the GALEX GR6 tile products (mcat and int maps).
+
+   The files are kept once per content (by their SHA-256) under
+   objects/ in the cache directory, and a small SQLite index maps the
+   tile product names to them. When the cache grows past its size cap
+   the least recently used products are dropped. The hits and misses
+   are counted in the same index.
+
+   Files derived from a product (such as the column cache of an mcat)
+   can be kept next to it with sidecar(), they go when it goes and
+   count towards the cap.
+
+   Several products can be fetched at once (fetch_all), each in its own
+   thread, through one pooled HTTP session. Threads asking for the
+   same product at once wait for one download of it.
+
+   The cache directory is ~/.uvcheck/tiles unless UVCHECK_CACHE says
+   otherwise, the cap is UVCHECK_CACHE_MB megabytes (10 GB by default,
+   0 switches the cache off).
+
+'''
+
+import os
+import time
+import shutil
+import sqlite3
+import glob
+import hashlib
+import threading
+
+
+CACHE_DIR = os.environ.get('UVCHECK_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.uvcheck', 'tiles'))
+CACHE_MB = float(os.environ.get('UVCHECK_CACHE_MB', 10000))
+
+schema = '''
+create table if not exists tiles (name text primary key,
+                                  sha256 text not null,
+                                  size integer not null,
+                                  fetched real not null,
+                                  last_used real not null);
+create table if not exists stats (key text primary key,
+                                  value integer not null);
+'''
+
+
+# Function to find the SHA-256 of a file.
+def file_sha256(file_name, chunk_size = 1 << 20):
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        chunk = f.read(chunk_size)
+        while chunk:
+            digest.update(chunk)
+            chunk = f.read(chunk_size)
+    return digest.hexdigest()
+
+# Function to name the partial file of file_name, unique to the
+# process and thread writing it.
+def part_name(file_name):
+    return '{}.part{}-{}'.format(file_name, os.getpid(), threading.current_thread().ident)
+
+# Function to put a copy of a file at file_name, replacing whatever is
+# there. A hard link is used when possible.
+def place(source, file_name):
+    if os.path.exists(file_name) and os.path.samefile(source, file_name):
+        return
+    part_file = part_name(file_name)
+    try:
+        os.link(source, part_file)
+    except (OSError, AttributeError):
+        shutil.copy2(source, part_file)
+    os.rename(part_file, file_name)
+
+
+
+class TileCache(object):
+
+    def __init__(self, cache_dir = None, max_mb = None, session = None):
+        self.cache_dir = cache_dir or CACHE_DIR
+        self.max_bytes = int((CACHE_MB if max_mb is None else max_mb) * 1024 * 1024)
+        self.session = session
+        self.enabled = self.max_bytes > 0
+        self.lock = threading.Lock()
+        self.name_locks = {}
+        if self.enabled:
+            self.object_dir = os.path.join(self.cache_dir, 'objects')
+            if not os.path.isdir(self.object_dir):
+                try:
+                    os.makedirs(self.object_dir)
+                except OSError:   # Somebody else made it first.
+                    if not os.path.isdir(self.object_dir):
+                        raise
+            self.db = sqlite3.connect(os.path.join(self.cache_dir, 'index.sqlite'),
+                                      timeout = 60,
+                                      check_same_thread = False)
+            self.db.executescript(schema)
+            self.db.commit()
+
+    # To get a product from the archive.
+    def download(self, link, file_name):
+        from .mast import download
+        return download(link, file_name, self.session)
+
+    def object_path(self, sha256):
+        return os.path.join(self.object_dir, sha256[:2], sha256 + '.fits.gz')
+
+    def count(self, key, value = 1):
+        self.db.execute('insert or ignore into stats values (?, 0)', (key,))
+        self.db.execute('update stats set value = value + ? where key = ?', (value, key))
+
+    # To get the lock of a product name, so that threads asking for the
+    # same product at once download it only once.
+    def name_lock(self, name):
+        with self.lock:
+            return self.name_locks.setdefault(name, threading.Lock())
+
+    # To get a product into file_name (by default its own name in the
+    # working directory), from the cache if it is there.
+    def fetch(self, link, file_name = None):
+        name = link.split('/')[-1]
+        if file_name is None:
+            file_name = name
+        if not self.enabled:
+            self.download(link, file_name)
+            return file_name
+
+        with self.name_lock(name):
+            return self.fetch_product(link, name, file_name)
+
+    def fetch_product(self, link, name, file_name):
+        with self.lock:
+            row = self.db.execute('select sha256, size from tiles where name = ?',
+                                  (name,)).fetchone()
+            if row is not None and os.path.exists(self.object_path(row[0])):
+                sha256, size = row
+                with self.db:
+                    self.db.execute('update tiles set last_used = ? where name = ?',
+                                    (time.time(), name))
+                    self.count('hits')
+                    self.count('bytes_saved', size)
+                place(self.object_path(sha256), file_name)
+                return file_name
+
+        # A miss; the product is downloaded into the cache first.
+        part_file = part_name(os.path.join(self.object_dir, name))
+        self.download(link, part_file)
+        sha256 = file_sha256(part_file)
+        size = os.path.getsize(part_file)
+        object_file = self.object_path(sha256)
+        if not os.path.isdir(os.path.dirname(object_file)):
+            try:
+                os.makedirs(os.path.dirname(object_file))
+            except OSError:
+                pass
+        if os.path.exists(object_file):
+            os.remove(part_file)   # Same content under another name.
+        else:
+            os.rename(part_file, object_file)
+
+        now = time.time()
+        with self.lock:
+            with self.db:
+                self.db.execute('insert or replace into tiles values (?, ?, ?, ?, ?)',
+                                (name, sha256, size, now, now))
+                self.count('misses')
+                self.count('bytes_downloaded', size)
+            place(object_file, file_name)
+            self.evict()
+        return file_name
+
+    # To check if a product is in the cache.
+    def has(self, link):
+        if not self.enabled:
+            return False
+        with self.lock:
+            row = self.db.execute('select sha256 from tiles where name = ?',
+                                  (link.split('/')[-1],)).fetchone()
+        return row is not None and os.path.exists(self.object_path(row[0]))
+
+    # To name a file derived from a cached product, kept and evicted
+    # along with it. None if the product is not in the cache.
+    def sidecar(self, link, suffix):
+        if not self.enabled:
+            return None
+        with self.lock:
+            row = self.db.execute('select sha256 from tiles where name = ?',
+                                  (link.split('/')[-1],)).fetchone()
+        if row is None:
+            return None
+        return self.object_path(row[0])[:-len('.fits.gz')] + suffix
+
+    # To fetch a product and time it. Returns the file name, its size
+    # in bytes, the seconds taken and whether it came from the cache.
+    def timed_fetch(self, link):
+        start = time.time()
+        cached = self.has(link)
+        file_name = self.fetch(link)
+        return file_name, os.path.getsize(file_name), time.time() - start, cached
+
+    # To fetch several products at once, so that the wait is that of the
+    # largest product rather than of all of them. Returns what
+    # timed_fetch() does for every link, in the order of the links.
+    def fetch_all(self, links, threads = 4):
+        from multiprocessing.pool import ThreadPool
+
+        if len(links) < 2:
+            return [self.timed_fetch(link) for link in links]
+        pool = ThreadPool(min(threads, len(links)))
+        try:
+            return pool.map(self.timed_fetch, links)
+        finally:
+            pool.close()
+            pool.join()
+
+    # To find the bytes on disk of every object, its sidecar files
+    # included, by the SHA-256 of the object.
+    def object_bytes(self):
+        sizes = {}
+        for file_name in glob.glob(os.path.join(self.object_dir, '*', '*')):
+            sha256 = os.path.basename(file_name).split('.')[0]
+            try:
+                sizes[sha256] = sizes.get(sha256, 0) + os.path.getsize(file_name)
+            except OSError:   # Gone meanwhile.
+                pass
+        return sizes
+
+    # To drop the least recently used products until the cache, the
+    # sidecar files too, fits. The products are kept from the most
+    # recently used on, up to the first that does not fit.
+    def evict(self):
+        sizes = self.object_bytes()
+        with self.db:
+            rows = self.db.execute('select name, sha256, size from tiles '
+                                   'order by last_used desc').fetchall()
+            total = 0
+            kept = set()
+            full = False
+            for name, sha256, size in rows:
+                if full or sha256 in kept:
+                    continue
+                size = sizes.get(sha256, size)
+                if total + size <= self.max_bytes or len(kept) == 0:
+                    total += size
+                    kept.add(sha256)
+                else:
+                    full = True
+            for name, sha256, size in rows:
+                if sha256 not in kept:
+                    self.db.execute('delete from tiles where name = ?', (name,))
+                    self.count('evictions')
+                    stem = self.object_path(sha256)[:-len('.fits.gz')]
+                    for file_name in glob.glob(stem + '.*'):
+                        try:
+                            os.remove(file_name)
+                        except OSError:
+                            pass
+
+    def stats(self):
+        numbers = {'tiles': 0, 'bytes': 0}
+        if self.enabled:
+            with self.lock:
+                numbers.update(self.db.execute('select key, value from stats').fetchall())
+                numbers['tiles'], numbers['bytes'] = self.db.execute(
+                    'select count(*), coalesce(sum(size), 0) from tiles').fetchone()
+        for key in ['hits', 'misses', 'bytes_saved', 'bytes_downloaded', 'evictions']:
+            numbers.setdefault(key, 0)
+        return numbers
+
+    def clear_stats(self):
+        if not self.enabled:
+            return
+        with self.lock:
+            with self.db:
+                self.db.execute('delete from stats')
@@ -0,0 +1,160 @@
+'''Offline footprint index of the GALEX GR6 tiles.
+
+   The MAST tile-list form (and the tile page after it) costs two
+   round trips per field. Here the tiles are looked up from a listing
+   of their centres, footprint radii and product links instead. The
+   listing (CSV, FITS or anything else astropy can read) needs the
+   columns
+
+       tilename, ra_cent, dec_cent, mcat, nuv_int, fuv_int
+
+   with the centres in degrees and the full links of the products
+   (empty when a tile does not have one). A radius column (degrees) is
+   optional, the GALEX field radius is taken otherwise. The columns are
+   sorted by declination and kept in a sidecar file on first use.
+
+'''
+
+import os
+import numpy as np
+
+from .cone import cone_search
+
+
+GALEX_TILES = 'galex_tiles.csv'
+
+# Radius of the GALEX field of view in degrees.
+TILE_RADIUS = 0.6
+
+# Accepted names of the listing columns.
+listing_columns = {'name': ['tilename', 'tile', 'name'],
+                   'ra': ['ra_cent', 'ra'],
+                   'dec': ['dec_cent', 'dec'],
+                   'radius': ['radius', 'fov_radius'],
+                   'mcat': ['mcat', 'mcat_url'],
+                   'nuv_int': ['nuv_int', 'nd_int'],
+                   'fuv_int': ['fuv_int', 'fd_int']}
+
+
+# Function to name the sidecar file of a listing.
+def index_file_name(listing):
+    return os.path.splitext(listing)[0] + '_index.npz'
+
+# Function to turn a (possibly masked) listing column to strings.
+def link_column(table, column):
+    if column is None:
+        return np.array([''] * len(table))
+    links = []
+    for value in table[column]:
+        if np.ma.is_masked(value):
+            links.append('')
+        else:
+            links.append(str(value).strip())
+    return np.array(links)
+
+
+class TileIndex(object):
+
+    def __init__(self, name, ra, dec, radius, mcat, nuv_int, fuv_int):
+        self.name = name
+        self.ra = ra
+        self.dec = dec
+        self.radius = radius
+        self.mcat = mcat
+        self.nuv_int = nuv_int
+        self.fuv_int = fuv_int
+
+    # To build the index from the tile listing.
+    @classmethod
+    def from_listing(cls, listing = GALEX_TILES):
+        from astropy.table import Table
+
+        table = Table.read(listing)
+        names = dict((name.lower(), name) for name in table.colnames)
+        columns = {}
+        for key, aliases in listing_columns.items():
+            columns[key] = None
+            for alias in aliases:
+                if alias in names:
+                    columns[key] = names[alias]
+                    break
+        if columns['ra'] is None or columns['dec'] is None:
+            raise ValueError('The tile listing needs ra_cent and dec_cent columns.')
+
+        dec = np.asarray(table[columns['dec']], dtype = np.float64)
+        order = np.argsort(dec, kind = 'mergesort')
+        if columns['radius'] is None:
+            radius = np.full(len(table), TILE_RADIUS)
+        else:
+            radius = np.asarray(table[columns['radius']], dtype = np.float64)
+        return cls(link_column(table, columns['name'])[order],
+                   np.asarray(table[columns['ra']], dtype = np.float64)[order] % 360.0,
+                   dec[order],
+                   radius[order],
+                   link_column(table, columns['mcat'])[order],
+                   link_column(table, columns['nuv_int'])[order],
+                   link_column(table, columns['fuv_int'])[order])
+
+    # To load the index, building the sidecar file if it is missing
+    # or older than the listing.
+    @classmethod
+    def load(cls, listing = GALEX_TILES, index_file = None):
+        if index_file is None:
+            index_file = index_file_name(listing)
+
+        fresh = os.path.exists(index_file)
+        if fresh and os.path.exists(listing):
+            fresh = os.path.getmtime(index_file) >= os.path.getmtime(listing)
+
+        if fresh:
+            with np.load(index_file) as side:
+                return cls(side['name'], side['ra'], side['dec'], side['radius'],
+                           side['mcat'], side['nuv_int'], side['fuv_int'])
+
+        if not os.path.exists(listing):
+            raise IOError('Could not find the tile listing: {}'.format(listing))
+        index = cls.from_listing(listing)
+        try:
+            index.save(index_file)
+        except (IOError, OSError):
+            pass   # A read-only place is fine, the index is in memory.
+        return index
+
+    def save(self, index_file):
+        with open(index_file, 'wb') as side:
+            np.savez(side,
+                     name = self.name,
+                     ra = self.ra,
+                     dec = self.dec,
+                     radius = self.radius,
+                     mcat = self.mcat,
+                     nuv_int = self.nuv_int,
+                     fuv_int = self.fuv_int)
+
+    # To find the tile covering the field centre (degrees). Of the
+    # tiles covering it, the one centred closest is taken. Returns the
+    # row of the tile or None.
+    def find(self, ra_cen, dec_cen):
+        if len(self.dec) == 0:
+            return None
+        reach = self.radius.max()
+        i = np.searchsorted(self.dec, dec_cen - reach, side = 'left')
+        j = np.searchsorted(self.dec, dec_cen + reach, side = 'right')
+        inside, separation = cone_search(self.ra[i:j], self.dec[i:j],
+                                         ra_cen, dec_cen,
+                                         self.radius[i:j] * 3600.0)
+        if not inside.any():
+            return None
+        candidates = np.flatnonzero(inside)
+        return i + candidates[np.argmin(separation[candidates])]
+
+    # To list the mcat and int map links of the tile covering the
+    # field centre, as mast.product_links() does. Returns None if
+    # there are no tiles.
+    def products(self, ra_cen, dec_cen):
+        k = self.find(ra_cen, dec_cen)
+        if k is None:
+            return None
+        catalogue_links = [str(self.mcat[k])] if self.mcat[k] else []
+        image_links = [str(link) for link in [self.nuv_int[k], self.fuv_int[k]] if link]
+        return catalogue_links, image_links
@@ -0,0 +1,209 @@
+'''Local cache of the verdicts of the filter check.
+
+   The same fields are checked again and again (proposals are
+   resubmitted, targets are shared). The verdict of a field, that is
+   the safe filters, the count rate tables and the files the script
+   writes, is kept in a small SQLite database and given back as it is
+   when the field is checked again.
+
+   The verdicts are keyed by the instrument, the pointing rounded to a
+   tolerance, the method and the version of the catalogues the method
+   reads; a new catalogue version (see catalogue_versions) leaves the
+   old verdicts unused. Verdicts older than the maximum age are not
+   used and are evicted; forget() drops verdicts on demand.
+
+   The database is ~/.uvcheck/verdicts.sqlite unless UVCHECK_VERDICTS
+   says otherwise. The tolerance is UVCHECK_VERDICT_ARCSEC arcseconds
+   (1 by default), the maximum age UVCHECK_VERDICT_DAYS days (30 by
+   default, 0 switches the cache off).
+
+'''
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+VERDICT_DB = os.environ.get('UVCHECK_VERDICTS',
+                            os.path.join(os.path.expanduser('~'), '.uvcheck', 'verdicts.sqlite'))
+VERDICT_ARCSEC = float(os.environ.get('UVCHECK_VERDICT_ARCSEC', 1.0))
+VERDICT_DAYS = float(os.environ.get('UVCHECK_VERDICT_DAYS', 30))
+
+# Catalogues read by every method. To be changed when a catalogue, or
+# the way the count rates are found from it, changes.
+catalogue_versions = {'auto': 'GR6+TD1',
+                      'catalogue': 'GR6',
+                      'image': 'GR6',
+                      'td1': 'TD1',
+                      'vizier': 'II/312'}
+
+schema = '''
+create table if not exists verdicts (instrument text not null,
+                                     ra_cell integer not null,
+                                     dec_cell integer not null,
+                                     arcsec real not null,
+                                     method text not null,
+                                     version text not null,
+                                     checked real not null,
+                                     answer text not null,
+                                     primary key (instrument, ra_cell, dec_cell,
+                                                  arcsec, method, version));
+create table if not exists stats (key text primary key,
+                                  value integer not null);
+'''
+
+
+# Function to turn a sexagesimal string to degrees (hours for RA).
+# Raises ValueError if it is not one.
+def sexagesimal_degrees(value):
+    parts = value.strip().split(':')
+    if len(parts) != 3:
+        raise ValueError('Not sexagesimal: {}'.format(value))
+    number = abs(float(parts[0])) + float(parts[1]) / 60.0 + float(parts[2]) / 3600.0
+    if value.strip().startswith('-'):
+        number = -number
+    return number
+
+
+
+class VerdictCache(object):
+
+    def __init__(self, db_file = None, arcsec = None, max_days = None):
+        self.db_file = db_file or VERDICT_DB
+        self.arcsec = VERDICT_ARCSEC if arcsec is None else float(arcsec)
+        self.max_age = (VERDICT_DAYS if max_days is None else max_days) * 86400.0
+        self.enabled = self.max_age > 0
+        self.lock = threading.Lock()
+        if self.enabled:
+            db_dir = os.path.dirname(os.path.abspath(self.db_file))
+            if not os.path.isdir(db_dir):
+                try:
+                    os.makedirs(db_dir)
+                except OSError:   # Somebody else made it first.
+                    if not os.path.isdir(db_dir):
+                        raise
+            self.db = sqlite3.connect(self.db_file,
+                                      timeout = 60,
+                                      check_same_thread = False)
+            self.db.executescript(schema)
+            self.db.commit()
+
+    # To find the key of a field. Raises ValueError if the pointing
+    # cannot be read.
+    def key(self, instrument, RA, DEC, method):
+        if method not in catalogue_versions:
+            raise ValueError('Unknown method: {}'.format(method))
+        ra_deg = sexagesimal_degrees(RA) * 15.0
+        dec_deg = sexagesimal_degrees(DEC)
+        cell = self.arcsec / 3600.0
+        return (instrument,
+                int(round(ra_deg / cell)),
+                int(round(dec_deg / cell)),
+                self.arcsec,
+                method,
+                catalogue_versions[method])
+
+    def count(self, key, value = 1):
+        self.db.execute('insert or ignore into stats values (?, 0)', (key,))
+        self.db.execute('update stats set value = value + ? where key = ?', (value, key))
+
+    # To get the stored verdict of a field, None if there is none (or
+    # it is too old). The answer is as gaia.verdict() made it, with the
+    # time it was checked.
+    def get(self, instrument, RA, DEC, method):
+        if not self.enabled:
+            return None
+        try:
+            key = self.key(instrument, RA, DEC, method)
+        except ValueError:
+            return None
+
+        with self.lock:
+            row = self.db.execute('select checked, answer from verdicts where instrument = ? '
+                                  'and ra_cell = ? and dec_cell = ? and arcsec = ? '
+                                  'and method = ? and version = ?', key).fetchone()
+            fresh = row is not None and time.time() - row[0] <= self.max_age
+            with self.db:
+                self.count('hits' if fresh else 'misses')
+        if not fresh:
+            return None
+
+        answer = json.loads(row[1])
+        answer['checked'] = row[0]
+        return answer
+
+    # To store the verdict of a field (see gaia.verdict()).
+    def put(self, instrument, RA, DEC, method, answer):
+        if not self.enabled:
+            return
+        try:
+            key = self.key(instrument, RA, DEC, method)
+        except ValueError:
+            return
+
+        text = json.dumps(answer)
+        with self.lock:
+            with self.db:
+                self.db.execute('insert or replace into verdicts values (?, ?, ?, ?, ?, ?, ?, ?)',
+                                key + (time.time(), text))
+
+    # To drop the verdicts that are older than the maximum age (or
+    # max_days). Returns how many went.
+    def evict(self, max_days = None):
+        if not self.enabled:
+            return 0
+        max_age = self.max_age if max_days is None else max_days * 86400.0
+        with self.lock:
+            with self.db:
+                gone = self.db.execute('delete from verdicts where checked < ?',
+                                       (time.time() - max_age,)).rowcount
+                self.count('evictions', gone)
+        return gone
+
+    # To drop verdicts on demand: those of one field (any instrument or
+    # method unless given), of one method or of one catalogue version,
+    # or all of them. Returns how many went.
+    def forget(self, instrument = None, RA = None, DEC = None, method = None, version = None):
+        if not self.enabled:
+            return 0
+        conditions = []
+        values = []
+        if RA is not None and DEC is not None:
+            key = self.key(instrument or 'uvit', RA, DEC, method or 'auto')
+            conditions.append('ra_cell = ? and dec_cell = ? and arcsec = ?')
+            values.extend(key[1:4])
+        if instrument is not None:
+            conditions.append('instrument = ?')
+            values.append(instrument)
+        if method is not None:
+            conditions.append('method = ?')
+            values.append(method)
+        if version is not None:
+            conditions.append('version = ?')
+            values.append(version)
+
+        query = 'delete from verdicts'
+        if conditions:
+            query += ' where ' + ' and '.join(conditions)
+        with self.lock:
+            with self.db:
+                gone = self.db.execute(query, values).rowcount
+        return gone
+
+    def stats(self):
+        numbers = {'hits': 0, 'misses': 0, 'evictions': 0}
+        if not self.enabled:
+            return numbers
+        with self.lock:
+            numbers.update(self.db.execute('select key, value from stats'))
+            numbers['verdicts'] = self.db.execute('select count(*) from verdicts').fetchone()[0]
+        return numbers
+
+    def clear_stats(self):
+        if not self.enabled:
+            return
+        with self.lock:
+            with self.db:
+                self.db.execute('delete from stats')
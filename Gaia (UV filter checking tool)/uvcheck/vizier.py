@@ -0,0 +1,130 @@
+'''The VizieR method of determining the UVIT FUV and NUV filters, as
+   used by vizier_uvcheck_V.0.1.py.
+
+   The GALEX sources around the field are taken from the GALEX GR6/7
+   catalogue at VizieR (II/312) instead of the tile products, nothing
+   is downloaded. check_vizier() returns what gaia.check_field() does.
+
+   Where there is a local copy of the catalogue (uvcheck.galexstore),
+   the sources are read from the partitions of it the field reaches,
+   and VizieR is asked only when some of them are missing.
+
+'''
+
+import numpy as np
+
+from .counts import countnuv, countfuv
+from .healpix import ang2pix
+from .galexstore import open_store, table_columns
+from .gaia import (CheckError, field_centre, field_radius, deg_to_hms,
+                   format_nuv, format_fuv, nuv_safe_filters, fuv_safe_filters)
+
+
+GALEX_VIZIER = 'II/312'
+
+# Number of bright sources kept per band.
+NUMBER = 5
+
+
+# Function to query the GALEX catalogue at VizieR around a position
+# (degrees; radius in arcsec). Returns one table of all the surveys
+# (there could be both AIS and MIS).
+def query_vizier(ra_cen, dec_cen, radius):
+    from astropy import units as u
+    from astropy.table import vstack
+    from astropy.coordinates import SkyCoord
+    from astroquery.vizier import Vizier
+
+    # the row limit of astroquery is 50 by default.
+    vizier = Vizier(row_limit = -1)
+    result = vizier.query_region(SkyCoord(ra_cen, dec_cen, unit = 'deg'),
+                                 radius = radius * u.arcsec,
+                                 catalog = GALEX_VIZIER)
+    if len(result) == 0:
+        return []
+    return vstack(list(result), metadata_conflicts = 'silent')
+
+# Function to make a table of store columns, the magnitudes not
+# measured masked (as VizieR has them).
+def sources_table(columns):
+    from astropy.table import Table, MaskedColumn
+
+    table = Table()
+    for name in ['RAJ2000', 'DEJ2000']:
+        table[name] = columns[name]
+    for name in ['NUV', 'FUV']:
+        table[name] = MaskedColumn(columns[name], mask = np.isnan(columns[name]))
+    return table
+
+# Function to find the GALEX sources around the field, from the store
+# where it has them and from VizieR otherwise. Returns one table and
+# the numbers of partitions read from the store and asked of VizieR.
+def vizier_sources(cc, instrument, store = None):
+    ra_cen, dec_cen = cc.ra.deg, cc.dec.deg
+    radius = field_radius[instrument]
+    if store is None:
+        return query_vizier(ra_cen, dec_cen, radius), (0, 0)
+
+    present, missing = store.split(ra_cen, dec_cen, radius)
+    columns = store.query(ra_cen, dec_cen, radius, present)
+    if missing:
+        table = query_vizier(ra_cen, dec_cen, radius)
+        if len(table) > 0:
+            live = table_columns(table)
+            pixel = ang2pix(store.nside, live['RAJ2000'], live['DEJ2000'])
+            rows = np.nonzero(np.isin(pixel, missing))[0]
+            columns = dict((name, np.concatenate([columns[name], live[name][rows]]))
+                           for name in columns)
+    return sources_table(columns), (len(present), len(missing))
+
+# Function to check a field from the VizieR GALEX catalogue. Returns a
+# dictionary like gaia.check_field() does, raises CheckError if it
+# cannot be done. The local store is used if there is one (store =
+# False for none).
+def check_vizier(instrument, RA, DEC, number = NUMBER, store = None):
+    from astropy.table import hstack
+
+    if instrument not in field_radius:
+        raise CheckError('Unknown instrument: {}'.format(instrument))
+
+    cc = field_centre(RA, DEC)
+
+    result = {'instrument': instrument,
+              'RA': RA,
+              'DEC': DEC,
+              'method': 'vizier',
+              'catalogue': GALEX_VIZIER,
+              'fuv_absent': False,
+              'figures': [],
+              'downloads': [],
+              'notes': [],
+              'tables': ('NUV_vizier-nd.txt', 'FUV_vizier-fd.txt')}
+
+    # To check if Galactic latitude is between -30 to 30.
+    gal_lat = cc.galactic.b.value
+    result['gal_plane'] = -30.0 <= gal_lat <= 30.0
+
+    if store is None:
+        store = open_store()
+    sources, partitions = vizier_sources(cc, instrument, store or None)
+    result['partitions'] = partitions
+    if len(sources) == 0:
+        raise CheckError('No GALEX sources found at VizieR for this field.')
+
+    # NUV
+    nd = sources['RAJ2000', 'DEJ2000', 'NUV']
+    nd = nd.filled(99).group_by('NUV')[:number]
+    nuv_res = hstack([deg_to_hms(nd['RAJ2000'], nd['DEJ2000']),
+                      format_nuv(countnuv(nd['NUV']))])
+
+    # FUV
+    fd = sources['RAJ2000', 'DEJ2000', 'FUV']
+    fd = fd.filled(99).group_by('FUV')[:number]
+    fuv_res = hstack([deg_to_hms(fd['RAJ2000'], fd['DEJ2000']),
+                      format_fuv(countfuv(fd['FUV']))])
+
+    result['nuv_res'] = nuv_res
+    result['fuv_res'] = fuv_res
+    result['nuv_safe'] = nuv_safe_filters(nuv_res)
+    result['fuv_safe'] = fuv_safe_filters(fuv_res)
+    return result
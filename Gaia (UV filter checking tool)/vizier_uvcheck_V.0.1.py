@@ -19,17 +19,24 @@
 
    Changes; when, what
    -------------------
+   Oct 18, 2026: Count rates from the uvcheck count-rate module (bright
+                 magnitude correction bounded below).
+   Oct 18, 2026: The sources from the local HEALPix copy of the GALEX catalogue
+                 (uvcheck.galexstore) where there is one; VizieR is asked only
+                 about the partitions missing from it.
+
 '''
 
 
 import os
 import sys
-import numpy as np
 
 from astropy import units as u
-from astroquery.vizier import Vizier
 from astropy.coordinates import SkyCoord
-from astropy.table import Table, hstack, vstack
+from astropy.table import Table, hstack
+from uvcheck.counts import countnuv, countfuv
+from uvcheck.vizier import vizier_sources
+from uvcheck.galexstore import open_store
 
 
 # To get the user input. 
@@ -42,48 +49,6 @@ RA = "7:36:51.396"
 DEC = "65:36:9.170"
 
 
-# Functions to convert magnitude to UVIT count rates.
-def countfuv(mg):
-    caf2 = 1.0
-    baf2 = 0.85
-    sapphire = 0.63
-    silica = 0.22
-    mg1 = 18.22
-
-    if mg <= 15.0:
-        mg_c = 5.371 + (20.0 * mg - 210.2) ** 0.5
-    else: 
-        mg_c = mg 
-
-    cr1 =  caf2 * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr2 =  baf2 * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr3 =  sapphire * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    cr4 =  silica * 10.0 ** ((mg1 - mg_c) * 0.4)    
-    return mg, mg_c, cr1, cr2, cr3, cr4
-
-countfuv = np.vectorize(countfuv)
-
-def countnuv(mg):
-    silica = 1.0
-    b4 = 0.22
-    b13 = 0.27
-    b15 = 0.074
-    n2 = 0.055
-    mg1 = 20.0
-    if mg <= 15.0:
-        mg_c = 2.634 + (26.316 * mg - 245.329) ** 0.5
-    else: 
-        mg_c = mg 
-
-    cr1 =  silica * 10.0 ** ((mg1 - mg_c) * 0.4)
-    cr2 =  b4 * 10 ** ((mg1-mg_c) * 0.4)    
-    cr3 =  b13 * 10 ** ((mg1 - mg_c) * 0.4)    
-    cr4 =  b15 * 10 ** ((mg1 - mg_c) * 0.4)    
-    cr5 =  n2 * 10 ** ((mg1 - mg_c) * 0.4)    
-    return mg, mg_c, cr1, cr2, cr3, cr4, cr5
-
-countnuv = np.vectorize(countnuv)
-
 # To check the RA, DEC input.
 if (DEC.count(':') == RA.count(':') == 2):
      pass
@@ -94,26 +59,13 @@ else:
 working_arena = '.'
 os.chdir(working_arena)
 
-# instrument and radius of search in arsec.
-field_radius = {'uvit'  : 1200,
-                'sxt'   : 1500,
-                'czti'  : 1680,
-                'laxpc' : 1680}
-
-# the row limit of astroquery is set to 50 by default.
-Vizier.ROW_LIMIT = -1
-
 # so that astropy can understand the coordinates. 
 radec = RA + " " + DEC
 cc = SkyCoord(radec, unit = (u.hourangle, u.deg))
 
-# Searching the GALEX catalogue.
-result = Vizier.query_region(cc,
-                             radius = field_radius[instrument] * u.arcsec,
-                             catalog = 'II/312')
-
-# Stacking the results (there could both AIS and MIS).
-result = vstack(result, metadata_conflicts = 'silent')
+# Searching the GALEX catalogue, in the local copy of it where there
+# is one (there could both AIS and MIS).
+result, partitions = vizier_sources(cc, instrument, open_store())
 
 if len(result) == 0:
     sys.exit()
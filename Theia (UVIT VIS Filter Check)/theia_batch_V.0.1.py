@@ -0,0 +1,66 @@
+#!/usr/bin/env python2.7
+
+# Run this code in the format: ./script targets.csv results.csv
+# The target list needs ra and dec columns (12:12:12 -12:12:12),
+# name and instrument (uvit, sxt, czti, laxpc) columns are optional.
+
+'''A tool for checking the UVIT VIS filters of many fields.
+
+
+   Copyright 2026 Prajwel Joseph
+  
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+  
+       http://www.apache.org/licenses/LICENSE-2.0
+  
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License. 
+
+   Changes; when, what
+   -------------------
+   Oct 18, 2026: Batch mode of theia_V.2.1.py.
+
+'''
+
+
+import sys
+import argparse
+import warnings
+
+from vischeck.theia import CheckError
+from vischeck.batch import (THREADS, read_targets, run_batch, write_results,
+                            stages_file_name, write_stages)
+
+# This code is going to throw some warnings.
+warnings.filterwarnings("ignore")
+
+parser = argparse.ArgumentParser(description = 'UVIT VIS filter check of many fields.')
+parser.add_argument('targets', help = 'target list (CSV, FITS, ...)')
+parser.add_argument('results', help = 'consolidated results table (CSV, FITS, ...)')
+parser.add_argument('--instrument', default = 'uvit',
+                    help = 'instrument when the target list has none (default: uvit)')
+parser.add_argument('--threads', type = int, default = THREADS,
+                    help = 'fields checked at once (default: {})'.format(THREADS))
+args = parser.parse_args()
+
+try:
+    targets = read_targets(args.targets, args.instrument)
+except (CheckError, IOError) as error:
+    print('\n{}\n'.format(error))
+    sys.exit(1)
+
+print('\nChecking {} targets.\n'.format(len(targets)))
+rows, records = run_batch(targets, args.threads)
+write_results(rows, args.results)
+
+# The stages of all the checks go next to the results.
+write_stages(records, stages_file_name(args.results))
+
+failed = sum(1 for row in rows if row['error'])
+print('{} checked, {} failed. Results in {}\n'.format(len(rows) - failed, failed, args.results))
+print('Done!\n')
@@ -0,0 +1,156 @@
+'''Batch mode of the UVIT VIS filter check.
+
+   The targets are read from a table (CSV, FITS or anything else astropy
+   can read) with ra and dec columns (hh:mm:ss dd:mm:ss) and, optionally,
+   name and instrument columns. A few threads check them, sharing one
+   pool of keep-alive connections to BSWT and the ETC and one cache of
+   ETC answers (a star of the same V and spectral type is asked about
+   once); a field listed more than once is checked once. The bright-star
+   catalogue and the ETC grid, where there are, are opened once for all.
+   The verdicts end up in one table, a row per target, and the stages of
+   every check in one file next to it.
+
+'''
+
+import os
+import json
+import numpy as np
+
+from .stages import Stages
+from .theia import (CheckError, ETC_THREADS, vis_filters, pooled_session, check_field,
+                    open_bright_stars)
+
+
+# Columns of the consolidated results table.
+result_columns = (['name', 'instrument', 'ra', 'dec', 'stars']
+                  + vis_filters
+                  + ['safe_filters', 'too_close', 'error'])
+
+# Fields checked at once.
+THREADS = 4
+
+# Packages imported before the threads start; threads importing one
+# package at once can deadlock.
+WARM_MODULES = ['astropy.units', 'astropy.coordinates', 'bs4']
+
+
+# Function to read the target list.
+def read_targets(target_file, instrument = 'uvit'):
+    from astropy.table import Table
+
+    table = Table.read(target_file)
+    columns = dict((name.lower(), name) for name in table.colnames)
+    if 'ra' not in columns or 'dec' not in columns:
+        raise CheckError('The target list needs ra and dec columns.')
+
+    targets = []
+    for i, row in enumerate(table):
+        name = str(row[columns['name']]) if 'name' in columns else str(i + 1)
+        if 'instrument' in columns:
+            target_instrument = str(row[columns['instrument']]).strip().lower()
+        else:
+            target_instrument = instrument
+        targets.append((name,
+                        target_instrument,
+                        str(row[columns['ra']]).strip(),
+                        str(row[columns['dec']]).strip()))
+    return targets
+
+# Function to check one field with what the batch shares. Returns the
+# result, or the error, and the record of the stages.
+def check_one(field, shared):
+    instrument, RA, DEC = field
+    stages = Stages('{} {} {}'.format(instrument, RA, DEC))
+    try:
+        result = check_field(instrument, RA, DEC,
+                             session = shared['session'],
+                             stages = stages,
+                             etc_grid = shared['etc_grid'],
+                             catalogue = shared['catalogue'],
+                             etc_cache = shared['etc_cache'])
+    except CheckError as error:
+        return ' '.join(str(error).split()), stages.record()
+    except Exception as error:   # A failed target should not stop the batch.
+        return '{}: {}'.format(type(error).__name__, error), stages.record()
+    return result, stages.record()
+
+# Function to make the row of a target from the result of its field.
+def target_row(target, result):
+    name, instrument, RA, DEC = target
+    row = dict((column, '') for column in result_columns)
+    row.update({'name': name, 'instrument': instrument, 'ra': RA, 'dec': DEC,
+                'stars': 0, 'too_close': 0})
+    for column in vis_filters:
+        row[column] = np.nan
+    if not isinstance(result, dict):
+        row['error'] = result
+        return row
+
+    # The brightest star in the field decides, so the largest count
+    # rate per filter is kept.
+    rates = np.array([values[5:] for values in result['rows']], dtype = np.float64)
+    for k, column in enumerate(vis_filters):
+        row[column] = float(np.max(rates[:, k]))
+    row['stars'] = len(result['rows'])
+    row['safe_filters'] = ' '.join(result['safe_filters'])
+    row['too_close'] = result['too_close']
+    return row
+
+# Function to check all the targets, a few fields at once. Returns a
+# row per target, in the order of the targets, and the records of the
+# stages of the fields checked.
+def run_batch(targets, threads = THREADS):
+    from importlib import import_module
+    from multiprocessing.pool import ThreadPool
+    from .etcgrid import open_grid
+
+    for name in WARM_MODULES:
+        import_module(name)
+
+    shared = {'session': pooled_session(threads * ETC_THREADS),
+              'etc_grid': open_grid() or False,
+              'catalogue': open_bright_stars() or False,
+              'etc_cache': {}}
+
+    fields = []
+    seen = set()
+    for name, instrument, RA, DEC in targets:
+        if (instrument, RA, DEC) not in seen:
+            seen.add((instrument, RA, DEC))
+            fields.append((instrument, RA, DEC))
+
+    if threads < 2 or len(fields) < 2:
+        checked = [check_one(field, shared) for field in fields]
+    else:
+        pool = ThreadPool(min(threads, len(fields)))
+        try:
+            checked = pool.map(lambda field: check_one(field, shared), fields)
+        finally:
+            pool.close()
+            pool.join()
+
+    results = dict(zip(fields, [result for result, record in checked]))
+    rows = [target_row(target, results[tuple(target[1:])]) for target in targets]
+    return rows, [record for result, record in checked]
+
+# Function to write the consolidated results table.
+def write_results(rows, results_file):
+    from astropy.table import Table
+
+    table = Table(rows = [[row[column] for column in result_columns] for row in rows],
+                  names = result_columns)
+    for column in vis_filters:
+        table[column].format = '4.2f'
+    table.write(results_file, overwrite = True)
+    return table
+
+# Function to name the stages file of a results file.
+def stages_file_name(results_file):
+    return os.path.splitext(results_file)[0] + '_stages.json'
+
+# Function to write the records of the stages of a batch, in the form
+# python -m uvcheck stages sums up.
+def write_stages(records, file_name):
+    with open(file_name, 'w') as stages_file:
+        json.dump({'records': records}, stages_file, indent = 1, sort_keys = True)
+    return file_name
@@ -0,0 +1,247 @@
+'''Local bright-star catalogue, in place of BSWT.
+
+   The stars (RA and DEC in degrees, V and B-V) are kept in a directory
+   of .npy files, one per column, which are read memory-mapped. The
+   rows are grouped into declination bands and sorted by RA inside
+   every band; band_start.npy says where every band starts, so that a
+   field only reads the rows of the few bands (and the RA range within
+   them) that can reach it. The stars of a field come out as those of
+   BSWT do: the brightest few, brightest first.
+
+   The catalogue is made from any table astropy reads (a VizieR dump of
+   Tycho-2 or Hipparcos, say) with python -m vischeck bright-stars
+   --import, and kept in ~/.vischeck/bright_stars, or wherever
+   VISCHECK_BRIGHT_STARS points. The check reads it instead of asking
+   BSWT when it is there. Only the stars down to the V limit of the
+   catalogue (kept in catalogue.json, VMAG_LIMIT unless given at the
+   import) are looked at for close pairs, as BSWT lists no faint ones.
+
+   Johnson V and B-V are made from the Tycho BT and VT of a table that
+   has no V and B-V of its own. A star without B-V is kept with that of
+   the bluest spectral type (B0), which gives it the most counts in the
+   VIS filters for its V; catalogue.json tells how many such stars
+   there are.
+
+'''
+
+import os
+import json
+import shutil
+import numpy as np
+
+from .theia import CheckError, NUMBER, BRIGHT_STARS, CATALOGUE_FILE
+
+
+# Width of the declination bands in degrees.
+BAND_WIDTH = 1.0
+
+# Faintest V of the stars looked at for close pairs.
+VMAG_LIMIT = 9.0
+
+# B-V of the stars without one: that of B0, the bluest type.
+UNKNOWN_BV = -0.3
+
+# instrument and radius of search in arcsec (as the UV check).
+field_radius = {'uvit'  : 1200,
+                'sxt'   : 1500,
+                'czti'  : 1680,
+                'laxpc' : 1680}
+
+# Columns kept, with their types.
+star_columns = [('ra', np.float64), ('dec', np.float64),
+                ('vmag', np.float64), ('bv', np.float64)]
+
+# Names the columns may have in the tables imported.
+column_names = {'ra': ['ra', 'RAJ2000', '_RAJ2000', 'RAdeg', 'RA_ICRS', 'RAICRS', 'RAmdeg'],
+                'dec': ['dec', 'DEJ2000', '_DEJ2000', 'DEdeg', 'DE_ICRS', 'DEICRS', 'DEmdeg'],
+                'vmag': ['vmag', 'Vmag', 'V'],
+                'bv': ['bv', 'B-V', 'BV', 'B_V'],
+                'bt': ['BTmag', 'BT'],
+                'vt': ['VTmag', 'VT']}
+
+
+# Function to pick the column of a table going by any of names.
+def table_column(table, names):
+    for name in names:
+        if name in table.colnames:
+            return np.ma.filled(np.ma.asarray(table[name], dtype = np.float64), np.nan)
+    raise KeyError('None of the columns {} in the table.'.format(', '.join(names)))
+
+# Function to read V and B-V of a table: Johnson V and B-V if it has
+# them, made from the Tycho BT and VT otherwise,
+#
+#     V = VT - 0.090 (BT - VT),  B-V = 0.850 (BT - VT)
+#
+# (The Hipparcos and Tycho Catalogues, ESA SP-1200, vol. 1, sec. 1.3).
+# Without BT, V is VT and B-V is not known.
+def johnson_columns(table):
+    if any(name in table.colnames for name in column_names['vmag']):
+        return table_column(table, column_names['vmag']), table_column(table, column_names['bv'])
+    if not any(name in table.colnames for name in column_names['vt']):
+        raise KeyError('Neither V nor the Tycho VT in the table.')
+
+    vt = table_column(table, column_names['vt'])
+    bt_vt = table_column(table, column_names['bt']) - vt
+    vmag = np.where(np.isnan(bt_vt), vt, vt - 0.090 * bt_vt)
+    return vmag, 0.850 * bt_vt
+
+
+# Function to find the separations (arcsec) of positions from a centre
+# (all in degrees).
+def separations(ra, dec, ra_cen, dec_cen):
+    ra, dec = np.radians(ra), np.radians(dec)
+    ra_cen, dec_cen = np.radians(ra_cen), np.radians(dec_cen)
+    haversine = (np.sin((dec - dec_cen) / 2) ** 2
+                 + np.cos(dec) * np.cos(dec_cen) * np.sin((ra - ra_cen) / 2) ** 2)
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(haversine, 0.0, 1.0)))) * 3600.0
+
+
+
+class BrightStars(object):
+
+    def __init__(self, catalogue_dir = None):
+        self.catalogue_dir = catalogue_dir or BRIGHT_STARS
+        with open(os.path.join(self.catalogue_dir, CATALOGUE_FILE)) as catalogue_file:
+            numbers = json.load(catalogue_file)
+        self.band_width = numbers['band_width']
+        self.vmag_limit = numbers.get('vmag_limit', VMAG_LIMIT)
+        self.unknown_bv = numbers.get('unknown_bv', 0)
+        self.columns = dict((name, np.load(os.path.join(self.catalogue_dir, name + '.npy'),
+                                           mmap_mode = 'r'))
+                            for name, dtype in star_columns)
+        self.band_start = np.load(os.path.join(self.catalogue_dir, 'band_start.npy'))
+
+    def __len__(self):
+        return len(self.columns['ra'])
+
+    # To write a catalogue of the columns given, replacing the one at
+    # catalogue_dir. It appears whole or not at all. The stars without
+    # a position or V are left out, those without B-V get UNKNOWN_BV.
+    @staticmethod
+    def write(catalogue_dir, ra, dec, vmag, bv, band_width = BAND_WIDTH,
+              vmag_limit = VMAG_LIMIT):
+        ra = np.asarray(ra, dtype = np.float64) % 360.0
+        dec = np.asarray(dec, dtype = np.float64)
+        vmag = np.asarray(vmag, dtype = np.float64)
+        bv = np.asarray(bv, dtype = np.float64)
+        known = ~(np.isnan(ra) | np.isnan(dec) | np.isnan(vmag))
+        ra, dec, vmag, bv = ra[known], dec[known], vmag[known], bv[known]
+        no_bv = np.isnan(bv)
+        bv = np.where(no_bv, UNKNOWN_BV, bv)
+
+        n_bands = int(np.ceil(180.0 / band_width))
+        band = np.clip(((dec + 90.0) / band_width).astype(int), 0, n_bands - 1)
+        order = np.lexsort((ra, band))
+        columns = {'ra': ra[order], 'dec': dec[order], 'vmag': vmag[order], 'bv': bv[order]}
+
+        parent = os.path.dirname(os.path.abspath(catalogue_dir))
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        temp_dir = '{}.part{}'.format(catalogue_dir, os.getpid())
+        os.makedirs(temp_dir)
+        try:
+            for name, dtype in star_columns:
+                np.save(os.path.join(temp_dir, name + '.npy'), columns[name].astype(dtype))
+            np.save(os.path.join(temp_dir, 'band_start.npy'),
+                    np.searchsorted(band[order], np.arange(n_bands + 1)))
+            with open(os.path.join(temp_dir, CATALOGUE_FILE), 'w') as numbers:
+                json.dump({'band_width': band_width,
+                           'vmag_limit': float(vmag_limit),
+                           'stars': int(len(ra)),
+                           'unknown_bv': int(np.sum(no_bv))}, numbers, indent = 1)
+            if os.path.isdir(catalogue_dir):
+                shutil.rmtree(catalogue_dir)
+            os.rename(temp_dir, catalogue_dir)
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors = True)
+            raise
+        return len(ra)
+
+    # To make the catalogue from tables (VOTable, FITS, ...) of stars.
+    # Returns the number of stars kept (those with a position and V).
+    @classmethod
+    def import_tables(cls, file_names, catalogue_dir = None, table_format = None,
+                      vmag_limit = VMAG_LIMIT):
+        from astropy.table import Table
+
+        pieces = []
+        for file_name in file_names:
+            table = Table.read(file_name, format = table_format)
+            pieces.append([table_column(table, column_names['ra']),
+                           table_column(table, column_names['dec'])]
+                          + list(johnson_columns(table)))
+        columns = [np.concatenate(column) for column in zip(*pieces)]
+        return cls.write(catalogue_dir or BRIGHT_STARS, *columns, vmag_limit = vmag_limit)
+
+    # To find the rows within radius (arcsec) of the field centre.
+    # Returns the row numbers and their separations.
+    def query(self, ra_cen, dec_cen, radius):
+        ra_cen = ra_cen % 360.0
+        radius_deg = radius / 3600.0
+        n_bands = len(self.band_start) - 1
+        dec_lo = max(dec_cen - radius_deg, -90.0)
+        dec_hi = min(dec_cen + radius_deg, 90.0)
+        first = int(np.clip((dec_lo + 90.0) / self.band_width, 0, n_bands - 1))
+        last = int(np.clip((dec_hi + 90.0) / self.band_width, 0, n_bands - 1))
+
+        # Half width of the RA range to be looked at in every band.
+        cos_dec = np.cos(np.radians(max(abs(dec_lo), abs(dec_hi))))
+        if dec_hi >= 90.0 or dec_lo <= -90.0 or radius_deg >= 180.0 * cos_dec:
+            ra_half = 180.0
+        else:
+            ra_half = np.degrees(np.arcsin(min(1.0, np.sin(np.radians(radius_deg)) / cos_dec)))
+
+        ra = self.columns['ra']
+        pieces = []
+        for band in range(first, last + 1):
+            start, stop = self.band_start[band], self.band_start[band + 1]
+            if start == stop:
+                continue
+            if ra_half >= 180.0:
+                pieces.append(np.arange(start, stop))
+                continue
+            band_ra = ra[start:stop]
+            ra_lo, ra_hi = ra_cen - ra_half, ra_cen + ra_half
+            ranges = [(max(ra_lo, 0.0), min(ra_hi, 360.0))]
+            if ra_lo < 0.0:
+                ranges.append((ra_lo + 360.0, 360.0))
+            if ra_hi > 360.0:
+                ranges.append((0.0, ra_hi - 360.0))
+            for lo, hi in ranges:
+                i = np.searchsorted(band_ra, lo, side = 'left')
+                j = np.searchsorted(band_ra, hi, side = 'right')
+                pieces.append(np.arange(start + i, start + j))
+
+        if len(pieces) == 0:
+            return np.zeros(0, dtype = np.intp), np.zeros(0)
+        rows = np.unique(np.concatenate(pieces))
+        separation = separations(ra[rows], self.columns['dec'][rows], ra_cen, dec_cen)
+        inside = separation <= radius
+        return rows[inside], separation[inside]
+
+    # To list the bright stars around the field (degrees), as
+    # bswt_stars() does. Returns the V magnitude, B-V, RA and DEC of the
+    # brightest few (all of them if number is None), brightest first.
+    def stars(self, instrument, ra_cen, dec_cen, number = NUMBER, stage = None):
+        if instrument not in field_radius:
+            raise CheckError('Unknown instrument: {}'.format(instrument))
+        rows, separation = self.query(ra_cen, dec_cen, field_radius[instrument])
+        if len(rows) == 0:
+            raise CheckError('No bright stars found in the catalogue.')
+
+        mag, bv, ra_deg, dec_deg = [np.asarray(self.columns[name][rows])
+                                    for name in ['vmag', 'bv', 'ra', 'dec']]
+        order = np.lexsort((dec_deg, ra_deg, bv, mag))
+        if number is not None:
+            order = order[:number]
+        if stage is not None:
+            stage.count(rows = len(rows))
+        return mag[order], bv[order], ra_deg[order], dec_deg[order]
+
+
+# Function to open the catalogue if there is one.
+def open_catalogue(catalogue_dir = None):
+    catalogue_dir = catalogue_dir or BRIGHT_STARS
+    if not os.path.exists(os.path.join(catalogue_dir, CATALOGUE_FILE)):
+        return None
+    return BrightStars(catalogue_dir)
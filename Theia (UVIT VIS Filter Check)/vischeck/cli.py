@@ -0,0 +1,160 @@
+'''Command line of the UVIT VIS filter check.
+
+       python -m vischeck etc-grid
+       python -m vischeck etc-grid --show
+       python -m vischeck bright-stars --import tycho2.vot
+       python -m vischeck batch targets.csv results.csv --threads 8
+
+   etc-grid asks the ETC about every spectral type over a grid of
+   magnitudes and keeps the answers, so that the check can find the
+   count rates of its stars without asking the ETC (see
+   vischeck.etcgrid); --show tells about the grid kept. bright-stars
+   makes the local bright-star catalogue the check reads instead of
+   asking BSWT (see vischeck.brightstars). batch checks the fields of
+   a target list into one table (see vischeck.batch).
+
+'''
+
+import os
+import time
+import argparse
+
+
+# Function to make the ETC grid, or tell about the one kept.
+def etc_grid(args):
+    from .theia import CheckError, ETC_URL
+    import numpy as np
+    from .etcgrid import ETC_GRID, GRID_DAYS, EtcGrid, grid_types, build_grid, save_grid
+
+    file_name = args.file or ETC_GRID
+    if args.show:
+        if not os.path.exists(file_name):
+            print('\nNo ETC grid at {}.\n'.format(file_name))
+            return 1
+        grid = EtcGrid.load(file_name)
+        print('\nETC grid: {}'.format(file_name))
+        print('{} spectral types, V from {:g} to {:g} ({} magnitudes).'.format(
+              len(grid.types), grid.mags[0], grid.mags[-1], len(grid.mags)))
+        print('Made from {} {:.1f} days ago; {}.\n'.format(
+              grid.etc_url, (time.time() - grid.built) / 86400.0,
+              'in use' if grid.fresh(GRID_DAYS) else 'not in use (stale or of another ETC)'))
+        return 0
+
+    mags = np.arange(args.mags[0], args.mags[1] + args.mags[2] / 2.0, args.mags[2])
+    print('\nAsking {} about {} stars.\n'.format(ETC_URL, len(mags) * len(grid_types())))
+    start = time.time()
+    try:
+        grid = build_grid(mags = mags, threads = args.threads)
+    except (CheckError, ValueError) as error:
+        print('\n{}\n'.format(error))
+        return 1
+    save_grid(grid, file_name)
+    print('ETC grid in {} ({:.1f} s).\n'.format(file_name, time.time() - start))
+    return 0
+
+# Function to make the bright-star catalogue, or tell about it.
+def bright_stars(args):
+    from .brightstars import BRIGHT_STARS, BrightStars, open_catalogue
+
+    catalogue_dir = args.dir or BRIGHT_STARS
+    if args.import_files:
+        start = time.time()
+        try:
+            kept = BrightStars.import_tables(args.import_files, catalogue_dir, args.format,
+                                             args.vmag_limit)
+        except (IOError, KeyError, ValueError) as error:
+            print('\n{}\n'.format(error))
+            return 1
+        print('\n{} stars imported ({:.1f} s).'.format(kept, time.time() - start))
+
+    catalogue = open_catalogue(catalogue_dir)
+    if catalogue is None:
+        print('\nNo bright-star catalogue at {}.\n'.format(catalogue_dir))
+        return 1
+    size = sum(column.nbytes for column in catalogue.columns.values())
+    print('\nBright-star catalogue: {}'.format(catalogue_dir))
+    print('{} stars, {:.1f} MB; close pairs of stars to V {}.'.format(
+          len(catalogue), size / 1048576.0, catalogue.vmag_limit))
+    print('{} stars without B-V, taken as B0.\n'.format(catalogue.unknown_bv))
+    return 0
+
+# Function to check the fields of a target list.
+def batch(args):
+    from .theia import CheckError
+    from .batch import read_targets, run_batch, write_results, stages_file_name, write_stages
+
+    try:
+        targets = read_targets(args.targets, args.instrument)
+    except (CheckError, IOError) as error:
+        print('\n{}\n'.format(error))
+        return 1
+
+    print('\nChecking {} targets.\n'.format(len(targets)))
+    start = time.time()
+    rows, records = run_batch(targets, args.threads)
+    write_results(rows, args.results)
+    write_stages(records, stages_file_name(args.results))
+
+    failed = sum(1 for row in rows if row['error'])
+    print('{} checked, {} failed in {:.1f} s. Results in {}\n'.format(
+          len(rows) - failed, failed, time.time() - start, args.results))
+    return 0
+
+
+# Function to build the argument parser.
+def make_parser():
+    from .etcgrid import GRID_MAGS
+    from .theia import ETC_THREADS
+    from .batch import THREADS
+    from .brightstars import VMAG_LIMIT
+
+    parser = argparse.ArgumentParser(prog = 'python -m vischeck',
+                                     description = 'UVIT VIS filter check.')
+    commands = parser.add_subparsers(dest = 'command')
+
+    grid_parser = commands.add_parser('etc-grid', help = 'keep the ETC count rates over a grid')
+    grid_parser.add_argument('--mags', nargs = 3, type = float, metavar = ('FIRST', 'LAST', 'STEP'),
+                             default = [GRID_MAGS[0], GRID_MAGS[-1], GRID_MAGS[1] - GRID_MAGS[0]],
+                             help = 'V magnitudes of the grid (default: {:g} {:g} {:g})'.format(
+                                    GRID_MAGS[0], GRID_MAGS[-1], GRID_MAGS[1] - GRID_MAGS[0]))
+    grid_parser.add_argument('--threads', type = int, default = ETC_THREADS,
+                             help = 'questions to the ETC at once (default: {})'.format(ETC_THREADS))
+    grid_parser.add_argument('--file', default = None,
+                             help = 'the grid (default: VISCHECK_ETC_GRID or ~/.vischeck/etc_grid.npz)')
+    grid_parser.add_argument('--show', action = 'store_true',
+                             help = 'tell about the grid kept')
+    grid_parser.set_defaults(run = etc_grid)
+
+    stars_parser = commands.add_parser('bright-stars',
+                                       help = 'make the local bright-star catalogue')
+    stars_parser.add_argument('--import', dest = 'import_files', nargs = '+', default = None,
+                              metavar = 'TABLE',
+                              help = 'tables of stars (RA, DEC in degrees, V and B-V or Tycho BT and VT) '
+                                     'to make it of')
+    stars_parser.add_argument('--format', default = None,
+                              help = 'table format (default: guessed)')
+    stars_parser.add_argument('--vmag-limit', type = float, default = VMAG_LIMIT, metavar = 'V',
+                              help = 'faintest stars looked at for close pairs '
+                                     '(default: {})'.format(VMAG_LIMIT))
+    stars_parser.add_argument('--dir', default = None,
+                              help = 'the catalogue (default: VISCHECK_BRIGHT_STARS '
+                                     'or ~/.vischeck/bright_stars)')
+    stars_parser.set_defaults(run = bright_stars)
+
+    batch_parser = commands.add_parser('batch', help = 'check the fields of a target list')
+    batch_parser.add_argument('targets', help = 'target list (CSV, FITS, ...)')
+    batch_parser.add_argument('results', help = 'consolidated results table (CSV, FITS, ...)')
+    batch_parser.add_argument('--instrument', default = 'uvit',
+                              help = 'instrument when the target list has none (default: uvit)')
+    batch_parser.add_argument('--threads', type = int, default = THREADS,
+                              help = 'fields checked at once (default: {})'.format(THREADS))
+    batch_parser.set_defaults(run = batch)
+    return parser
+
+def main(argv = None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'run', None) is None:
+        parser.print_help()
+        return 2
+    return args.run(args)
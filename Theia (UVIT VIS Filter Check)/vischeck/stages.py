@@ -0,0 +1,115 @@
+'''Timings and resources of the stages of the VIS check.
+
+   A Stages keeps, for every stage of a check, the wall time, the bytes
+   transferred, the rows scanned, the sources selected and the peak
+   memory of the process when the stage ended, along with the kind of
+   work it is (network or compute). The record is written as JSON next
+   to the output of the script. It is of the same form as those of the
+   UV check (uvcheck.stages), so that python -m uvcheck stages can sum
+   them up as well.
+
+'''
+
+import sys
+import json
+import time
+import threading
+
+try:
+    import resource
+except ImportError:   # Not on Windows.
+    resource = None
+
+
+# Numbers counted for every stage.
+stage_counts = ['bytes', 'rows', 'sources']
+
+
+# Function to find the peak resident size of the process (MB).
+def peak_memory():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / 1048576.0   # bytes there, kilobytes elsewhere.
+    return peak / 1024.0
+
+
+
+class Stage(object):
+
+    def __init__(self, stages, name, kind):
+        self.stages = stages
+        self.name = name
+        self.kind = kind
+
+    def __enter__(self):
+        self.stages.entry(self.name, self.kind)
+        self.start = time.time()
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        self.stages.add(self.name, time.time() - self.start)
+        return False
+
+    def count(self, **numbers):
+        self.stages.count(self.name, **numbers)
+
+
+
+class Stages(object):
+
+    def __init__(self, label = None):
+        self.label = label
+        self.started = time.time()
+        self.entries = []
+        self.names = {}
+        self.lock = threading.RLock()   # Stages may count from threads.
+
+    # To get the entry of a stage, made on first use.
+    def entry(self, name, kind = 'compute'):
+        with self.lock:
+            if name not in self.names:
+                entry = {'name': name,
+                         'kind': kind,
+                         'seconds': 0.0,
+                         'calls': 0,
+                         'peak_mb': None}
+                for key in stage_counts:
+                    entry[key] = 0
+                self.names[name] = entry
+                self.entries.append(entry)
+            return self.names[name]
+
+    # To time a stage (with stages.stage('etc', 'network') as stage:
+    # ...). A stage run more than once adds up.
+    def stage(self, name, kind = 'compute'):
+        return Stage(self, name, kind)
+
+    def add(self, name, seconds):
+        with self.lock:
+            entry = self.entry(name)
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+            entry['peak_mb'] = peak_memory()
+
+    def count(self, name, **numbers):
+        with self.lock:
+            entry = self.entry(name)
+            for key, value in numbers.items():
+                if key not in stage_counts:
+                    raise ValueError('Unknown count: {}'.format(key))
+                entry[key] += int(value)
+
+    # To get the record of the check so far.
+    def record(self):
+        return {'label': self.label,
+                'started': self.started,
+                'seconds': time.time() - self.started,
+                'peak_mb': peak_memory(),
+                'stages': [dict(entry) for entry in self.entries]}
+
+    def write(self, file_name):
+        with open(file_name, 'w') as stages_file:
+            json.dump(self.record(), stages_file, indent = 1, sort_keys = True)
+        return file_name
@@ -0,0 +1,430 @@
+'''The UVIT VIS filter check, as used by theia_V.2.1.py.
+
+   The bright stars around the field are listed by the UVIT bright
+   star web tool (BSWT), and the count rate of every VIS filter is
+   asked of the UVIT exposure time calculator (ETC) for each of them;
+   the stars are asked about at once, by a few threads sharing one
+   pool of keep-alive connections, so that the ETC takes about as long
+   as for one star. check_field() returns the table of stars and the
+   safe filters (and the pairs of stars closer than proximity among
+   all those BSWT lists), output_text() the file the script writes.
+   The stages of the check are timed into result['stages'] (see
+   vischeck.stages).
+
+   The count rates can come from a local grid of ETC answers instead
+   (vischeck.etcgrid), made with python -m vischeck etc-grid, and the
+   stars from a local bright-star catalogue (vischeck.brightstars),
+   made with python -m vischeck bright-stars --import.
+
+   VISCHECK_UVIT points the check at another site than the UVIT one
+   for both tools (such as the stand-in of uvcheck.standin).
+
+'''
+
+import os
+import numpy as np
+
+from .stages import Stages
+
+
+UVIT_SITE = os.environ.get('VISCHECK_UVIT', 'https://uvit.iiap.res.in/cgi-bin').rstrip('/')
+BSWT_URL = UVIT_SITE + '/bswt.pl'
+ETC_URL = UVIT_SITE + '/etc.pl'
+
+# proximity parameter (arcsec).
+proximity = 10.
+
+# Safe limit (counts per second) on the VIS filters.
+vis_limit = 4800
+
+# The filters, as named in the results and in the ETC table.
+vis_filters = ['VIS3', 'VIS2', 'VIS1', 'ND1', 'BK7']
+etc_filters = ['VIS 3', 'VIS 2', 'VIS 1', 'VIS ND1', 'VIS BK-7']
+
+# Columns of the results table.
+columns = ['ra_hms', 'dec_dms', 'mag', 'B-V', 'SpecType'] + vis_filters
+
+# Warnings about stars closer than proximity, printed and in the file.
+close_warning = ('\nWARNING! there exists {} pair of bright stars which are closer than'
+                 '          \n{} arcseconds!')
+file_warning = ('\nWARNING! there exists {} pair of stars which are closer than'
+                '                 \n{} arcseconds!')
+
+# Number of the brightest stars checked.
+NUMBER = 7
+
+# The local bright-star catalogue (see vischeck.brightstars), and the
+# file that is there when it is.
+BRIGHT_STARS = os.environ.get('VISCHECK_BRIGHT_STARS',
+                              os.path.join(os.path.expanduser('~'), '.vischeck', 'bright_stars'))
+CATALOGUE_FILE = 'catalogue.json'
+
+# Threads (and connections) asking the ETC at once, and seconds to
+# wait for an answer of either tool.
+ETC_THREADS = NUMBER
+TIMEOUT = 60
+
+# To convert B-V to Spectral Type (reference: http://www.stsci.edu/~inr/intrins.html)
+# The lower B-V limit of every type, reddest first.
+spectral_types = [(1.511, 'M4'), (1.486, 'M3'), (1.421, 'M1'), (1.351, 'M0'),
+                  (1.241, 'K7'), (1.076, 'K5'), (0.976, 'K4'), (0.936, 'K3'),
+                  (0.891, 'K2'), (0.836, 'K1'), (0.776, 'K0'), (0.711, 'G8'),
+                  (0.666, 'G5'), (0.641, 'G3'), (0.616, 'G2'), (0.566, 'G0'),
+                  (0.491, 'F8'), (0.401, 'F5'), (0.346, 'F2'), (0.331, 'F1'),
+                  (0.311, 'F0'), (0.286, 'A9'), (0.236, 'A8'), (0.186, 'A7'),
+                  (0.161, 'A6'), (0.136, 'A5'), (0.101, 'A4'), (0.066, 'A3'),
+                  (0.036, 'A2'), (0.006, 'A1'), (-0.039, 'A0'), (-0.089, 'B9'),
+                  (-0.119, 'B8'), (-0.134, 'B7'), (-0.149, 'B6'), (-0.169, 'B5'),
+                  (-0.189, 'B4'), (-0.219, 'B3'), (-0.249, 'B2'), (-0.279, 'B1')]
+
+# The lower limits, bluest first, and the types of the B-V values
+# reaching none, one, two, ... of them.
+type_limits = np.array([lower for lower, sptype in spectral_types][::-1])
+type_names = np.array(['B0'] + [sptype for lower, sptype in spectral_types][::-1], dtype = object)
+
+# Form of the ETC, for a star of given V magnitude and spectral type.
+etc_form = {'src_type': 'star', 'sptype3': 'V', 'bbodytemp': '6000.0',
+            'galaxyclass': 'sc', 'agnclass': 'seyfert2', 'plaw_index': '-1.0',
+            'fluxval': '2.0', 'flatspec_unit': 'cgs', 'redshift': '0.00',
+            'ftype': 'usemag', 'mag_band': 'v', 'coords': '11 00 00.00, -16 00 00.0',
+            'ctype': 'equatorial', 'ra': '0', 'dec': '0', 'rv': '3.1', 'ebv': '0.0',
+            'nh': '1.00', 'distance': '0.45', 'av': '1.0', 'ext_mode': 'rvebv',
+            'dc': '25', 'calc': 'et', 'snr': '5.0', 'et': '1800'}
+
+
+# Raised when a field cannot be checked.
+class CheckError(Exception):
+    pass
+
+
+# Function to make an HTTP session whose connection pool is large
+# enough for the ETC threads.
+def pooled_session(pool_size = ETC_THREADS):
+    from requests import Session
+    from requests.adapters import HTTPAdapter
+
+    session = Session()
+    adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Function to ask one of the tools, failing with CheckError when it
+# does not answer in time.
+def post_form(session, url, data):
+    from requests.exceptions import Timeout
+
+    try:
+        return session.post(url = url, data = data, timeout = TIMEOUT)
+    except Timeout:
+        raise CheckError('No answer from {} in {} seconds.'.format(url, TIMEOUT))
+
+# Function to convert B-V values to spectral types at once: each gets
+# the type of the largest lower limit it reaches, B0 below them all.
+# None where B-V is not a number.
+def spectypes(bv):
+    bv = np.atleast_1d(np.asarray(bv, dtype = np.float64))
+    types = type_names[np.searchsorted(type_limits, bv, side = 'right')]
+    types[np.isnan(bv)] = None
+    return types
+
+# Function to convert B-V to spectral type. None if out of bounds.
+def spectype(f):
+    return spectypes(f)[0]
+
+# Function to open the local bright-star catalogue, None if there is
+# none. vischeck.brightstars is only imported when there is one.
+def open_bright_stars():
+    if not os.path.exists(os.path.join(BRIGHT_STARS, CATALOGUE_FILE)):
+        return None
+    from .brightstars import BrightStars
+    return BrightStars(BRIGHT_STARS)
+
+# Function to read a count rate of the ETC table. The large ones are
+# written like "1.40 x 10+04".
+def etc_value(text):
+    if len(text) >= 10:
+        parts = text.split()
+        return float(parts[0]) * 10 ** float(parts[2][2:])
+    return float(text)
+
+# Function to list the bright stars around the field with BSWT.
+# Returns the V magnitude, B-V, RA and DEC (degrees) of the brightest
+# few (all of them if number is None), brightest first. The numbers
+# go to stage if given.
+def bswt_stars(session, instrument, RA, DEC, number = NUMBER, stage = None):
+    from io import BytesIO
+    from bs4 import BeautifulSoup
+
+    RADEC = RA.replace(':', ' ') + ', ' + DEC.replace(':', ' ')
+    bswt_data = {'coord_type': 'eq',
+                 'coords': RADEC,
+                 'source': '',
+                 'prinst': instrument}
+
+    bswt_html = post_form(session, BSWT_URL, bswt_data)
+    if stage is not None:
+        stage.count(bytes = len(bswt_html.content))
+    bswt_soup = BeautifulSoup(bswt_html.text, 'html.parser')
+    bswt_pre = bswt_soup.find('pre')
+    if bswt_pre is None:
+        raise CheckError('Could not read the BSWT results.')
+    bswt_txt = bswt_pre.text
+    bswt_data = np.genfromtxt(BytesIO(bswt_txt.encode('utf-8')),
+                              skip_header = 3, invalid_raise = False)
+    if bswt_data.size == 0:
+        raise CheckError('No bright stars found by BSWT.')
+
+    # Also when only one star is available.
+    ra_deg, dec_deg, mag, bv = np.atleast_2d(bswt_data)[:, :4].T
+    order = np.lexsort((dec_deg, ra_deg, bv, mag))
+    if number is not None:
+        order = order[:number]
+    if stage is not None:
+        stage.count(rows = len(mag))
+    return mag[order], bv[order], ra_deg[order], dec_deg[order]
+
+# Function to get the count rates of a star in the VIS filters from
+# the ETC. Returns them in the order of vis_filters. The numbers go to
+# stage if given.
+def etc_rates(session, mag, sptype, stage = None):
+    from bs4 import BeautifulSoup
+
+    etcdata = dict(etc_form)
+    etcdata.update({'sptype1': sptype[0],
+                    'sptype2': sptype[-1],
+                    'src_mag': str(mag)})
+
+    response = post_form(session, ETC_URL, etcdata)
+    if stage is not None:
+        stage.count(bytes = len(response.content), sources = 1)
+
+    # retrieving required values using soup
+    soup = BeautifulSoup(response.text, 'html.parser')
+    table = soup.find('table', {'id': 'aux'})
+    if table is None:
+        raise CheckError('Could not read the ETC results.')
+    rates = {}
+    for row in table.find_all('tr'):
+        cell = row.find('td')
+        if cell is None:
+            continue
+        name = cell.get_text()
+        if name in etc_filters:
+            rates[name] = etc_value(cell.next_element.next_element.get_text())
+    try:
+        return [rates[name] for name in etc_filters]
+    except KeyError:
+        raise CheckError('The ETC results lack a VIS filter.')
+
+# Function to get the count rates of several stars from the ETC, a
+# few at once. Returns them in the order of the stars. With a cache (a
+# dictionary kept between fields), a star of the same V and spectral
+# type is asked about only once.
+def etc_all(session, mags, sptypes, stage = None, threads = ETC_THREADS, cache = None):
+    from multiprocessing.pool import ThreadPool
+
+    def rates(star):
+        return etc_rates(session, star[0], star[1], stage)
+
+    def ask(stars):
+        if len(stars) < 2 or threads < 2:
+            return [rates(star) for star in stars]
+        pool = ThreadPool(min(threads, len(stars)))
+        try:
+            return pool.map(rates, stars)
+        finally:
+            pool.close()
+            pool.join()
+
+    stars = [(str(mag), sptype) for mag, sptype in zip(mags, sptypes)]
+    if cache is None:
+        return ask(stars)
+    missing = sorted(set(star for star in stars if star not in cache))
+    for star, answer in zip(missing, ask(missing)):
+        cache[star] = answer
+    return [cache[star] for star in stars]
+
+# Function to find the pairs of stars closer than limit (arcsec), by
+# a sweep over the stars sorted by declination: only the stars within
+# limit in declination of each other are compared, a neighbour apart
+# at a time. Returns the pairs (indices into ra_deg, dec_deg, the
+# first one the smaller) and their separations (arcsec).
+def close_pairs(ra_deg, dec_deg, limit = proximity):
+    ra = np.radians(np.asarray(ra_deg, dtype = np.float64))
+    dec = np.radians(np.asarray(dec_deg, dtype = np.float64))
+    order = np.argsort(dec, kind = 'stable')
+    dec_sorted = dec[order]
+    vectors = np.column_stack([np.cos(dec) * np.cos(ra),
+                               np.cos(dec) * np.sin(ra),
+                               np.sin(dec)])[order]
+    limit_rad = np.radians(limit / 3600.0)
+
+    first, second, separations = [], [], []
+    step = 1
+    while step < len(order):
+        near = np.nonzero(dec_sorted[step:] - dec_sorted[:-step] < limit_rad)[0]
+        if len(near) == 0:
+            break
+        chord = np.sqrt(np.sum((vectors[near + step] - vectors[near]) ** 2, axis = 1))
+        separation = 2 * np.arcsin(np.minimum(chord / 2, 1.0))
+        close = separation < limit_rad
+        first.append(order[near[close]])
+        second.append(order[near[close] + step])
+        separations.append(np.degrees(separation[close]) * 3600.0)
+        step += 1
+
+    if not first:
+        return np.zeros((0, 2), dtype = np.intp), np.zeros(0)
+    first = np.concatenate(first)
+    second = np.concatenate(second)
+    pairs = np.sort(np.column_stack([first, second]), axis = 1)
+    return pairs, np.concatenate(separations)
+
+# Function to check a field. Returns a dictionary with the table of
+# stars and the safe filters, raises CheckError if it cannot be done.
+# A session can be passed in to be reused between fields. The stages
+# are timed into stages if given (so that they are known when the
+# check fails too), into a Stages of its own otherwise. The count rates
+# come from the ETC grid (see vischeck.etcgrid) if there is one fit to
+# use or etc_grid is given, from the ETC if there is none or etc_grid
+# is False. Likewise, the stars come from the local bright-star
+# catalogue (see vischeck.brightstars) or BSWT, going by catalogue.
+# The ETC answers are kept in etc_cache if given.
+def check_field(instrument, RA, DEC, session = None, stages = None, etc_grid = None,
+                catalogue = None, etc_cache = None):
+    from astropy.coordinates import SkyCoord
+
+    # Check the input
+    if not (DEC.count(':') == RA.count(':') == 2):
+        raise CheckError('Check your RA DEC input.')
+
+    if stages is None:
+        stages = Stages()
+    if session is None:
+        session = pooled_session()
+
+    if catalogue is None:
+        catalogue = open_bright_stars()
+
+    # All the stars, for the pairs; the brightest few, for the rest.
+    if catalogue:
+        with stages.stage('bright stars') as stage:
+            centre = SkyCoord(RA, DEC, unit = ('hourangle', 'deg'))
+            all_stars = catalogue.stars(instrument, centre.ra.degree, centre.dec.degree,
+                                        None, stage)
+            mag, bv, ra_deg, dec_deg = [values[:NUMBER] for values in all_stars]
+            stage.count(sources = len(mag))
+        # The pairs only of the stars BSWT would list.
+        bright = all_stars[0] <= catalogue.vmag_limit
+        all_ra, all_dec = all_stars[2][bright], all_stars[3][bright]
+    else:
+        with stages.stage('bswt', 'network') as stage:
+            all_stars = bswt_stars(session, instrument, RA, DEC, None, stage)
+            mag, bv, ra_deg, dec_deg = [values[:NUMBER] for values in all_stars]
+            stage.count(sources = len(mag))
+        all_ra, all_dec = all_stars[2:]
+
+    with stages.stage('spectral types'):
+        spty = list(spectypes(bv))
+    if None in spty:
+        raise CheckError('B-V out of bounds.')
+
+    if etc_grid is None:
+        from .etcgrid import open_grid
+        etc_grid = open_grid()
+
+    if etc_grid:
+        with stages.stage('etc grid') as stage:
+            # To two decimals, as the ETC writes them.
+            rates = np.round(etc_grid.rates(mag, spty), 2)
+            stage.count(sources = len(mag))
+    else:
+        # All the stars at once.
+        with stages.stage('etc', 'network') as stage:
+            rates = np.array(etc_all(session, mag, spty, stage, cache = etc_cache))
+
+    with stages.stage('coordinates'):
+        # To convert ra_deg and dec_deg to ra_hms and dec_dms.
+        coord = SkyCoord(ra_deg, dec_deg, frame = 'icrs', unit = 'deg')
+        RAhms_DECdms = coord.to_string('hmsdms', sep = ':')
+        ra_hms, dec_dms = zip(*[hmdm.split(' ') for hmdm in RAhms_DECdms])
+
+    with stages.stage('decision') as stage:
+        # To select safe filters.
+        safe_filters = [name for k, name in enumerate(vis_filters)
+                        if np.sum(rates[:, k] > vis_limit) == 0]
+
+        rows = []
+        for j in range(len(mag)):
+            rows.append([ra_hms[j], dec_dms[j], float(mag[j]), float(bv[j]), spty[j]]
+                        + [float(rate) for rate in rates[j]])
+
+        stage.count(rows = len(rows))
+
+    with stages.stage('close pairs') as stage:
+        pairs, separations = close_pairs(all_ra, all_dec)
+        stage.count(rows = len(all_ra), sources = len(pairs))
+
+    return {'instrument': instrument,
+            'RA': RA,
+            'DEC': DEC,
+            'coordinates': RA.replace(':', ' ') + ', ' + DEC.replace(':', ' '),
+            'rows': rows,
+            'safe_filters': safe_filters,
+            'too_close': len(pairs),
+            'close_pairs': [[float(all_ra[i]), float(all_dec[i]),
+                             float(all_ra[j]), float(all_dec[j]), float(separation)]
+                            for (i, j), separation in zip(pairs, separations)],
+            'etc': 'grid' if etc_grid else 'live',
+            'stars': 'catalogue' if catalogue else 'bswt',
+            'stages': stages}
+
+# Function to name the files of a field, less their ending.
+def field_stem(instrument, RA, DEC):
+    return '{}_RA_{}_DEC_{}'.format(instrument, RA, DEC)
+
+# Function to name the file of a checked field.
+def output_name(result):
+    return field_stem(result['instrument'], result['RA'], result['DEC']) + '.dat'
+
+# Function to name the stages file of a field.
+def stages_name(instrument, RA, DEC):
+    return field_stem(instrument, RA, DEC) + '_stages.json'
+
+# Function to format a row of the results table.
+def row_text(row):
+    return '\t'.join(str(value) for value in row)
+
+# Function to make the text of the file of a checked field.
+def output_text(result):
+    lines = ['#' + '\t'.join(columns)]
+    lines += [row_text(row) for row in result['rows']]
+    text = '\n'.join(lines) + '\n'
+    text += '\n\nSafe filters: {}\n'.format(result['safe_filters'])
+    if result['too_close'] > 0:
+        text += file_warning.format(result['too_close'], proximity)
+    return text
+
+# Function to show the results of a checked field and write its file
+# into the working directory, as the script always did.
+def write_outputs(result, verbose = True):
+    if verbose:
+        # Showing back the user inputs to user!
+        print('\nPayload: {}, Coordinates: {}\n'.format(result['instrument'],
+                                                        result['coordinates']))
+
+        #The usual mambo-jambo.
+        print('\n\nTable of results')
+        print('#########################\n')
+
+        print('\t'.join(columns) + '\n')
+        for row in result['rows']:
+            print(row_text(row))
+        print('\n\nSafe filters: {}\n'.format(result['safe_filters']))
+
+        if result['too_close'] > 0:
+            print(close_warning.format(result['too_close'], proximity))
+
+    with open(output_name(result), 'w') as fr:
+        fr.write(output_text(result))